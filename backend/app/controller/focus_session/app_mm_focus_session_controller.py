@@ -1,73 +1,94 @@
 from fastapi import APIRouter, status
 from uuid import UUID
-from typing import List
+from typing import Optional, Union
 from model.focus_session.app_mm_focus_session import (
     AppMmFocusSessionCreate,
     AppMmFocusSessionUpdate,
     AppMmFocusSessionResponse
 )
+from model.focus_session.app_mm_focus_session_rollup import AppMmFocusSessionUserStatsResponse
 from service.focus_session.app_mm_focus_session_service import AppMmFocusSessionService
+from service.focus_session.app_mm_focus_session_rollup_service import AppMmFocusSessionRollupService
 from model.api_response import ApiResponse
+from model.page_response import PageResponse
 from model.dto.focus_session_query_criteria import FocusSessionQueryCriteria
 
 router = APIRouter(prefix="/focus-sessions", tags=["focus-sessions"])
 
 @router.post("/create", response_model=ApiResponse[AppMmFocusSessionResponse], status_code=status.HTTP_201_CREATED)
-def create_focus_session(focus_session: AppMmFocusSessionCreate):
+async def create_focus_session(focus_session: AppMmFocusSessionCreate):
     """Create a new focus session"""
     try:
-        result = AppMmFocusSessionService.create_focus_session(focus_session)
+        result = await AppMmFocusSessionService.create_focus_session(focus_session)
         return ApiResponse.success(result)
     except Exception as e:
         return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-guid/{focus_session_id}", response_model=ApiResponse[AppMmFocusSessionResponse])
-def get_focus_session(focus_session_id: UUID):
+@router.get("/get-by-guid/{focus_session_id}", response_model=ApiResponse[Union[AppMmFocusSessionResponse, dict]])
+async def get_focus_session(focus_session_id: UUID, fields: Optional[str] = None):
     """Get focus session by ID"""
-    focus_session = AppMmFocusSessionService.get_focus_session_by_id(focus_session_id)
+    try:
+        focus_session = await AppMmFocusSessionService.get_focus_session_by_id(focus_session_id, fields=fields)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
     if not focus_session:
         return ApiResponse.error({"message": "Focus session not found"})
     return ApiResponse.success(focus_session)
 
-@router.get("/get-all", response_model=ApiResponse[List[AppMmFocusSessionResponse]])
-def get_all_focus_sessions():
+@router.get("/get-all", response_model=ApiResponse[Union[PageResponse[AppMmFocusSessionResponse], dict]])
+async def get_all_focus_sessions(limit: Optional[int] = None, cursor: Optional[str] = None):
     """Get all focus sessions"""
-    focus_sessions = AppMmFocusSessionService.get_all_focus_sessions()
-    return ApiResponse.success(focus_sessions)
+    try:
+        focus_sessions = await AppMmFocusSessionService.get_all_focus_sessions(limit=limit, cursor=cursor)
+        return ApiResponse.success(focus_sessions)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-user/{user_guid}", response_model=ApiResponse[List[AppMmFocusSessionResponse]])
-def get_focus_sessions_by_user(user_guid: UUID):
+@router.get("/get-by-user/{user_guid}", response_model=ApiResponse[Union[PageResponse[AppMmFocusSessionResponse], dict]])
+async def get_focus_sessions_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get all focus sessions for a specific user"""
-    focus_sessions = AppMmFocusSessionService.get_focus_sessions_by_user(user_guid)
-    return ApiResponse.success(focus_sessions)
+    try:
+        focus_sessions = await AppMmFocusSessionService.get_focus_sessions_by_user(user_guid, limit=limit, cursor=cursor, fields=fields)
+        return ApiResponse.success(focus_sessions)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-library/{library_hdr_guid}", response_model=ApiResponse[List[AppMmFocusSessionResponse]])
-def get_focus_sessions_by_library(library_hdr_guid: UUID):
+@router.get("/get-by-library/{library_hdr_guid}", response_model=ApiResponse[Union[PageResponse[AppMmFocusSessionResponse], dict]])
+async def get_focus_sessions_by_library(library_hdr_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get all focus sessions for a specific library header"""
-    focus_sessions = AppMmFocusSessionService.get_focus_sessions_by_library(library_hdr_guid)
-    return ApiResponse.success(focus_sessions)
+    try:
+        focus_sessions = await AppMmFocusSessionService.get_focus_sessions_by_library(library_hdr_guid, limit=limit, cursor=cursor, fields=fields)
+        return ApiResponse.success(focus_sessions)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
 @router.put("/update/{focus_session_id}", response_model=ApiResponse[AppMmFocusSessionResponse])
-def update_focus_session(focus_session_id: UUID, focus_session: AppMmFocusSessionUpdate):
+async def update_focus_session(focus_session_id: UUID, focus_session: AppMmFocusSessionUpdate):
     """Update focus session by ID"""
-    updated_focus_session = AppMmFocusSessionService.update_focus_session(focus_session_id, focus_session)
+    updated_focus_session = await AppMmFocusSessionService.update_focus_session(focus_session_id, focus_session)
     if not updated_focus_session:
         return ApiResponse.error({"message": "Focus session not found"})
     return ApiResponse.success(updated_focus_session)
 
 @router.delete("/delete-by-guid/{focus_session_id}", response_model=ApiResponse[dict])
-def delete_focus_session(focus_session_id: UUID):
+async def delete_focus_session(focus_session_id: UUID):
     """Delete focus session by ID"""
-    success = AppMmFocusSessionService.delete_focus_session(focus_session_id)
+    success = await AppMmFocusSessionService.delete_focus_session(focus_session_id)
     if not success:
         return ApiResponse.error({"message": "Focus session not found"})
     return ApiResponse.success({"message": "Focus session deleted successfully"})
 
-@router.post("/get-by-criteria", response_model=ApiResponse[List[AppMmFocusSessionResponse]], status_code=status.HTTP_201_CREATED)
-def get_focus_session_by_criteria(query_criteria: FocusSessionQueryCriteria):
+@router.post("/get-by-criteria", response_model=ApiResponse[Union[PageResponse[AppMmFocusSessionResponse], dict]], status_code=status.HTTP_201_CREATED)
+async def get_focus_session_by_criteria(query_criteria: FocusSessionQueryCriteria):
     """Get focus sessions by criteria"""
     try:
-        focus_sessions = AppMmFocusSessionService.get_focus_sessions_by_criteria(query_criteria)
+        focus_sessions = await AppMmFocusSessionService.get_focus_sessions_by_criteria(query_criteria)
         return ApiResponse.success(focus_sessions)
     except Exception as e:
-        return ApiResponse.error({"message": str(e)})
\ No newline at end of file
+        return ApiResponse.error({"message": str(e)})
+
+@router.get("/get-stats-by-user/{user_guid}", response_model=ApiResponse[AppMmFocusSessionUserStatsResponse])
+async def get_focus_session_stats_by_user(user_guid: UUID):
+    """Get precomputed focus totals for a user, overall and per book"""
+    stats = await AppMmFocusSessionRollupService.get_user_stats(user_guid)
+    return ApiResponse.success(stats)
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from uuid import UUID
+from typing import Union
+from model.job.app_mm_job import AppMmJobResponse
+from service.job.app_mm_job_service import AppMmJobService
+from model.api_response import ApiResponse
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/get-by-guid/{job_id}", response_model=ApiResponse[Union[AppMmJobResponse, dict]])
+async def get_job(job_id: UUID):
+    """Get background job status by ID"""
+    try:
+        job = await AppMmJobService.get_job_by_id(job_id)
+    except Exception as e:
+        return ApiResponse.error({"message": str(e)})
+    if not job:
+        return ApiResponse.error({"message": "Job not found"})
+    return ApiResponse.success(job)
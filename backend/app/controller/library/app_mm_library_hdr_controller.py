@@ -1,70 +1,94 @@
 from fastapi import APIRouter, HTTPException, status
 from uuid import UUID
-from typing import List
+from typing import Optional, Union
 from model.library.app_mm_library_hdr import AppMmLibraryHdrCreate, AppMmLibraryHdrUpdate, AppMmLibraryHdrResponse, AppMmLibraryHdrWithFileResponse
 from service.library.app_mm_library_hdr_service import AppMmLibraryHdrService
 from service.library.book_search_service import BookSearchService
+from service.file.app_mm_file_upload_service import AppMmFileUploadService
 from model.api_response import ApiResponse
+from model.page_response import PageResponse
 from model.dto.book_search_dto import BookSearchRequestDto, BookSearchResponseDto
 from model.dto.app_mm_library_hdr_query_criteria import LibraryHdrQueryCriteria
 
 router = APIRouter(prefix="/librarys", tags=["library"])
 
 @router.post("/create", response_model=ApiResponse[AppMmLibraryHdrResponse], status_code=status.HTTP_201_CREATED)
-def create_library_hdr(library_hdr: AppMmLibraryHdrCreate):
+async def create_library_hdr(library_hdr: AppMmLibraryHdrCreate):
     """Create a new library header"""
     try:
-        result = AppMmLibraryHdrService.create_library_hdr(library_hdr)
+        # The record holds its own reference on an existing cover file, released when the record is deleted
+        if library_hdr.file_guid and not await AppMmFileUploadService.acquire_file_upload(library_hdr.file_guid):
+            return ApiResponse.error({"message": "File upload not found"})
+        
+        try:
+            result = await AppMmLibraryHdrService.create_library_hdr(library_hdr)
+        except Exception:
+            if library_hdr.file_guid:
+                await AppMmFileUploadService.delete_file_upload(library_hdr.file_guid)
+            raise
+        
         return ApiResponse.success(result)
     except Exception as e:
         return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-guid/{library_hdr_id}", response_model=ApiResponse[AppMmLibraryHdrResponse])
-def get_library_hdr(library_hdr_id: UUID):
+@router.get("/get-by-guid/{library_hdr_id}", response_model=ApiResponse[Union[AppMmLibraryHdrResponse, dict]])
+async def get_library_hdr(library_hdr_id: UUID, fields: Optional[str] = None):
     """Get library header by ID"""
-    library_hdr = AppMmLibraryHdrService.get_library_hdr_by_id(library_hdr_id)
+    try:
+        library_hdr = await AppMmLibraryHdrService.get_library_hdr_by_id(library_hdr_id, fields=fields)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
     if not library_hdr:
         return ApiResponse.error({"message": "Library header not found"})
     return ApiResponse.success(library_hdr)
 
-@router.get("/get-all", response_model=ApiResponse[List[AppMmLibraryHdrResponse]])
-def get_all_library_hdrs():
+@router.get("/get-all", response_model=ApiResponse[Union[PageResponse[AppMmLibraryHdrResponse], dict]])
+async def get_all_library_hdrs(limit: Optional[int] = None, cursor: Optional[str] = None):
     """Get all library headers"""
-    libraries = AppMmLibraryHdrService.get_all_library_hdrs()
-    return ApiResponse.success(libraries)
+    try:
+        libraries = await AppMmLibraryHdrService.get_all_library_hdrs(limit=limit, cursor=cursor)
+        return ApiResponse.success(libraries)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-user/{user_guid}", response_model=ApiResponse[List[AppMmLibraryHdrResponse]])
-def get_library_hdrs_by_user(user_guid: UUID):
+@router.get("/get-by-user/{user_guid}", response_model=ApiResponse[Union[PageResponse[AppMmLibraryHdrResponse], dict]])
+async def get_library_hdrs_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get all library headers for a specific user"""
-    libraries = AppMmLibraryHdrService.get_library_hdrs_by_user(user_guid)
-    return ApiResponse.success(libraries)
+    try:
+        libraries = await AppMmLibraryHdrService.get_library_hdrs_by_user(user_guid, limit=limit, cursor=cursor, fields=fields)
+        return ApiResponse.success(libraries)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
 @router.put("/update/{library_hdr_id}", response_model=ApiResponse[AppMmLibraryHdrResponse])
-def update_library_hdr(library_hdr_id: UUID, library_hdr: AppMmLibraryHdrUpdate):
+async def update_library_hdr(library_hdr_id: UUID, library_hdr: AppMmLibraryHdrUpdate):
     """Update library header by ID"""
-    updated_library_hdr = AppMmLibraryHdrService.update_library_hdr(library_hdr_id, library_hdr)
+    try:
+        updated_library_hdr = await AppMmLibraryHdrService.update_library_hdr(library_hdr_id, library_hdr)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
     if not updated_library_hdr:
         return ApiResponse.error({"message": "Library header not found"})
     return ApiResponse.success(updated_library_hdr)
 
 @router.put("/update-last-read/{library_hdr_id}", response_model=ApiResponse[AppMmLibraryHdrResponse])
-def update_last_read_library_hdr(library_hdr_id: UUID):
+async def update_last_read_library_hdr(library_hdr_id: UUID):
     """Update last read time of the library"""
-    updated_library_hdr = AppMmLibraryHdrService.update_last_read(library_hdr_id)
+    updated_library_hdr = await AppMmLibraryHdrService.update_last_read(library_hdr_id)
     if not updated_library_hdr:
         return ApiResponse.error({"message": "Library header not found"})
     return ApiResponse.success(updated_library_hdr)
 
 @router.delete("/delete-by-guid/{library_hdr_id}", response_model=ApiResponse[dict])
-def delete_library_hdr(library_hdr_id: UUID):
+async def delete_library_hdr(library_hdr_id: UUID):
     """Delete library header by ID"""
-    success = AppMmLibraryHdrService.delete_library_hdr(library_hdr_id)
+    success = await AppMmLibraryHdrService.delete_library_hdr(library_hdr_id)
     if not success:
         return ApiResponse.error({"message": "Library header not found"})
     return ApiResponse.success({"message": "Library header deleted successfully"})
 
 @router.post("/search-book", response_model=ApiResponse)
-def search_library_hdr(searchDto: BookSearchRequestDto):
+async def search_library_hdr(searchDto: BookSearchRequestDto):
     """
     Search for a book by name. First checks local database, then Google Books API.
     
@@ -82,7 +106,7 @@ def search_library_hdr(searchDto: BookSearchRequestDto):
     Output: Book cover image URL, description, and author name
     """
     try:
-        result = BookSearchService.search_book(searchDto.book_name, searchDto.user_guid)
+        result = await BookSearchService.search_book(searchDto.book_name, searchDto.user_guid)
         
         if not result:
             return ApiResponse.error({"message": f"Book '{searchDto.book_name}' not found"})
@@ -92,14 +116,17 @@ def search_library_hdr(searchDto: BookSearchRequestDto):
         return ApiResponse.error({"message": f"Error searching for book: {str(e)}"})
 
 
-@router.post("/get-by-criteria", response_model=ApiResponse[List[AppMmLibraryHdrWithFileResponse]], status_code=status.HTTP_201_CREATED)
-def get_library_by_criteria(query_criteria: LibraryHdrQueryCriteria):
-    """Get library hdrs by criteria with file storage path, ordered by last_read descending"""
+@router.post("/get-by-criteria", response_model=ApiResponse[Union[PageResponse[AppMmLibraryHdrWithFileResponse], dict]], status_code=status.HTTP_201_CREATED)
+async def get_library_by_criteria(query_criteria: LibraryHdrQueryCriteria):
+    """Get library hdrs by criteria with file storage path, ordered by last_read descending (by title similarity when book_name is set)"""
     try:
-        libraries = AppMmLibraryHdrService.get_library_hdrs_by_criteria(
+        libraries = await AppMmLibraryHdrService.get_library_hdrs_by_criteria(
             guid=query_criteria.guid,
             user_guid=query_criteria.user_guid,
-            book_name=query_criteria.book_name
+            book_name=query_criteria.book_name,
+            limit=query_criteria.limit,
+            cursor=query_criteria.cursor,
+            variant=query_criteria.variant
         )
         return ApiResponse.success(libraries)
     except Exception as e:
@@ -1,59 +1,81 @@
 from fastapi import APIRouter, HTTPException, status
 from uuid import UUID
-from typing import List
-from model.notebook.app_mm_notebook_content import AppMmNotebookContentCreate, AppMmNotebookContentUpdate, AppMmNotebookContentResponse
+from typing import List, Optional, Union
+from model.notebook.app_mm_notebook_content import AppMmNotebookContentCreate, AppMmNotebookContentBulkCreate, AppMmNotebookContentUpdate, AppMmNotebookContentResponse
 from service.notebook.app_mm_notebook_content_service import AppMmNotebookContentService
 from model.api_response import ApiResponse
+from model.page_response import PageResponse
 
 router = APIRouter(prefix="/notebook-contents", tags=["notebook-contents"])
 
 @router.post("/create", response_model=ApiResponse[AppMmNotebookContentResponse], status_code=status.HTTP_201_CREATED)
-def create_notebook_content(content: AppMmNotebookContentCreate):
+async def create_notebook_content(content: AppMmNotebookContentCreate):
     """Create a new notebook content entry"""
     try:
-        result = AppMmNotebookContentService.create_notebook_content(content)
+        result = await AppMmNotebookContentService.create_notebook_content(content)
         return ApiResponse.success(result)
     except Exception as e:
         return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-guid/{content_id}", response_model=ApiResponse[AppMmNotebookContentResponse])
-def get_notebook_content(content_id: UUID):
+@router.post("/bulk-create", response_model=ApiResponse[Union[List[AppMmNotebookContentResponse], dict]], status_code=status.HTTP_201_CREATED)
+async def bulk_create_notebook_contents(bulk_content: AppMmNotebookContentBulkCreate):
+    """Create a batch of notebook contents with server assigned sequence numbers"""
+    try:
+        result = await AppMmNotebookContentService.bulk_create_notebook_contents(bulk_content)
+        return ApiResponse.success(result)
+    except Exception as e:
+        return ApiResponse.error({"message": str(e)})
+
+@router.get("/get-by-guid/{content_id}", response_model=ApiResponse[Union[AppMmNotebookContentResponse, dict]])
+async def get_notebook_content(content_id: UUID, fields: Optional[str] = None):
     """Get notebook content by ID"""
-    content = AppMmNotebookContentService.get_notebook_content_by_id(content_id)
+    try:
+        content = await AppMmNotebookContentService.get_notebook_content_by_id(content_id, fields=fields)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
     if not content:
         return ApiResponse.error({"message": "Notebook content not found"})
     return ApiResponse.success(content)
 
-@router.get("/get-all", response_model=ApiResponse[List[AppMmNotebookContentResponse]])
-def get_all_notebook_contents():
+@router.get("/get-all", response_model=ApiResponse[Union[PageResponse[AppMmNotebookContentResponse], dict]])
+async def get_all_notebook_contents(limit: Optional[int] = None, cursor: Optional[str] = None):
     """Get all notebook contents"""
-    contents = AppMmNotebookContentService.get_all_notebook_contents()
-    return ApiResponse.success(contents)
+    try:
+        contents = await AppMmNotebookContentService.get_all_notebook_contents(limit=limit, cursor=cursor)
+        return ApiResponse.success(contents)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-notebook-hdr/{notebook_hdr_guid}", response_model=ApiResponse[List[AppMmNotebookContentResponse]])
-def get_contents_by_notebook_hdr(notebook_hdr_guid: UUID):
+@router.get("/get-by-notebook-hdr/{notebook_hdr_guid}", response_model=ApiResponse[Union[PageResponse[AppMmNotebookContentResponse], dict]])
+async def get_contents_by_notebook_hdr(notebook_hdr_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get all contents for a specific notebook header"""
-    contents = AppMmNotebookContentService.get_contents_by_notebook_hdr(notebook_hdr_guid)
-    return ApiResponse.success(contents)
+    try:
+        contents = await AppMmNotebookContentService.get_contents_by_notebook_hdr(notebook_hdr_guid, limit=limit, cursor=cursor, fields=fields)
+        return ApiResponse.success(contents)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-user/{user_guid}", response_model=ApiResponse[List[AppMmNotebookContentResponse]])
-def get_contents_by_user(user_guid: UUID):
+@router.get("/get-by-user/{user_guid}", response_model=ApiResponse[Union[PageResponse[AppMmNotebookContentResponse], dict]])
+async def get_contents_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get all contents for a specific user"""
-    contents = AppMmNotebookContentService.get_contents_by_user(user_guid)
-    return ApiResponse.success(contents)
+    try:
+        contents = await AppMmNotebookContentService.get_contents_by_user(user_guid, limit=limit, cursor=cursor, fields=fields)
+        return ApiResponse.success(contents)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
 @router.put("/update/{content_id}", response_model=ApiResponse[AppMmNotebookContentResponse])
-def update_notebook_content(content_id: UUID, content: AppMmNotebookContentUpdate):
+async def update_notebook_content(content_id: UUID, content: AppMmNotebookContentUpdate):
     """Update notebook content by ID"""
-    updated_content = AppMmNotebookContentService.update_notebook_content(content_id, content)
+    updated_content = await AppMmNotebookContentService.update_notebook_content(content_id, content)
     if not updated_content:
         return ApiResponse.error({"message": "Notebook content not found"})
     return ApiResponse.success(updated_content)
 
 @router.delete("/delete-by-guid/{content_id}", response_model=ApiResponse[dict])
-def delete_notebook_content(content_id: UUID):
+async def delete_notebook_content(content_id: UUID):
     """Delete notebook content by ID"""
-    success = AppMmNotebookContentService.delete_notebook_content(content_id)
+    success = await AppMmNotebookContentService.delete_notebook_content(content_id)
     if not success:
         return ApiResponse.error({"message": "Notebook content not found"})
     return ApiResponse.success({"message": "Notebook content deleted successfully"})
@@ -1,82 +1,116 @@
-from fastapi import APIRouter, status, UploadFile, File, Form
-from uuid import UUID, uuid4
-from typing import List, Optional
-import os
+from fastapi import APIRouter, status, UploadFile, File, Form, Request
+from uuid import UUID
+from typing import List, Optional, Union
 from model.notebook.app_mm_notebook_content_file_link import (
     AppMmNotebookContentFileLinkCreate,
     AppMmNotebookContentFileLinkUpdate,
     AppMmNotebookContentFileLinkResponse
 )
-from model.file.app_mm_file_upload import AppMmFileUploadCreate
 from service.notebook.app_mm_notebook_content_file_link_service import NotebookContentFileLinkService
 from service.file.app_mm_file_upload_service import AppMmFileUploadService
-from util.supabase_config import supabase_admin
+from service.file.file_store_service import FileStoreService
+from service.repository.keyset_pagination import MAX_PAGE_SIZE
+from util.settings import get_settings
+from util.storage_url import build_public_urls
+from util.image_variants import validate_variant
 from model.api_response import ApiResponse
-from dotenv import load_dotenv
+from model.page_response import PageResponse
 
-load_dotenv()
+# Allowance for multipart boundaries and form fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
 
 router = APIRouter(prefix="/notebook-content-file-links", tags=["notebook-content-file-links"])
 
 @router.post("/create", response_model=ApiResponse[AppMmNotebookContentFileLinkResponse], status_code=status.HTTP_201_CREATED)
-def create_link(link: AppMmNotebookContentFileLinkCreate):
+async def create_link(link: AppMmNotebookContentFileLinkCreate):
     """Create a new notebook content file link"""
     try:
-        result = NotebookContentFileLinkService.create(link)
+        # The link holds its own reference on an existing file, released when the link is deleted
+        if link.file_upload_guid and not await AppMmFileUploadService.acquire_file_upload(link.file_upload_guid):
+            return ApiResponse.error({"message": "File upload not found"})
+        
+        try:
+            result = await NotebookContentFileLinkService.create(link)
+        except Exception:
+            if link.file_upload_guid:
+                await AppMmFileUploadService.delete_file_upload(link.file_upload_guid)
+            raise
+        
         return ApiResponse.success(result)
     except Exception as e:
         return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-guid/{link_id}", response_model=ApiResponse[AppMmNotebookContentFileLinkResponse])
-def get_link(link_id: UUID):
+@router.get("/get-by-guid/{link_id}", response_model=ApiResponse[Union[AppMmNotebookContentFileLinkResponse, dict]])
+async def get_link(link_id: UUID, fields: Optional[str] = None):
     """Get notebook content file link by GUID"""
-    link = NotebookContentFileLinkService.get_by_guid(link_id)
+    try:
+        link = await NotebookContentFileLinkService.get_by_guid(link_id, fields=fields)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
     if not link:
         return ApiResponse.error({"message": "Notebook content file link not found"})
     return ApiResponse.success(link)
 
-@router.get("/get-all", response_model=ApiResponse[List[AppMmNotebookContentFileLinkResponse]])
-def get_all_links():
+@router.get("/get-all", response_model=ApiResponse[Union[PageResponse[AppMmNotebookContentFileLinkResponse], dict]])
+async def get_all_links(limit: Optional[int] = None, cursor: Optional[str] = None):
     """Get all notebook content file links"""
-    links = NotebookContentFileLinkService.get_all()
-    return ApiResponse.success(links)
+    try:
+        links = await NotebookContentFileLinkService.get_all(limit=limit, cursor=cursor)
+        return ApiResponse.success(links)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-user/{user_guid}", response_model=ApiResponse[List[AppMmNotebookContentFileLinkResponse]])
-def get_links_by_user(user_guid: UUID):
+@router.get("/get-by-user/{user_guid}", response_model=ApiResponse[Union[PageResponse[AppMmNotebookContentFileLinkResponse], dict]])
+async def get_links_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get all notebook content file links by user GUID"""
-    links = NotebookContentFileLinkService.get_by_user(user_guid)
-    return ApiResponse.success(links)
+    try:
+        links = await NotebookContentFileLinkService.get_by_user(user_guid, limit=limit, cursor=cursor, fields=fields)
+        return ApiResponse.success(links)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-notebook-hdr/{notebook_hdr_guid}", response_model=ApiResponse[List[AppMmNotebookContentFileLinkResponse]])
-def get_links_by_notebook_hdr(notebook_hdr_guid: UUID):
+@router.get("/get-by-notebook-hdr/{notebook_hdr_guid}", response_model=ApiResponse[Union[PageResponse[AppMmNotebookContentFileLinkResponse], dict]])
+async def get_links_by_notebook_hdr(notebook_hdr_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get all notebook content file links by notebook header GUID"""
-    links = NotebookContentFileLinkService.get_by_notebook_hdr(notebook_hdr_guid)
-    return ApiResponse.success(links)
+    try:
+        links = await NotebookContentFileLinkService.get_by_notebook_hdr(notebook_hdr_guid, limit=limit, cursor=cursor, fields=fields)
+        return ApiResponse.success(links)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-notebook-content/{notebook_content_guid}", response_model=ApiResponse[List[AppMmNotebookContentFileLinkResponse]])
-def get_links_by_notebook_content(notebook_content_guid: UUID):
+@router.get("/get-by-notebook-content/{notebook_content_guid}", response_model=ApiResponse[Union[PageResponse[AppMmNotebookContentFileLinkResponse], dict]])
+async def get_links_by_notebook_content(notebook_content_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get all notebook content file links by notebook content GUID"""
-    links = NotebookContentFileLinkService.get_by_notebook_content(notebook_content_guid)
-    return ApiResponse.success(links)
+    try:
+        links = await NotebookContentFileLinkService.get_by_notebook_content(notebook_content_guid, limit=limit, cursor=cursor, fields=fields)
+        return ApiResponse.success(links)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-file-upload/{file_upload_guid}", response_model=ApiResponse[List[AppMmNotebookContentFileLinkResponse]])
-def get_links_by_file_upload(file_upload_guid: UUID):
+@router.get("/get-by-file-upload/{file_upload_guid}", response_model=ApiResponse[Union[PageResponse[AppMmNotebookContentFileLinkResponse], dict]])
+async def get_links_by_file_upload(file_upload_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get all notebook content file links by file upload GUID"""
-    links = NotebookContentFileLinkService.get_by_file_upload(file_upload_guid)
-    return ApiResponse.success(links)
+    try:
+        links = await NotebookContentFileLinkService.get_by_file_upload(file_upload_guid, limit=limit, cursor=cursor, fields=fields)
+        return ApiResponse.success(links)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
 @router.put("/update/{link_id}", response_model=ApiResponse[AppMmNotebookContentFileLinkResponse])
-def update_link(link_id: UUID, link: AppMmNotebookContentFileLinkUpdate):
+async def update_link(link_id: UUID, link: AppMmNotebookContentFileLinkUpdate):
     """Update notebook content file link by GUID"""
-    updated_link = NotebookContentFileLinkService.update(link_id, link)
+    try:
+        updated_link = await NotebookContentFileLinkService.update(link_id, link)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
     if not updated_link:
         return ApiResponse.error({"message": "Notebook content file link not found"})
     return ApiResponse.success(updated_link)
 
 @router.delete("/delete-by-guid/{link_id}", response_model=ApiResponse[dict])
-def delete_link(link_id: UUID):
+async def delete_link(link_id: UUID):
     """Delete notebook content file link by GUID"""
-    success = NotebookContentFileLinkService.delete_by_guid(link_id)
+    success = await NotebookContentFileLinkService.delete_by_guid(link_id)
     if not success:
         return ApiResponse.error({"message": "Notebook content file link not found"})
     return ApiResponse.success({"message": "Notebook content file link deleted successfully"})
@@ -84,6 +118,7 @@ def delete_link(link_id: UUID):
 
 @router.post("/upload-file", response_model=ApiResponse[AppMmNotebookContentFileLinkResponse], status_code=status.HTTP_201_CREATED)
 async def upload_notebook_content_file(
+    request: Request,
     file: UploadFile = File(...),
     user_guid: str = Form(...),
     notebook_hdr_guid: str = Form(...),
@@ -96,38 +131,19 @@ async def upload_notebook_content_file(
     """
     try:
         # Get environment variables
-        storage_bucket = os.environ.get("SUPABASE_STORAGE_BUCKET")
-        storage_folder = os.environ.get("SUPABASE_STORAGE_FOLDER_NOTEBOOK_CONTENT")
+        storage_bucket = get_settings().supabase_storage_bucket
+        storage_folder = get_settings().supabase_storage_folder_notebook_content
         
         if not storage_bucket or not storage_folder:
             return ApiResponse.error({"message": "Storage configuration missing"})
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Determine file extension from content type or filename
-        content_type = file.content_type or "image/jpeg"
-        extension = content_type.split("/")[-1]
-        if extension not in ["jpeg", "jpg", "png", "webp", "gif"]:
-            # Try to get extension from filename
-            if file.filename and "." in file.filename:
-                extension = file.filename.split(".")[-1]
-            else:
-                extension = "jpg"
-        
-        # Generate unique filename
-        filename = f"notebook_content_{uuid4()}.{extension}"
-        storage_path = f"{storage_folder}/{filename}"
-        
-        # Upload to Supabase storage using admin client (bypasses RLS)
-        supabase_admin.storage.from_(storage_bucket).upload(
-            storage_path,
-            file_content,
-            {"content-type": content_type}
-        )
+        # Reject an oversized request from its declared length before touching the body
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > FileStoreService.MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+            return ApiResponse.error({"message": f"File exceeds the {FileStoreService.MAX_UPLOAD_BYTES // (1024 * 1024)}MB upload limit"})
         
-        # Get public URL for the uploaded file
-        public_url = supabase_admin.storage.from_(storage_bucket).get_public_url(storage_path)
+        # Stream the file in chunks: size limit, hash and the real type (from magic bytes) are checked as it is read
+        upload = await FileStoreService.spool(file)
         
         # Parse highlight_metadata if provided (expecting JSON string)
         metadata_dict = None
@@ -138,22 +154,24 @@ async def upload_notebook_content_file(
             except json.JSONDecodeError:
                 pass
         
-        # Create file upload record
-        file_create = AppMmFileUploadCreate(
-            user_guid=UUID(user_guid),
-            file_name=filename,
-            mime_type=content_type,
-            storage_path=storage_path,
-            bucket_name=storage_bucket,
-            is_public=True,
-            metadata={
-                "source": "notebook_content",
-                "original_filename": file.filename,
-                "notebook_hdr_guid": notebook_hdr_guid
-            }
-        )
-        
-        file_record = AppMmFileUploadService.create_file_upload(file_create)
+        # Store the bytes once, a repeat upload reuses the existing object and file upload record
+        try:
+            file_record = await FileStoreService.store(
+                upload,
+                user_guid=UUID(user_guid),
+                bucket_name=storage_bucket,
+                folder=storage_folder,
+                metadata={
+                    "source": "notebook_content",
+                    "original_filename": file.filename,
+                    "notebook_hdr_guid": notebook_hdr_guid
+                }
+            )
+        finally:
+            upload.close()
+        
+        # Public URL is denormalized into the file upload record
+        public_url = file_record.public_url
         
         # Create notebook content file link record
         link_create = AppMmNotebookContentFileLinkCreate(
@@ -165,7 +183,12 @@ async def upload_notebook_content_file(
             highlight_metadata=metadata_dict
         )
         
-        link_record = NotebookContentFileLinkService.create(link_create)
+        try:
+            link_record = await NotebookContentFileLinkService.create(link_create)
+        except Exception:
+            # The stored file's reference belonged to this link
+            await AppMmFileUploadService.delete_file_upload(file_record.guid)
+            raise
         
         return ApiResponse.success(link_record)
         
@@ -173,11 +196,13 @@ async def upload_notebook_content_file(
         return ApiResponse.error({"message": f"Failed to upload file: {str(e)}"})
 
 @router.get("/get-attachment-by-content/{content_guid}", response_model=ApiResponse[List[dict]])
-def get_file_attachment_by_content(content_guid: UUID):
-    """Get file attachments with public URLs and highlight metadata for a specific notebook content"""
+async def get_file_attachment_by_content(content_guid: UUID, variant: Optional[str] = None):
+    """Get file attachments with public URLs (optionally a sized image variant) and highlight metadata for a specific notebook content"""
     try:
+        variant = validate_variant(variant)
+        
         # Get all file links for this content
-        file_links = NotebookContentFileLinkService.get_by_notebook_content(content_guid)
+        file_links = (await NotebookContentFileLinkService.get_by_notebook_content(content_guid, limit=MAX_PAGE_SIZE)).items
         
         if not file_links:
             return ApiResponse.success([])
@@ -192,31 +217,29 @@ def get_file_attachment_by_content(content_guid: UUID):
             return ApiResponse.success([])
         
         # Fetch file upload records
-        from util.supabase_config import supabase
-        file_response = supabase.table("app_mm_file_upload").select("guid, storage_path, bucket_name").in_("guid", [str(guid) for guid in file_upload_guids]).execute()
+        file_records = await AppMmFileUploadService.get_file_uploads_by_ids(file_upload_guids)
         
-        if not file_response.data:
+        if not file_records:
             return ApiResponse.success([])
         
         # Build result with public URLs and highlight metadata
+        public_urls = build_public_urls(file_records, variant=variant)
         result = []
-        for file_record in file_response.data:
-            try:
-                # Get public URL from Supabase storage
-                public_url = supabase.storage.from_(file_record["bucket_name"]).get_public_url(file_record["storage_path"])
-                
-                # Get the corresponding file_link to retrieve highlight_metadata
-                file_link = file_link_map.get(file_record["guid"])
-                
-                result.append({
-                    "content_guid": str(content_guid),
-                    "file_path": public_url,
-                    "highlight_metadata": file_link.highlight_metadata if file_link else None
-                })
-            except Exception as e:
-                print(f"Error getting public URL for {file_record['guid']}: {str(e)}")
-                # Skip files that fail to get public URL
+        for file_record in file_records:
+            public_url = public_urls.get(str(file_record.guid))
+            
+            # Skip files without a resolvable public URL
+            if not public_url:
                 continue
+            
+            # Get the corresponding file_link to retrieve highlight_metadata
+            file_link = file_link_map.get(str(file_record.guid))
+            
+            result.append({
+                "content_guid": str(content_guid),
+                "file_path": public_url,
+                "highlight_metadata": file_link.highlight_metadata if file_link else None
+            })
         
         return ApiResponse.success(result)
         
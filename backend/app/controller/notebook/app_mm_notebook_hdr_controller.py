@@ -1,61 +1,87 @@
 from fastapi import APIRouter, HTTPException, status
 from uuid import UUID
-from typing import List, Union
+from typing import Optional, Union
 from model.notebook.app_mm_notebook_hdr import AppMmNotebookHdrCreate, AppMmNotebookHdrUpdate, AppMmNotebookHdrResponse
 from service.notebook.app_mm_notebook_hdr_service import AppMmNotebookHdrService
+from service.notebook.notebook_open_service import NotebookOpenService
+from model.dto.notebook_open_dto import NotebookOpenResponseDto
 from model.api_response import ApiResponse
+from model.page_response import PageResponse
 
 router = APIRouter(prefix="/notebooks", tags=["notebook"])
 
 @router.post("/create", response_model=ApiResponse[AppMmNotebookHdrResponse], status_code=status.HTTP_201_CREATED)
-def create_notebook_hdr(notebook_hdr: AppMmNotebookHdrCreate):
+async def create_notebook_hdr(notebook_hdr: AppMmNotebookHdrCreate):
     """Create a new notebook header"""
     try:
-        result = AppMmNotebookHdrService.create_notebook_hdr(notebook_hdr)
+        result = await AppMmNotebookHdrService.create_notebook_hdr(notebook_hdr)
         return ApiResponse.success(result)
     except Exception as e:
         return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-guid/{notebook_hdr_id}", response_model=ApiResponse[AppMmNotebookHdrResponse])
-def get_notebook_hdr(notebook_hdr_id: UUID):
+@router.get("/get-by-guid/{notebook_hdr_id}", response_model=ApiResponse[Union[AppMmNotebookHdrResponse, dict]])
+async def get_notebook_hdr(notebook_hdr_id: UUID, fields: Optional[str] = None):
     """Get notebook header by ID"""
-    notebook_hdr = AppMmNotebookHdrService.get_notebook_hdr_by_id(notebook_hdr_id)
+    try:
+        notebook_hdr = await AppMmNotebookHdrService.get_notebook_hdr_by_id(notebook_hdr_id, fields=fields)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
     if not notebook_hdr:
         return ApiResponse.error({"message": "Notebook header not found"})
     return ApiResponse.success(notebook_hdr)
 
-@router.get("/get-all", response_model=ApiResponse[List[AppMmNotebookHdrResponse]])
-def get_all_notebook_hdrs():
+@router.get("/open/{notebook_hdr_id}", response_model=ApiResponse[Union[NotebookOpenResponseDto, dict]])
+async def open_notebook(notebook_hdr_id: UUID, limit: Optional[int] = None, cursor: Optional[str] = None):
+    """Get a notebook header with its ordered contents and their attachments in one call"""
+    try:
+        notebook = await NotebookOpenService.open_notebook(notebook_hdr_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
+    if not notebook:
+        return ApiResponse.error({"message": "Notebook header not found"})
+    return ApiResponse.success(notebook)
+
+@router.get("/get-all", response_model=ApiResponse[Union[PageResponse[AppMmNotebookHdrResponse], dict]])
+async def get_all_notebook_hdrs(limit: Optional[int] = None, cursor: Optional[str] = None):
     """Get all notebook headers"""
-    notebooks = AppMmNotebookHdrService.get_all_notebook_hdrs()
-    return ApiResponse.success(notebooks)
+    try:
+        notebooks = await AppMmNotebookHdrService.get_all_notebook_hdrs(limit=limit, cursor=cursor)
+        return ApiResponse.success(notebooks)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-user/{user_guid}", response_model=ApiResponse[List[AppMmNotebookHdrResponse]])
-def get_notebook_hdrs_by_user(user_guid: UUID):
+@router.get("/get-by-user/{user_guid}", response_model=ApiResponse[Union[PageResponse[AppMmNotebookHdrResponse], dict]])
+async def get_notebook_hdrs_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get all notebook headers for a specific user"""
-    notebooks = AppMmNotebookHdrService.get_notebook_hdrs_by_user(user_guid)
-    return ApiResponse.success(notebooks)
+    try:
+        notebooks = await AppMmNotebookHdrService.get_notebook_hdrs_by_user(user_guid, limit=limit, cursor=cursor, fields=fields)
+        return ApiResponse.success(notebooks)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
 @router.get("/get-by-library/{library_hdr_guid}", response_model=ApiResponse[Union[AppMmNotebookHdrResponse, dict]])
-def get_notebook_hdrs_by_library(library_hdr_guid: UUID):
+async def get_notebook_hdrs_by_library(library_hdr_guid: UUID, fields: Optional[str] = None):
     """Get first notebook header for a specific library"""
-    notebook = AppMmNotebookHdrService.get_notebook_hdrs_by_library(library_hdr_guid)
+    try:
+        notebook = await AppMmNotebookHdrService.get_notebook_hdrs_by_library(library_hdr_guid, fields=fields)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
     if not notebook:
         return ApiResponse.error({"message": "NOTEBOOK_HDR_BY_LIBRARY_NOT_FOUND"})
     return ApiResponse.success(notebook)
 
 @router.put("/update/{notebook_hdr_id}", response_model=ApiResponse[AppMmNotebookHdrResponse])
-def update_notebook_hdr(notebook_hdr_id: UUID, notebook_hdr: AppMmNotebookHdrUpdate):
+async def update_notebook_hdr(notebook_hdr_id: UUID, notebook_hdr: AppMmNotebookHdrUpdate):
     """Update notebook header by ID"""
-    updated_notebook_hdr = AppMmNotebookHdrService.update_notebook_hdr(notebook_hdr_id, notebook_hdr)
+    updated_notebook_hdr = await AppMmNotebookHdrService.update_notebook_hdr(notebook_hdr_id, notebook_hdr)
     if not updated_notebook_hdr:
         return ApiResponse.error({"message": "Notebook header not found"})
     return ApiResponse.success(updated_notebook_hdr)
 
 @router.delete("/delete-by-guid/{notebook_hdr_id}", response_model=ApiResponse[dict])
-def delete_notebook_hdr(notebook_hdr_id: UUID):
+async def delete_notebook_hdr(notebook_hdr_id: UUID):
     """Delete notebook header by ID"""
-    success = AppMmNotebookHdrService.delete_notebook_hdr(notebook_hdr_id)
+    success = await AppMmNotebookHdrService.delete_notebook_hdr(notebook_hdr_id)
     if not success:
         return ApiResponse.error({"message": "Notebook header not found"})
     return ApiResponse.success({"message": "Notebook header deleted successfully"})
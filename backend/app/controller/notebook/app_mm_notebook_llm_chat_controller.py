@@ -0,0 +1,59 @@
+import json
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from uuid import UUID
+from typing import Any, AsyncIterator, Dict
+from pydantic import ValidationError
+from service.notebook.notebook_llm_chat_service import NotebookLlmChatService
+from model.dto.notebook_llm_chat_dto import NotebookLlmChatMessageDto
+
+router = APIRouter(prefix="/notebook-llm-chats", tags=["notebook-llm-chats"])
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+@router.post("/stream/{chat_hdr_id}")
+async def stream_chat_reply(chat_hdr_id: UUID, chat_message: NotebookLlmChatMessageDto):
+    """
+    Send a message to the chat model and stream the reply as Server-Sent Events: "token" events as the
+    text arrives, then "done" with the saved transcripts, or "error"
+    """
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event in NotebookLlmChatService.stream_reply(chat_hdr_id, chat_message.user_guid, chat_message.message):
+                yield _sse(event)
+        except Exception as e:
+            yield _sse({"type": "error", "message": str(e)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Stop proxies from buffering the stream, which would delay the first token
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws/{chat_hdr_id}")
+async def chat_socket(websocket: WebSocket, chat_hdr_id: UUID):
+    """
+    Chat over a WebSocket: each {"user_guid", "message"} sent by the client is answered with "token"
+    messages and a final "done" (or "error"), as JSON
+    """
+    await websocket.accept()
+    
+    try:
+        while True:
+            try:
+                chat_message = NotebookLlmChatMessageDto(**await websocket.receive_json())
+            except (ValidationError, ValueError, TypeError) as e:
+                await websocket.send_json({"type": "error", "message": f"Invalid message: {str(e)}"})
+                continue
+            
+            try:
+                async for event in NotebookLlmChatService.stream_reply(chat_hdr_id, chat_message.user_guid, chat_message.message):
+                    await websocket.send_json(event)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                await websocket.send_json({"type": "error", "message": str(e)})
+    except WebSocketDisconnect:
+        pass
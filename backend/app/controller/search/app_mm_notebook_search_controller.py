@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from typing import Union
+from model.api_response import ApiResponse
+from model.page_response import PageResponse
+from model.dto.notebook_search_dto import NotebookSearchQueryCriteria, NotebookSearchHit
+from service.search.notebook_search_service import NotebookSearchService
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.post("/notes", response_model=ApiResponse[Union[PageResponse[NotebookSearchHit], dict]])
+async def search_notes(query_criteria: NotebookSearchQueryCriteria):
+    """Full-text search over a user's highlights and chat messages, best match first"""
+    try:
+        hits = await NotebookSearchService.search(
+            user_guid=query_criteria.user_guid,
+            query=query_criteria.query,
+            library_hdr_guid=query_criteria.library_hdr_guid,
+            notebook_hdr_guid=query_criteria.notebook_hdr_guid,
+            sources=query_criteria.sources,
+            limit=query_criteria.limit,
+            cursor=query_criteria.cursor
+        )
+        return ApiResponse.success(hits)
+    except Exception as e:
+        return ApiResponse.error({"message": str(e)})
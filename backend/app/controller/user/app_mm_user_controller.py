@@ -1,47 +1,54 @@
 from fastapi import APIRouter, HTTPException, status
 from uuid import UUID
-from typing import List
+from typing import Optional, Union
 from model.user.app_mm_user import AppMmUserCreate, AppMmUserUpdate, AppMmUserResponse
 from service.user.app_mm_user_service import AppMmUserService
 from model.api_response import ApiResponse
+from model.page_response import PageResponse
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.post("/create", response_model=ApiResponse[AppMmUserResponse], status_code=status.HTTP_201_CREATED)
-def create_user(user: AppMmUserCreate):
+async def create_user(user: AppMmUserCreate):
     """Create a new user"""
     try:
-        result = AppMmUserService.create_user(user)
+        result = await AppMmUserService.create_user(user)
         return ApiResponse.success(result)
     except Exception as e:
         return ApiResponse.error({"message": str(e)})
 
-@router.get("/get-by-guid/{user_id}", response_model=ApiResponse[AppMmUserResponse])
-def get_user(user_id: UUID):
+@router.get("/get-by-guid/{user_id}", response_model=ApiResponse[Union[AppMmUserResponse, dict]])
+async def get_user(user_id: UUID, fields: Optional[str] = None):
     """Get user by ID"""
-    user = AppMmUserService.get_user_by_id(user_id)
+    try:
+        user = await AppMmUserService.get_user_by_id(user_id, fields=fields)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
     if not user:
         return ApiResponse.error({"message": "User not found"})
     return ApiResponse.success(user)
 
-@router.get("/get-all", response_model=ApiResponse[List[AppMmUserResponse]])
-def get_all_users():
+@router.get("/get-all", response_model=ApiResponse[Union[PageResponse[AppMmUserResponse], dict]])
+async def get_all_users(limit: Optional[int] = None, cursor: Optional[str] = None):
     """Get all users"""
-    users = AppMmUserService.get_all_users()
-    return ApiResponse.success(users)
+    try:
+        users = await AppMmUserService.get_all_users(limit=limit, cursor=cursor)
+        return ApiResponse.success(users)
+    except ValueError as e:
+        return ApiResponse.error({"message": str(e)})
 
 @router.put("/update/{user_id}", response_model=ApiResponse[AppMmUserResponse])
-def update_user(user_id: UUID, user: AppMmUserUpdate):
+async def update_user(user_id: UUID, user: AppMmUserUpdate):
     """Update user by ID"""
-    updated_user = AppMmUserService.update_user(user_id, user)
+    updated_user = await AppMmUserService.update_user(user_id, user)
     if not updated_user:
         return ApiResponse.error({"message": "User not found"})
     return ApiResponse.success(updated_user)
 
 @router.delete("/delete-by-guid/{user_id}", response_model=ApiResponse[dict])
-def delete_user(user_id: UUID):
+async def delete_user(user_id: UUID):
     """Delete user by ID"""
-    success = AppMmUserService.delete_user(user_id)
+    success = await AppMmUserService.delete_user(user_id)
     if not success:
         return ApiResponse.error({"message": "User not found"})
     return ApiResponse.success({"message": "User deleted successfully"})
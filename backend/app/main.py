@@ -1,6 +1,6 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
 from controller.user.app_mm_user_controller import router as user_router
 from controller.library.app_mm_library_hdr_controller import router as library_router
 from controller.notebook.app_mm_notebook_hdr_controller import router as notebook_router
@@ -8,12 +8,30 @@ from controller.notebook.app_mm_notebook_content_controller import router as not
 from controller.notebook.app_mm_notebook_content_file_link_controller import router as notebook_content_file_link_router
 from controller.notebook.app_mm_notebook_llm_chat_hdr_controller import router as notebook_llm_chat_hdr_router
 from controller.notebook.app_mm_notebook_llm_chat_transcript_controller import router as notebook_llm_chat_transcript_router
+from controller.notebook.app_mm_notebook_llm_chat_controller import router as notebook_llm_chat_router
 from controller.file.app_mm_file_upload_controller import router as file_upload_router
 from controller.focus_session.app_mm_focus_session_controller import router as focus_session_router
+from controller.job.app_mm_job_controller import router as job_router
+from controller.search.app_mm_notebook_search_controller import router as search_router
+from util.entity_cache import entity_cache
+from util.llm_response_cache import llm_response_cache
+from service.library.book_search_service import get_google_books_cache
+from service.notebook.notebook_content_embedding_service import vector_indexes
+from service.search.notebook_search_service import search_indexes
+from service.job.job_worker import job_worker_pool
+from util.http_client import http_client
+from util.image_variants import shutdown_image_process_pool
 
-load_dotenv()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background jobs (cover downloads etc.) run in this process, MM_JOB_WORKERS=0 turns them off
+    await job_worker_pool.start()
+    yield
+    await job_worker_pool.stop()
+    await http_client.aclose()
+    shutdown_image_process_pool()
 
-app = FastAPI(title="Monk Mark Web Application Service")
+app = FastAPI(title="Monk Mark Web Application Service", lifespan=lifespan)
 
 
 # origins = ["http://localhost:3000"]
@@ -36,10 +54,26 @@ app.include_router(notebook_content_router, prefix=url_prefix)
 app.include_router(notebook_content_file_link_router, prefix=url_prefix)
 app.include_router(notebook_llm_chat_hdr_router, prefix=url_prefix)
 app.include_router(notebook_llm_chat_transcript_router, prefix=url_prefix)
+app.include_router(notebook_llm_chat_router, prefix=url_prefix)
 app.include_router(file_upload_router, prefix=url_prefix)
 app.include_router(focus_session_router, prefix=url_prefix)
+app.include_router(job_router, prefix=url_prefix)
+app.include_router(search_router, prefix=url_prefix)
 
 @app.get("/")
 def read_root():
     return {"message": "Monk mark api running"}
 
+@app.get(f"{url_prefix}/cache/stats")
+def read_cache_stats():
+    return {
+        "entity_cache": entity_cache.stats(),
+        "google_books_cache": get_google_books_cache().stats(),
+        "llm_response_cache": llm_response_cache.stats(),
+        "vector_indexes": vector_indexes.stats(),
+        "search_indexes": search_indexes.stats()
+    }
+
+@app.get(f"{url_prefix}/http/stats")
+def read_http_stats():
+    return http_client.stats()
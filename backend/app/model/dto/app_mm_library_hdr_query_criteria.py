@@ -7,3 +7,6 @@ class LibraryHdrQueryCriteria(BaseModel):
     guid: Optional[UUID] = None
     user_guid: Optional[UUID] = None
     book_name: Optional[str] = None
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+    variant: Optional[str] = None
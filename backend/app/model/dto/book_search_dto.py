@@ -13,3 +13,5 @@ class BookSearchResponseDto(BaseModel):
     description: Optional[str] = None
     cover_image_url: Optional[str] = None
     file_guid: Optional[UUID] = None
+    catalog_guid: Optional[UUID] = None
+    cover_job_guid: Optional[UUID] = None
@@ -6,5 +6,7 @@ class FocusSessionQueryCriteria(BaseModel):
     guid: Optional[UUID]
     user_guid: Optional[UUID]
     library_hdr_guid: Optional[UUID]
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
     
 
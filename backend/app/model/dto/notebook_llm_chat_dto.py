@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+from uuid import UUID
+
+class NotebookLlmChatMessageDto(BaseModel):
+    user_guid: UUID
+    message: str
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, List
+from uuid import UUID
+from model.notebook.app_mm_notebook_hdr import AppMmNotebookHdrResponse
+from model.notebook.app_mm_notebook_content import AppMmNotebookContentResponse
+
+class NotebookAttachmentDto(BaseModel):
+    link_guid: UUID
+    file_upload_guid: Optional[UUID] = None
+    file_path: Optional[str] = None
+    highlight_metadata: Optional[Dict[str, Any]] = None
+
+class NotebookContentWithAttachmentsDto(AppMmNotebookContentResponse):
+    attachments: List[NotebookAttachmentDto] = []
+
+class NotebookOpenResponseDto(BaseModel):
+    notebook: AppMmNotebookHdrResponse
+    contents: List[NotebookContentWithAttachmentsDto]
+    next_cursor: Optional[str] = None
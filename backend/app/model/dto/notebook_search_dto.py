@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from typing import List, Optional
+
+
+class NotebookSearchQueryCriteria(BaseModel):
+    user_guid: UUID
+    query: str
+    library_hdr_guid: Optional[UUID] = None
+    notebook_hdr_guid: Optional[UUID] = None
+    # "content" for highlights, "chat" for chat transcripts, both when unset
+    sources: Optional[List[str]] = None
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+
+
+class NotebookSearchHit(BaseModel):
+    source: str
+    guid: UUID
+    score: float
+    snippet: str
+    notebook_hdr_guid: Optional[UUID] = None
+    library_hdr_guid: Optional[UUID] = None
+    llm_chat_hdr_guid: Optional[UUID] = None
+    created_date: Optional[datetime] = None
@@ -3,6 +3,127 @@ from uuid import UUID
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+"""
+SQL Schema (migration):
+-- Public URL denormalized at write time so list endpoints don't build one per row
+ALTER TABLE app_mm_file_upload ADD COLUMN IF NOT EXISTS public_url TEXT;
+
+-- Backfill, replace <project-url> with SUPABASE_PROJECT_URL
+UPDATE app_mm_file_upload
+SET public_url = '<project-url>/storage/v1/object/public/' || bucket_name || '/' || storage_path
+WHERE public_url IS NULL;
+
+-- Content addressed deduplication: identical bytes in a bucket share one storage object. Each user
+-- owns one reference counted row per distinct bytes, and rows of different users point at the same object.
+ALTER TABLE app_mm_file_upload ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE app_mm_file_upload ADD COLUMN IF NOT EXISTS ref_count INTEGER NOT NULL DEFAULT 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_app_mm_file_upload_user_bucket_content_hash
+    ON app_mm_file_upload (user_guid, bucket_name, content_hash)
+    WHERE content_hash IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_app_mm_file_upload_bucket_storage_path
+    ON app_mm_file_upload (bucket_name, storage_path);
+
+-- Takes one more reference on the user's row holding these bytes. When only other users hold them, the
+-- user gets their own row (with p_metadata) for the same object. Empty when the bytes are not stored yet.
+-- The source row is locked FOR SHARE, so its release waits for this insert: a row for an object is only ever
+-- created from a live row for it, and once the last one is gone nothing can point at the object again.
+CREATE OR REPLACE FUNCTION acquire_file_upload_by_hash(p_user_guid UUID, p_bucket_name TEXT, p_content_hash TEXT, p_metadata JSONB)
+RETURNS SETOF app_mm_file_upload
+LANGUAGE sql VOLATILE
+AS $$
+    WITH source AS (
+        SELECT *
+        FROM app_mm_file_upload
+        WHERE bucket_name = p_bucket_name AND content_hash = p_content_hash
+        ORDER BY (user_guid = p_user_guid) DESC
+        LIMIT 1
+        FOR SHARE
+    )
+    INSERT INTO app_mm_file_upload AS f (guid, user_guid, file_name, mime_type, metadata, storage_path, bucket_name, is_public, public_url, content_hash, ref_count, updated_date)
+    SELECT
+        gen_random_uuid(),
+        p_user_guid,
+        s.file_name,
+        s.mime_type,
+        -- Variants belong to the object, everything else in metadata to the uploader
+        CASE WHEN s.metadata ? 'variants'
+            THEN COALESCE(p_metadata, '{}'::JSONB) || jsonb_build_object('variants', s.metadata -> 'variants')
+            ELSE p_metadata
+        END,
+        s.storage_path,
+        s.bucket_name,
+        s.is_public,
+        s.public_url,
+        s.content_hash,
+        1,
+        NOW()
+    FROM source s
+    ON CONFLICT (user_guid, bucket_name, content_hash) WHERE content_hash IS NOT NULL DO UPDATE SET
+        ref_count = f.ref_count + 1,
+        updated_date = NOW()
+    RETURNING *;
+$$;
+
+-- Takes one more reference on a row by guid, e.g. for another record pointing at it
+CREATE OR REPLACE FUNCTION acquire_file_upload(p_guid UUID)
+RETURNS SETOF app_mm_file_upload
+LANGUAGE sql VOLATILE
+AS $$
+    UPDATE app_mm_file_upload
+    SET ref_count = ref_count + 1, updated_date = NOW()
+    WHERE guid = p_guid
+    RETURNING *;
+$$;
+
+-- Drops one reference and deletes the row when none are left, returns the row with its remaining ref_count.
+-- At 0 the caller queues removal of the storage object, which checks that no other row still points at it;
+-- new uploads of the same bytes never reuse the path of an object without rows (see FileStoreService.store).
+CREATE OR REPLACE FUNCTION release_file_upload(p_guid UUID)
+RETURNS SETOF app_mm_file_upload
+LANGUAGE plpgsql VOLATILE
+AS $$
+DECLARE
+    released app_mm_file_upload;
+BEGIN
+    UPDATE app_mm_file_upload
+    SET ref_count = ref_count - 1, updated_date = NOW()
+    WHERE guid = p_guid
+    RETURNING * INTO released;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    IF released.ref_count <= 0 THEN
+        DELETE FROM app_mm_file_upload WHERE guid = p_guid;
+    END IF;
+
+    RETURN NEXT released;
+END;
+$$;
+
+-- Sets a catalog entry's cover only when it has none, taking the catalog's reference on the file in the same
+-- statement. Empty when another cover was set first, in which case no reference is taken.
+CREATE OR REPLACE FUNCTION set_book_catalog_cover_file(p_catalog_guid UUID, p_file_guid UUID)
+RETURNS SETOF app_mm_book_catalog
+LANGUAGE sql VOLATILE
+AS $$
+    WITH claimed AS (
+        UPDATE app_mm_book_catalog
+        SET cover_file_guid = p_file_guid, updated_date = NOW()
+        WHERE guid = p_catalog_guid AND cover_file_guid IS NULL
+        RETURNING *
+    ), acquired AS (
+        UPDATE app_mm_file_upload
+        SET ref_count = ref_count + 1, updated_date = NOW()
+        WHERE guid IN (SELECT cover_file_guid FROM claimed)
+    )
+    SELECT * FROM claimed;
+$$;
+"""
+
 class AppMmFileUploadCreate(BaseModel):
     user_guid: UUID
     file_name: str
@@ -11,6 +132,7 @@ class AppMmFileUploadCreate(BaseModel):
     storage_path: str
     bucket_name: str
     is_public: bool = False
+    content_hash: Optional[str] = None
 
 class AppMmFileUploadUpdate(BaseModel):
     user_guid: Optional[UUID] = None
@@ -30,6 +152,9 @@ class AppMmFileUploadResponse(BaseModel):
     storage_path: str
     bucket_name: str
     is_public: bool
+    public_url: Optional[str] = None
+    content_hash: Optional[str] = None
+    ref_count: int = 1
     created_date: datetime
     updated_date: datetime
 
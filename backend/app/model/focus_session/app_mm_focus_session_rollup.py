@@ -0,0 +1,122 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from typing import List, Optional
+
+"""
+SQL Schema:
+CREATE TABLE IF NOT EXISTS app_mm_focus_session_rollup (
+    user_guid UUID NOT NULL,
+    library_hdr_guid UUID NOT NULL,
+    session_count BIGINT NOT NULL DEFAULT 0,
+    total_hrs NUMERIC NOT NULL DEFAULT 0,
+    total_seconds BIGINT NOT NULL DEFAULT 0,
+    updated_date TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (user_guid, library_hdr_guid)
+);
+
+CREATE INDEX IF NOT EXISTS idx_app_mm_focus_session_rollup_library_hdr_guid
+    ON app_mm_focus_session_rollup (library_hdr_guid);
+
+-- Applied by AppMmFocusSessionService on create/delete, and by update_focus_session_with_rollup
+CREATE OR REPLACE FUNCTION apply_focus_session_rollup_delta(
+    p_user_guid UUID,
+    p_library_hdr_guid UUID,
+    p_session_count BIGINT,
+    p_total_hrs NUMERIC,
+    p_total_seconds BIGINT
+)
+RETURNS SETOF app_mm_focus_session_rollup
+LANGUAGE sql VOLATILE
+AS $$
+    INSERT INTO app_mm_focus_session_rollup AS r (user_guid, library_hdr_guid, session_count, total_hrs, total_seconds, updated_date)
+    VALUES (p_user_guid, p_library_hdr_guid, p_session_count, p_total_hrs, p_total_seconds, NOW())
+    ON CONFLICT (user_guid, library_hdr_guid) DO UPDATE SET
+        session_count = r.session_count + EXCLUDED.session_count,
+        total_hrs = r.total_hrs + EXCLUDED.total_hrs,
+        total_seconds = r.total_seconds + EXCLUDED.total_seconds,
+        updated_date = NOW()
+    RETURNING *;
+$$;
+
+-- Updates one session and moves its time between rollup rows in the same transaction. The row lock
+-- serializes concurrent updates of a session, so each one subtracts the values the previous one wrote.
+-- p_changes holds only the columns being set (user_guid, library_hdr_guid, time_hrs, time_seconds).
+CREATE OR REPLACE FUNCTION update_focus_session_with_rollup(p_guid UUID, p_changes JSONB)
+RETURNS SETOF app_mm_focus_session
+LANGUAGE plpgsql VOLATILE
+AS $$
+DECLARE
+    old_row app_mm_focus_session;
+    new_row app_mm_focus_session;
+BEGIN
+    SELECT * INTO old_row FROM app_mm_focus_session WHERE guid = p_guid FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    UPDATE app_mm_focus_session SET
+        user_guid = CASE WHEN p_changes ? 'user_guid' THEN (p_changes->>'user_guid')::UUID ELSE user_guid END,
+        library_hdr_guid = CASE WHEN p_changes ? 'library_hdr_guid' THEN (p_changes->>'library_hdr_guid')::UUID ELSE library_hdr_guid END,
+        time_hrs = CASE WHEN p_changes ? 'time_hrs' THEN (p_changes->>'time_hrs')::NUMERIC ELSE time_hrs END,
+        time_seconds = CASE WHEN p_changes ? 'time_seconds' THEN (p_changes->>'time_seconds')::BIGINT ELSE time_seconds END,
+        updated_date = NOW()
+    WHERE guid = p_guid
+    RETURNING * INTO new_row;
+
+    IF old_row.user_guid IS NOT NULL AND old_row.library_hdr_guid IS NOT NULL THEN
+        PERFORM apply_focus_session_rollup_delta(old_row.user_guid, old_row.library_hdr_guid, -1, -COALESCE(old_row.time_hrs, 0), -COALESCE(old_row.time_seconds, 0));
+    END IF;
+    IF new_row.user_guid IS NOT NULL AND new_row.library_hdr_guid IS NOT NULL THEN
+        PERFORM apply_focus_session_rollup_delta(new_row.user_guid, new_row.library_hdr_guid, 1, COALESCE(new_row.time_hrs, 0), COALESCE(new_row.time_seconds, 0));
+    END IF;
+
+    RETURN NEXT new_row;
+END;
+$$;
+
+-- Recomputes every rollup from app_mm_focus_session to repair drift, returns the number of rollup rows
+CREATE OR REPLACE FUNCTION rebuild_focus_session_rollup()
+RETURNS INTEGER
+LANGUAGE plpgsql VOLATILE
+AS $$
+DECLARE
+    row_count INTEGER;
+BEGIN
+    -- WHERE true: Supabase's pg_safeupdate rejects a DELETE without a WHERE clause
+    DELETE FROM app_mm_focus_session_rollup WHERE true;
+
+    INSERT INTO app_mm_focus_session_rollup (user_guid, library_hdr_guid, session_count, total_hrs, total_seconds, updated_date)
+    SELECT
+        fs.user_guid,
+        fs.library_hdr_guid,
+        COUNT(*),
+        COALESCE(SUM(fs.time_hrs), 0),
+        COALESCE(SUM(fs.time_seconds), 0),
+        NOW()
+    FROM app_mm_focus_session fs
+    GROUP BY fs.user_guid, fs.library_hdr_guid;
+
+    GET DIAGNOSTICS row_count = ROW_COUNT;
+    RETURN row_count;
+END;
+$$;
+"""
+
+class AppMmFocusSessionRollupResponse(BaseModel):
+    user_guid: UUID
+    library_hdr_guid: UUID
+    session_count: int = 0
+    total_hrs: float = 0.0
+    total_seconds: int = 0
+    updated_date: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class AppMmFocusSessionUserStatsResponse(BaseModel):
+    user_guid: UUID
+    session_count: int = 0
+    total_hrs: float = 0.0
+    total_seconds: int = 0
+    books: List[AppMmFocusSessionRollupResponse] = []
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from uuid import UUID
+
+"""
+SQL Schema (migration):
+CREATE INDEX IF NOT EXISTS idx_app_mm_focus_session_library_hdr_guid
+    ON app_mm_focus_session (library_hdr_guid) INCLUDE (time_hrs, time_seconds);
+
+-- Per-book totals are kept in app_mm_focus_session_rollup (see app_mm_focus_session_rollup.py)
+"""
+
+class AppMmFocusSessionStatsResponse(BaseModel):
+    library_hdr_guid: UUID
+    session_count: int = 0
+    total_hrs: float = 0.0
+    total_seconds: int = 0
@@ -0,0 +1,92 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from typing import Optional, Dict, Any
+from enum import Enum
+
+"""
+SQL Schema:
+CREATE TABLE IF NOT EXISTS app_mm_job (
+    guid UUID PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    payload JSONB,
+    status TEXT NOT NULL DEFAULT 'QUEUED',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    last_error TEXT,
+    result JSONB,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    created_date TIMESTAMPTZ DEFAULT NOW(),
+    updated_date TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_app_mm_job_queued
+    ON app_mm_job (run_after)
+    WHERE status = 'QUEUED';
+
+-- Hands the oldest runnable job to one worker; SKIP LOCKED lets several workers poll without blocking each other
+CREATE OR REPLACE FUNCTION claim_next_job()
+RETURNS SETOF app_mm_job
+LANGUAGE sql VOLATILE
+AS $$
+    UPDATE app_mm_job
+    SET status = 'RUNNING', attempts = attempts + 1, updated_date = NOW()
+    WHERE guid = (
+        SELECT guid FROM app_mm_job
+        WHERE status = 'QUEUED' AND run_after <= NOW()
+        ORDER BY run_after
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1
+    )
+    RETURNING *;
+$$;
+
+-- Puts jobs left RUNNING by a worker that died back in the queue, or fails them when that was their last
+-- attempt, returns how many were recovered
+CREATE OR REPLACE FUNCTION requeue_stale_jobs(p_stale_seconds INTEGER)
+RETURNS INTEGER
+LANGUAGE plpgsql VOLATILE
+AS $$
+DECLARE
+    row_count INTEGER;
+BEGIN
+    UPDATE app_mm_job
+    SET
+        status = CASE WHEN attempts >= max_attempts THEN 'FAILED' ELSE 'QUEUED' END,
+        last_error = CASE WHEN attempts >= max_attempts THEN 'Worker stopped while running the job' ELSE last_error END,
+        updated_date = NOW()
+    WHERE status = 'RUNNING' AND updated_date < NOW() - make_interval(secs => p_stale_seconds);
+
+    GET DIAGNOSTICS row_count = ROW_COUNT;
+    RETURN row_count;
+END;
+$$;
+"""
+
+class JobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+class AppMmJobCreate(BaseModel):
+    job_type: str
+    payload: Optional[Dict[str, Any]] = None
+    max_attempts: int = 3
+    run_after: Optional[datetime] = None
+
+class AppMmJobResponse(BaseModel):
+    guid: UUID
+    job_type: str
+    payload: Optional[Dict[str, Any]] = None
+    status: JobStatus
+    attempts: int = 0
+    max_attempts: int = 3
+    last_error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    run_after: datetime
+    created_date: datetime
+    updated_date: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,51 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from typing import Optional
+
+"""
+SQL Schema:
+-- One row per distinct book, shared by every user's library header
+CREATE TABLE IF NOT EXISTS app_mm_book_catalog (
+    guid UUID PRIMARY KEY,
+    volume_id TEXT UNIQUE,
+    isbn_13 TEXT UNIQUE,
+    isbn_10 TEXT,
+    title TEXT NOT NULL,
+    authors TEXT,
+    description TEXT,
+    cover_file_guid UUID REFERENCES app_mm_file_upload (guid) ON DELETE SET NULL,
+    created_date TIMESTAMPTZ DEFAULT NOW(),
+    updated_date TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE app_mm_library_hdr
+    ADD COLUMN IF NOT EXISTS catalog_guid UUID REFERENCES app_mm_book_catalog (guid) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_app_mm_library_hdr_user_catalog
+    ON app_mm_library_hdr (user_guid, catalog_guid);
+"""
+
+class AppMmBookCatalogCreate(BaseModel):
+    volume_id: Optional[str] = None
+    isbn_13: Optional[str] = None
+    isbn_10: Optional[str] = None
+    title: str
+    authors: Optional[str] = None
+    description: Optional[str] = None
+    cover_file_guid: Optional[UUID] = None
+
+class AppMmBookCatalogResponse(BaseModel):
+    guid: UUID
+    volume_id: Optional[str] = None
+    isbn_13: Optional[str] = None
+    isbn_10: Optional[str] = None
+    title: str
+    authors: Optional[str] = None
+    description: Optional[str] = None
+    cover_file_guid: Optional[UUID] = None
+    created_date: datetime
+    updated_date: datetime
+
+    class Config:
+        from_attributes = True
@@ -2,12 +2,64 @@ from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
 from typing import Optional
+from model.file.app_mm_file_upload import AppMmFileUploadResponse
+from model.library.app_mm_book_catalog import AppMmBookCatalogResponse
+
+"""
+SQL Schema (migration):
+-- Normalized title kept by Postgres, mirrors util/text_normalization.normalize_book_name
+ALTER TABLE app_mm_library_hdr
+    ADD COLUMN IF NOT EXISTS book_name_normalized TEXT
+    GENERATED ALWAYS AS (lower(btrim(regexp_replace(book_name, '[[:space:]]+', ' ', 'g')))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_app_mm_library_hdr_user_book_name_normalized
+    ON app_mm_library_hdr (user_guid, book_name_normalized);
+
+-- Fuzzy title search: trigram GIN index (pg_trgm) instead of a leading wildcard ilike scan
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_app_mm_library_hdr_book_name_trgm
+    ON app_mm_library_hdr USING gin (book_name_normalized gin_trgm_ops);
+
+-- Titles whose word_similarity to p_query reaches p_min_similarity, best first (util/trigram.py is the Python twin)
+CREATE OR REPLACE FUNCTION search_library_hdrs_by_book_name(p_user_guid UUID, p_query TEXT, p_min_similarity REAL, p_limit INT)
+RETURNS TABLE (guid UUID, name_word_similarity REAL, name_similarity REAL)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- The <% operator filters with this threshold, which lets it use the GIN index
+    PERFORM set_config('pg_trgm.word_similarity_threshold', p_min_similarity::TEXT, true);
+
+    RETURN QUERY
+    SELECT h.guid,
+           word_similarity(p_query, h.book_name_normalized),
+           similarity(p_query, h.book_name_normalized)
+    FROM app_mm_library_hdr h
+    WHERE p_query <% h.book_name_normalized
+      AND (p_user_guid IS NULL OR h.user_guid = p_user_guid)
+    ORDER BY 2 DESC, 3 DESC, h.guid
+    LIMIT p_limit;
+END;
+$$;
+
+-- Lets PostgREST embed the cover file: select=*,cover_file:app_mm_file_upload!file_guid(*)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'fk_app_mm_library_hdr_file_guid') THEN
+        ALTER TABLE app_mm_library_hdr
+            ADD CONSTRAINT fk_app_mm_library_hdr_file_guid
+            FOREIGN KEY (file_guid) REFERENCES app_mm_file_upload (guid) ON DELETE SET NULL;
+    END IF;
+END;
+$$;
+"""
 
 class AppMmLibraryHdrCreate(BaseModel):
     user_guid: UUID
     book_name: str
     book_desc: Optional[str] = None
     file_guid: Optional[UUID] = None
+    catalog_guid: Optional[UUID] = None
 
 class AppMmLibraryHdrUpdate(BaseModel):
     book_name: Optional[str] = None
@@ -21,12 +73,17 @@ class AppMmLibraryHdrResponse(BaseModel):
     book_name: str
     book_desc: Optional[str]
     file_guid: Optional[UUID]
+    catalog_guid: Optional[UUID] = None
     created_date: datetime
     last_read: datetime
 
     class Config:
         from_attributes = True
 
+class AppMmLibraryHdrWithCoverResponse(AppMmLibraryHdrResponse):
+    cover_file: Optional[AppMmFileUploadResponse] = None
+    book_catalog: Optional[AppMmBookCatalogResponse] = None
+
 class AppMmLibraryHdrWithFileResponse(BaseModel):
     guid: UUID
     user_guid: UUID
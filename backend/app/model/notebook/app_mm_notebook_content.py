@@ -1,7 +1,50 @@
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+"""
+SQL Schema:
+CREATE INDEX IF NOT EXISTS idx_app_mm_notebook_content_hdr_sequence
+    ON app_mm_notebook_content (notebook_hdr_guid, sequence_no);
+
+-- Inserts a batch after the notebook's current max sequence_no in one statement.
+-- The advisory lock serializes concurrent batches for the same notebook so the numbers stay contiguous.
+CREATE OR REPLACE FUNCTION bulk_create_notebook_content(p_notebook_hdr_guid UUID, p_contents JSONB)
+RETURNS SETOF app_mm_notebook_content
+LANGUAGE plpgsql VOLATILE
+AS $$
+DECLARE
+    start_no INTEGER;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('app_mm_notebook_content:' || p_notebook_hdr_guid::text));
+
+    SELECT COALESCE(MAX(sequence_no), 0) INTO start_no
+    FROM app_mm_notebook_content
+    WHERE notebook_hdr_guid = p_notebook_hdr_guid;
+
+    RETURN QUERY
+    INSERT INTO app_mm_notebook_content (
+        guid, user_guid, notebook_hdr_guid, library_hdr_guid, focus_session_guid,
+        content_text, image_url, highlight_metadata, sequence_no, updated_date
+    )
+    SELECT
+        (c.item->>'guid')::UUID,
+        (c.item->>'user_guid')::UUID,
+        p_notebook_hdr_guid,
+        (c.item->>'library_hdr_guid')::UUID,
+        (c.item->>'focus_session_guid')::UUID,
+        c.item->>'content_text',
+        c.item->>'image_url',
+        c.item->'highlight_metadata',
+        start_no + c.ordinality,
+        NOW()
+    FROM jsonb_array_elements(p_contents) WITH ORDINALITY AS c(item, ordinality)
+    ORDER BY c.ordinality
+    RETURNING *;
+END;
+$$;
+"""
 
 class AppMmNotebookContentCreate(BaseModel):
     user_guid: UUID
@@ -13,6 +56,18 @@ class AppMmNotebookContentCreate(BaseModel):
     highlight_metadata: Optional[Dict[str, Any]] = None
     sequence_no: Optional[int] = None
 
+class AppMmNotebookContentBulkItem(BaseModel):
+    content_text: Optional[str] = None
+    image_url: Optional[str] = None
+    highlight_metadata: Optional[Dict[str, Any]] = None
+
+class AppMmNotebookContentBulkCreate(BaseModel):
+    user_guid: UUID
+    notebook_hdr_guid: UUID
+    library_hdr_guid: Optional[UUID] = None
+    focus_session_guid: Optional[UUID] = None
+    contents: List[AppMmNotebookContentBulkItem]
+
 class AppMmNotebookContentUpdate(BaseModel):
     user_guid: Optional[UUID] = None
     notebook_hdr_guid: Optional[UUID] = None
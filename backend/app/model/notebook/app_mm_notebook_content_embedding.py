@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from typing import List, Optional
+
+"""
+SQL Schema:
+CREATE TABLE IF NOT EXISTS app_mm_notebook_content_embedding (
+    -- Same guid as the notebook content row it embeds
+    guid UUID PRIMARY KEY REFERENCES app_mm_notebook_content (guid) ON DELETE CASCADE,
+    user_guid UUID NOT NULL,
+    library_hdr_guid UUID,
+    embedding_model TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    embedding FLOAT4[] NOT NULL,
+    created_date TIMESTAMPTZ DEFAULT NOW(),
+    updated_date TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- A per-user/per-book vector index is loaded by paging through this index in (created_date, guid) order
+CREATE INDEX IF NOT EXISTS idx_app_mm_notebook_content_embedding_user_library
+    ON app_mm_notebook_content_embedding (user_guid, library_hdr_guid, created_date, guid);
+"""
+
+class AppMmNotebookContentEmbeddingResponse(BaseModel):
+    guid: UUID
+    user_guid: UUID
+    library_hdr_guid: Optional[UUID] = None
+    embedding_model: str
+    content_hash: str
+    embedding: List[float]
+    created_date: datetime
+    updated_date: datetime
+
+    class Config:
+        from_attributes = True
+
+class NotebookContentSearchHit(BaseModel):
+    content_guid: UUID
+    score: float
+    content_text: Optional[str] = None
@@ -3,6 +3,13 @@ from uuid import UUID
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+"""
+SQL Schema (migration):
+-- Opening a notebook reads the links of one page of contents at a time
+CREATE INDEX IF NOT EXISTS idx_app_mm_notebook_content_file_link_content_guid
+    ON app_mm_notebook_content_file_link (notebook_content_guid, sequence_no);
+"""
+
 class AppMmNotebookContentFileLinkCreate(BaseModel):
     user_guid: UUID
     notebook_hdr_guid: UUID
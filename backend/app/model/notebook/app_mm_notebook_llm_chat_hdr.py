@@ -13,6 +13,15 @@ CREATE TABLE IF NOT EXISTS app_mm_notebook_llm_chat_hdr (
     created_date TIMESTAMPTZ DEFAULT NOW(),
     updated_date TIMESTAMPTZ DEFAULT NOW()
 );
+
+SQL Schema (migration):
+-- Rolling summary of the turns that have left the prompt window, and the last transcript folded into it
+ALTER TABLE app_mm_notebook_llm_chat_hdr ADD COLUMN IF NOT EXISTS running_summary TEXT;
+ALTER TABLE app_mm_notebook_llm_chat_hdr ADD COLUMN IF NOT EXISTS summary_through_guid UUID;
+ALTER TABLE app_mm_notebook_llm_chat_hdr ADD COLUMN IF NOT EXISTS summary_through_date TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_app_mm_notebook_llm_chat_transcript_hdr_created
+    ON app_mm_notebook_llm_chat_transcript (llm_chat_hdr_guid, created_date, guid);
 """
 
 class AppMmNotebookLlmChatHdrCreate(BaseModel):
@@ -30,6 +39,9 @@ class AppMmNotebookLlmChatHdrResponse(BaseModel):
     user_guid: UUID
     notebook_hdr_guid: Optional[UUID] = None
     library_hdr_guid: Optional[UUID] = None
+    running_summary: Optional[str] = None
+    summary_through_guid: Optional[UUID] = None
+    summary_through_date: Optional[datetime] = None
     created_date: datetime
     updated_date: datetime
 
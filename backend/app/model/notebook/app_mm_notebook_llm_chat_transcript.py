@@ -21,6 +21,7 @@ class AppMmNotebookLlmChatTranscriptCreate(BaseModel):
     llm_chat_hdr_guid: UUID
     msg_content: str
     sender: str
+    created_date: Optional[datetime] = None
 
 class AppMmNotebookLlmChatTranscriptUpdate(BaseModel):
     user_guid: Optional[UUID] = None
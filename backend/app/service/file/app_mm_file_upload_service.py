@@ -1,14 +1,24 @@
 from uuid import UUID, uuid4
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
-from util.supabase_config import supabase
+from service.repository.repository_provider import get_repository
+from service.repository.field_projection import parse_fields, select_columns, projection_model, project
+from util.entity_cache import entity_cache
+from util.storage_url import build_public_url
+from service.job.app_mm_job_service import AppMmJobService
+from service.repository.keyset_pagination import keyset_query, keyset_page
+from model.page_response import PageResponse
 from model.file.app_mm_file_upload import AppMmFileUploadCreate, AppMmFileUploadUpdate, AppMmFileUploadResponse
+from model.job.app_mm_job import AppMmJobCreate
 
 class AppMmFileUploadService:
     TABLE_NAME = "app_mm_file_upload"
+    ENTITY_TYPE = "file_upload"
+    # Handled by FileStoreService once the last row pointing at a storage object is gone
+    REMOVE_OBJECT_JOB_TYPE = "remove_storage_object"
     
     @staticmethod
-    def create_file_upload(file_data: AppMmFileUploadCreate) -> AppMmFileUploadResponse:
+    async def create_file_upload(file_data: AppMmFileUploadCreate) -> AppMmFileUploadResponse:
         """Create a new file upload record"""
         new_file = {
             "guid": str(uuid4()),
@@ -19,10 +29,13 @@ class AppMmFileUploadService:
             "storage_path": file_data.storage_path,
             "bucket_name": file_data.bucket_name,
             "is_public": file_data.is_public,
+            "public_url": build_public_url(file_data.bucket_name, file_data.storage_path),
+            "content_hash": file_data.content_hash,
+            "ref_count": 1,
             "updated_date": datetime.now().isoformat()
         }
         
-        response = supabase.table(AppMmFileUploadService.TABLE_NAME).insert(new_file).execute()
+        response = await get_repository().table(AppMmFileUploadService.TABLE_NAME).insert(new_file).execute()
         
         if not response.data:
             raise Exception("Failed to create file upload record")
@@ -30,9 +43,17 @@ class AppMmFileUploadService:
         return AppMmFileUploadResponse(**response.data[0])
     
     @staticmethod
-    def get_file_upload_by_id(file_id: UUID) -> Optional[AppMmFileUploadResponse]:
-        """Get file upload by GUID"""
-        response = supabase.table(AppMmFileUploadService.TABLE_NAME).select("*").eq("guid", str(file_id)).execute()
+    async def get_file_upload_by_id(file_id: UUID, fields: Optional[str] = None) -> Optional[AppMmFileUploadResponse]:
+        """Get file upload by GUID (served from the entity cache when possible)"""
+        columns = parse_fields(fields, AppMmFileUploadResponse)
+        entity = await entity_cache.get_or_load(AppMmFileUploadService.ENTITY_TYPE, file_id, lambda: AppMmFileUploadService._load_by_id(file_id))
+        
+        return project(entity, columns)
+    
+    @staticmethod
+    async def _load_by_id(file_id: UUID) -> Optional[AppMmFileUploadResponse]:
+        """Get file upload by GUID from the repository, bypassing the cache"""
+        response = await get_repository().table(AppMmFileUploadService.TABLE_NAME).select("*").eq("guid", str(file_id)).execute()
         
         if not response.data:
             return None
@@ -40,41 +61,109 @@ class AppMmFileUploadService:
         return AppMmFileUploadResponse(**response.data[0])
     
     @staticmethod
-    def get_all_file_uploads() -> List[AppMmFileUploadResponse]:
-        """Get all file uploads"""
-        response = supabase.table(AppMmFileUploadService.TABLE_NAME).select("*").execute()
+    async def get_file_uploads_by_ids(file_ids: List[UUID]) -> List[AppMmFileUploadResponse]:
+        """Get file uploads for a list of GUIDs in one query"""
+        if not file_ids:
+            return []
+        
+        response = await get_repository().table(AppMmFileUploadService.TABLE_NAME).select("*").in_("guid", [str(file_id) for file_id in file_ids]).execute()
         
         return [AppMmFileUploadResponse(**file) for file in response.data]
     
     @staticmethod
-    def get_files_by_user(user_guid: UUID) -> List[AppMmFileUploadResponse]:
-        """Get all files for a specific user"""
-        response = supabase.table(AppMmFileUploadService.TABLE_NAME).select("*").eq("user_guid", str(user_guid)).order("created_date", desc=True).execute()
+    async def get_file_uploads_by_storage_path(bucket_name: str, storage_path: str) -> List[AppMmFileUploadResponse]:
+        """Every user's row sharing one storage object"""
+        response = await get_repository().table(AppMmFileUploadService.TABLE_NAME).select("*").eq("bucket_name", bucket_name).eq("storage_path", storage_path).execute()
         
         return [AppMmFileUploadResponse(**file) for file in response.data]
     
     @staticmethod
-    def get_files_by_mime_type(mime_type: str) -> List[AppMmFileUploadResponse]:
-        """Get all files by mime type"""
-        response = supabase.table(AppMmFileUploadService.TABLE_NAME).select("*").eq("mime_type", mime_type).order("created_date", desc=True).execute()
+    async def acquire_file_upload_by_hash(user_guid: UUID, bucket_name: str, content_hash: str, metadata: Optional[Dict[str, Any]] = None) -> Optional[AppMmFileUploadResponse]:
+        """
+        Take another reference on the user's file upload holding these bytes. When only other users
+        uploaded them, the user gets a row of their own (with metadata) on the same storage object.
+        None when the bytes are not stored yet.
+        """
+        response = await get_repository().rpc("acquire_file_upload_by_hash", {
+            "p_user_guid": str(user_guid),
+            "p_bucket_name": bucket_name,
+            "p_content_hash": content_hash,
+            "p_metadata": metadata
+        })
         
-        return [AppMmFileUploadResponse(**file) for file in response.data]
+        if not response.data:
+            return None
+        
+        file_record = AppMmFileUploadResponse(**response.data[0])
+        entity_cache.invalidate(AppMmFileUploadService.ENTITY_TYPE, file_record.guid)
+        
+        return file_record
+    
+    @staticmethod
+    async def acquire_file_upload(file_id: UUID) -> Optional[AppMmFileUploadResponse]:
+        """Take another reference on a file upload by GUID, for one more record pointing at it"""
+        response = await get_repository().rpc("acquire_file_upload", {"p_guid": str(file_id)})
+        entity_cache.invalidate(AppMmFileUploadService.ENTITY_TYPE, file_id)
+        
+        if not response.data:
+            return None
+        
+        return AppMmFileUploadResponse(**response.data[0])
     
     @staticmethod
-    def update_file_upload(file_id: UUID, file_data: AppMmFileUploadUpdate) -> Optional[AppMmFileUploadResponse]:
+    async def get_all_file_uploads(limit: Optional[int] = None, cursor: Optional[str] = None) -> PageResponse[AppMmFileUploadResponse]:
+        """Get a page of file uploads"""
+        query = get_repository().table(AppMmFileUploadService.TABLE_NAME).select("*")
+        response = await keyset_query(query, cursor, limit).execute()
+        
+        return keyset_page(response.data, limit, AppMmFileUploadResponse)
+    
+    @staticmethod
+    async def get_files_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmFileUploadResponse]:
+        """Get a page of files for a specific user"""
+        columns = parse_fields(fields, AppMmFileUploadResponse, "created_date")
+        query = get_repository().table(AppMmFileUploadService.TABLE_NAME).select(select_columns(columns)).eq("user_guid", str(user_guid))
+        response = await keyset_query(query, cursor, limit).execute()
+        
+        return keyset_page(response.data, limit, projection_model(AppMmFileUploadResponse, columns))
+    
+    @staticmethod
+    async def get_files_by_mime_type(mime_type: str, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmFileUploadResponse]:
+        """Get a page of files by mime type"""
+        columns = parse_fields(fields, AppMmFileUploadResponse, "created_date")
+        query = get_repository().table(AppMmFileUploadService.TABLE_NAME).select(select_columns(columns)).eq("mime_type", mime_type)
+        response = await keyset_query(query, cursor, limit).execute()
+        
+        return keyset_page(response.data, limit, projection_model(AppMmFileUploadResponse, columns))
+    
+    @staticmethod
+    async def update_file_upload(file_id: UUID, file_data: AppMmFileUploadUpdate) -> Optional[AppMmFileUploadResponse]:
         """Update file upload by GUID"""
         update_data = file_data.model_dump(exclude_unset=True)
         
         if not update_data:
-            return AppMmFileUploadService.get_file_upload_by_id(file_id)
+            return await AppMmFileUploadService.get_file_upload_by_id(file_id)
         
         # Convert UUID to string for Supabase
         if "user_guid" in update_data:
             update_data["user_guid"] = str(update_data["user_guid"])
         
+        # Keep the denormalized public URL in step with the object location
+        if "bucket_name" in update_data or "storage_path" in update_data:
+            current = await AppMmFileUploadService.get_file_upload_by_id(file_id)
+            
+            if not current:
+                return None
+            
+            update_data["public_url"] = build_public_url(
+                update_data.get("bucket_name") or current.bucket_name,
+                update_data.get("storage_path") or current.storage_path
+            )
+        
         update_data["updated_date"] = datetime.now().isoformat()
         
-        response = supabase.table(AppMmFileUploadService.TABLE_NAME).update(update_data).eq("guid", str(file_id)).execute()
+        response = await get_repository().table(AppMmFileUploadService.TABLE_NAME).update(update_data).eq("guid", str(file_id)).execute()
+        entity_cache.invalidate(AppMmFileUploadService.ENTITY_TYPE, file_id)
         
         if not response.data:
             return None
@@ -82,8 +171,36 @@ class AppMmFileUploadService:
         return AppMmFileUploadResponse(**response.data[0])
     
     @staticmethod
-    def delete_file_upload(file_id: UUID) -> bool:
-        """Delete file upload by GUID"""
-        response = supabase.table(AppMmFileUploadService.TABLE_NAME).delete().eq("guid", str(file_id)).execute()
+    async def delete_file_upload(file_id: UUID) -> bool:
+        """
+        Release one reference to a file upload by GUID. The row is deleted when no references remain,
+        and removal of its storage object (and variants) is queued.
+        """
+        response = await get_repository().rpc("release_file_upload", {"p_guid": str(file_id)})
+        entity_cache.invalidate(AppMmFileUploadService.ENTITY_TYPE, file_id)
+        
+        if not response.data:
+            return False
+        
+        released = response.data[0]
+        if (released.get("ref_count") or 0) <= 0:
+            await AppMmFileUploadService._enqueue_remove_object(released)
+        
+        return True
+    
+    @staticmethod
+    async def _enqueue_remove_object(released: Dict[str, Any]) -> None:
+        variants = (released.get("metadata") or {}).get("variants") or {}
         
-        return len(response.data) > 0
+        try:
+            await AppMmJobService.enqueue(AppMmJobCreate(
+                job_type=AppMmFileUploadService.REMOVE_OBJECT_JOB_TYPE,
+                payload={
+                    "bucket_name": released["bucket_name"],
+                    "storage_path": released["storage_path"],
+                    "variant_paths": [variant["storage_path"] for variant in variants.values()]
+                }
+            ))
+        except Exception as e:
+            # The row is already gone, an orphaned object only costs storage
+            print(f"Error enqueueing storage object removal: {str(e)}")
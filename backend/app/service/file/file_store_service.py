@@ -0,0 +1,273 @@
+import base64
+import asyncio
+import hashlib
+import tempfile
+from uuid import UUID, uuid4
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+from util.settings import get_settings
+from util.supabase_config import get_async_supabase_admin
+from util.http_client import http_client
+from util.file_type import IMAGE_EXTENSIONS, SNIFF_LENGTH, sniff_image_type
+from service.repository.repository_provider import get_repository
+from service.file.app_mm_file_upload_service import AppMmFileUploadService
+from service.file.image_variant_service import ImageVariantService
+from service.job.job_worker import job_handler
+from model.file.app_mm_file_upload import AppMmFileUploadCreate, AppMmFileUploadResponse
+
+class SpooledUpload:
+    """
+    An upload read to the end: size, SHA-256 and sniffed type are known, the bytes sit in a
+    SpooledTemporaryFile (memory up to FileStoreService.SPOOL_MEMORY_BYTES, then a temp file on disk)
+    """
+    
+    def __init__(self, file: BinaryIO, size: int, content_hash: str, content_type: str):
+        self.file = file
+        self.size = size
+        self.content_hash = content_hash
+        self.content_type = content_type
+    
+    @property
+    def extension(self) -> str:
+        return IMAGE_EXTENSIONS[self.content_type]
+    
+    def close(self) -> None:
+        self.file.close()
+
+class FileStoreService:
+    """
+    Content addressed storage on top of Supabase storage and app_mm_file_upload.
+    Objects are named by the SHA-256 of their bytes, so identical uploads share one object and a repeat
+    upload skips the storage write entirely. Each user gets their own reference counted row per object;
+    the object is removed once the last row pointing at it is released. A name also carries a generation
+    suffix picked by the upload that wrote it, so bytes uploaded again after their object was released
+    get a fresh object instead of racing that object's removal.
+    """
+    CHUNK_SIZE = 1024 * 1024
+    SPOOL_MEMORY_BYTES = 1024 * 1024
+    MAX_UPLOAD_BYTES = get_settings().upload_max_bytes
+    # Supabase takes objects above 6MB through its TUS endpoint, which requires 6MB chunks
+    RESUMABLE_THRESHOLD_BYTES = 6 * 1024 * 1024
+    RESUMABLE_CHUNK_BYTES = 6 * 1024 * 1024
+    RESUMABLE_MAX_RESUMES = 3
+    
+    @staticmethod
+    async def spool(file: Any, max_bytes: Optional[int] = None) -> SpooledUpload:
+        """
+        Read an upload (anything with an async read(size)) in chunks, hashing and spooling the bytes as
+        they arrive. Raises ValueError as soon as the size limit is passed or when the leading bytes are
+        not an accepted image type, without reading the rest.
+        
+        For a FastAPI UploadFile "as they arrive" means as they come off Starlette's spooled copy:
+        the multipart body has already been received and parsed in full before the endpoint runs, so
+        the early exits save the hashing and the storage upload, not the network transfer. Rejecting
+        an oversized body before it is read needs a limit in front of the app (proxy or server).
+        """
+        max_bytes = max_bytes or FileStoreService.MAX_UPLOAD_BYTES
+        digest = hashlib.sha256()
+        spooled = tempfile.SpooledTemporaryFile(max_size=FileStoreService.SPOOL_MEMORY_BYTES)
+        header = b""
+        content_type = None
+        size = 0
+        
+        try:
+            while True:
+                chunk = await file.read(FileStoreService.CHUNK_SIZE)
+                if not chunk:
+                    break
+                
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"File exceeds the {max_bytes // (1024 * 1024)}MB upload limit")
+                
+                if content_type is None:
+                    header += chunk[:SNIFF_LENGTH - len(header)]
+                    if len(header) >= SNIFF_LENGTH:
+                        content_type = FileStoreService._sniff(header)
+                
+                digest.update(chunk)
+                # Past the in-memory limit the spool writes to disk, keep that off the event loop
+                if spooled.tell() + len(chunk) > FileStoreService.SPOOL_MEMORY_BYTES:
+                    await asyncio.to_thread(spooled.write, chunk)
+                else:
+                    spooled.write(chunk)
+            
+            if content_type is None:
+                content_type = FileStoreService._sniff(header)
+            
+            spooled.seek(0)
+            return SpooledUpload(spooled, size, digest.hexdigest(), content_type)
+        except Exception:
+            spooled.close()
+            raise
+    
+    @staticmethod
+    def _sniff(header: bytes) -> str:
+        content_type = sniff_image_type(header)
+        
+        if content_type is None:
+            raise ValueError("Unsupported file type, expected a JPEG, PNG, GIF or WebP image")
+        
+        return content_type
+    
+    @staticmethod
+    async def store(
+        content: Union[bytes, SpooledUpload],
+        user_guid: UUID,
+        bucket_name: str,
+        folder: str,
+        extension: Optional[str] = None,
+        content_type: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        content_hash: Optional[str] = None
+    ) -> AppMmFileUploadResponse:
+        """
+        Store bytes once per bucket and return the user's file upload record for them. A SpooledUpload
+        carries its own hash and type; large ones are sent to storage in resumable chunks.
+        """
+        if isinstance(content, SpooledUpload):
+            content_hash = content.content_hash
+            content_type = content.content_type
+            extension = content.extension
+        else:
+            content_hash = content_hash or hashlib.sha256(content).hexdigest()
+        
+        # Known bytes: take a reference on the user's row (created from another user's when needed), no storage write
+        existing = await AppMmFileUploadService.acquire_file_upload_by_hash(user_guid, bucket_name, content_hash, metadata)
+        if existing:
+            return existing
+        
+        filename = f"{content_hash}-{uuid4().hex[:12]}.{extension}"
+        storage_path = f"{folder}/{filename}"
+        
+        if isinstance(content, SpooledUpload) and content.size > FileStoreService.RESUMABLE_THRESHOLD_BYTES:
+            await FileStoreService._upload_resumable(content, bucket_name, storage_path)
+        else:
+            if isinstance(content, SpooledUpload):
+                content = await asyncio.to_thread(content.file.read)
+            
+            # Upload to Supabase storage using admin client (bypasses RLS)
+            supabase_admin = await get_async_supabase_admin()
+            await supabase_admin.storage.from_(bucket_name).upload(
+                storage_path,
+                content,
+                {"content-type": content_type, "upsert": "true"}
+            )
+        
+        file_create = AppMmFileUploadCreate(
+            user_guid=user_guid,
+            file_name=filename,
+            mime_type=content_type,
+            storage_path=storage_path,
+            bucket_name=bucket_name,
+            is_public=True,
+            metadata=metadata,
+            content_hash=content_hash
+        )
+        
+        try:
+            file_record = await AppMmFileUploadService.create_file_upload(file_create)
+        except Exception:
+            # Another request registered the same bytes first (unique user/bucket/hash), share its row
+            existing = await AppMmFileUploadService.acquire_file_upload_by_hash(user_guid, bucket_name, content_hash, metadata)
+            
+            # The object written above is unused now, remove_object leaves it if the insert landed after all
+            try:
+                await FileStoreService.remove_object(bucket_name, storage_path, [])
+            except Exception as e:
+                print(f"Error removing unregistered storage object: {str(e)}")
+            
+            if not existing:
+                raise
+            
+            return existing
+        
+        # First copy of these bytes: thumbnails are rendered in the background
+        await ImageVariantService.enqueue(file_record)
+        
+        return file_record
+    
+    @staticmethod
+    async def _upload_resumable(upload: SpooledUpload, bucket_name: str, storage_path: str) -> None:
+        """
+        Upload through Supabase storage's TUS endpoint one chunk at a time, so only a chunk is in memory.
+        A failed chunk is resumed from the offset the server reports.
+        """
+        url = get_settings().supabase_project_url
+        service_key = get_settings().supabase_service_role_key
+        
+        if not url or not service_key:
+            raise ValueError("Supabase service role credentials missing in .env")
+        
+        def encode(value: str) -> str:
+            return base64.b64encode(value.encode()).decode()
+        
+        headers = {
+            "authorization": f"Bearer {service_key}",
+            "tus-resumable": "1.0.0",
+            "x-upsert": "true"
+        }
+        
+        response = await http_client.post(
+            f"{url.rstrip('/')}/storage/v1/upload/resumable",
+            headers={
+                **headers,
+                "upload-length": str(upload.size),
+                "upload-metadata": ",".join([
+                    f"bucketName {encode(bucket_name)}",
+                    f"objectName {encode(storage_path)}",
+                    f"contentType {encode(upload.content_type)}"
+                ])
+            }
+        )
+        response.raise_for_status()
+        location = response.headers["location"]
+        
+        offset = 0
+        resumes = 0
+        
+        while offset < upload.size:
+            await asyncio.to_thread(upload.file.seek, offset)
+            chunk = await asyncio.to_thread(upload.file.read, FileStoreService.RESUMABLE_CHUNK_BYTES)
+            
+            try:
+                response = await http_client.request(
+                    "PATCH",
+                    location,
+                    headers={**headers, "upload-offset": str(offset), "content-type": "application/offset+octet-stream"},
+                    content=chunk,
+                    deadline=60.0
+                )
+                response.raise_for_status()
+                offset = int(response.headers["upload-offset"])
+            except Exception:
+                if resumes >= FileStoreService.RESUMABLE_MAX_RESUMES:
+                    raise
+                
+                resumes += 1
+                # Ask the server how much it kept and continue from there
+                head = await http_client.request("HEAD", location, headers=headers)
+                head.raise_for_status()
+                offset = int(head.headers["upload-offset"])
+    
+    @staticmethod
+    async def remove_object(bucket_name: str, storage_path: str, variant_paths: List[str]) -> bool:
+        """
+        Delete a storage object and its variants once no file upload row points at it any more.
+        The check cannot go stale: store writes every object under a path of its own before its row
+        exists, and acquire_file_upload_by_hash only creates rows from a live row it holds locked, so
+        once no row points at an object none ever will again.
+        """
+        response = await get_repository().table(AppMmFileUploadService.TABLE_NAME).select("guid").eq("bucket_name", bucket_name).eq("storage_path", storage_path).limit(1).execute()
+        
+        if response.data:
+            return False
+        
+        supabase_admin = await get_async_supabase_admin()
+        await supabase_admin.storage.from_(bucket_name).remove([storage_path, *variant_paths])
+        
+        return True
+
+@job_handler(AppMmFileUploadService.REMOVE_OBJECT_JOB_TYPE)
+async def remove_storage_object(payload: Dict[str, Any]) -> Dict[str, Any]:
+    removed = await FileStoreService.remove_object(payload["bucket_name"], payload["storage_path"], payload.get("variant_paths") or [])
+    return {"removed": removed}
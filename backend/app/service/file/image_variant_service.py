@@ -0,0 +1,83 @@
+from uuid import UUID
+from typing import Any, Dict, Optional
+from util.supabase_config import get_async_supabase_admin
+from util.storage_url import build_public_url
+from util.file_type import IMAGE_EXTENSIONS
+from util.image_variants import PILLOW_AVAILABLE, VARIANT_MIME_TYPE, VARIANT_EXTENSION, generate_variants
+from service.file.app_mm_file_upload_service import AppMmFileUploadService
+from service.job.app_mm_job_service import AppMmJobService
+from service.job.job_worker import job_handler
+from model.file.app_mm_file_upload import AppMmFileUploadResponse, AppMmFileUploadUpdate
+from model.job.app_mm_job import AppMmJobCreate
+
+class ImageVariantService:
+    """
+    Sized WebP variants of stored images, generated in the background after upload and recorded in
+    app_mm_file_upload.metadata["variants"] as {name: {"storage_path", "public_url", "width", "height"}}
+    """
+    JOB_TYPE = "generate_image_variants"
+    
+    @staticmethod
+    async def enqueue(file_record: AppMmFileUploadResponse) -> None:
+        """Queue variant generation for a newly stored image, a no-op without Pillow or for non images"""
+        if not PILLOW_AVAILABLE or file_record.mime_type not in IMAGE_EXTENSIONS:
+            return
+        
+        try:
+            await AppMmJobService.enqueue(AppMmJobCreate(
+                job_type=ImageVariantService.JOB_TYPE,
+                payload={"file_upload_guid": str(file_record.guid)}
+            ))
+        except Exception as e:
+            # The original stays usable, clients fall back to it when a variant is missing
+            print(f"Error enqueueing image variant job: {str(e)}")
+    
+    @staticmethod
+    async def generate(file_upload_guid: UUID) -> Optional[Dict[str, Any]]:
+        """Download the original, render the variants in the process pool, upload them and record them on the row"""
+        file_record = await AppMmFileUploadService.get_file_upload_by_id(file_upload_guid)
+        
+        if not file_record:
+            return None
+        
+        metadata = dict(file_record.metadata or {})
+        if "variants" in metadata:
+            return metadata["variants"]
+        
+        supabase_admin = await get_async_supabase_admin()
+        bucket = supabase_admin.storage.from_(file_record.bucket_name)
+        content = await bucket.download(file_record.storage_path)
+        
+        rendered = await generate_variants(content)
+        
+        folder, _, filename = file_record.storage_path.rpartition("/")
+        stem = filename.rsplit(".", 1)[0]
+        variants = {}
+        
+        for name, variant in rendered.items():
+            storage_path = f"{folder}/variants/{stem}_{name}.{VARIANT_EXTENSION}" if folder else f"variants/{stem}_{name}.{VARIANT_EXTENSION}"
+            
+            await bucket.upload(
+                storage_path,
+                variant["content"],
+                {"content-type": VARIANT_MIME_TYPE, "upsert": "true"}
+            )
+            
+            variants[name] = {
+                "storage_path": storage_path,
+                "public_url": build_public_url(file_record.bucket_name, storage_path),
+                "width": variant["width"],
+                "height": variant["height"]
+            }
+        
+        # Every user's row for this object gets the variants
+        same_object = await AppMmFileUploadService.get_file_uploads_by_storage_path(file_record.bucket_name, file_record.storage_path)
+        for row in same_object:
+            await AppMmFileUploadService.update_file_upload(row.guid, AppMmFileUploadUpdate(metadata={**(row.metadata or {}), "variants": variants}))
+        
+        return variants
+
+@job_handler(ImageVariantService.JOB_TYPE)
+async def generate_image_variants(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    variants = await ImageVariantService.generate(UUID(payload["file_upload_guid"]))
+    return {"variants": sorted(variants)} if variants is not None else None
@@ -0,0 +1,69 @@
+from uuid import UUID
+from typing import Dict, List, Optional
+from service.repository.repository_provider import get_repository
+from model.focus_session.app_mm_focus_session_rollup import (
+    AppMmFocusSessionRollupResponse,
+    AppMmFocusSessionUserStatsResponse
+)
+from model.focus_session.app_mm_focus_session_stats import AppMmFocusSessionStatsResponse
+
+class AppMmFocusSessionRollupService:
+    TABLE_NAME = "app_mm_focus_session_rollup"
+    
+    @staticmethod
+    async def apply_delta(user_guid: Optional[UUID], library_hdr_guid: Optional[UUID], session_count: int, total_hrs: float, total_seconds: int) -> None:
+        """Add a signed delta to the rollup row of (user_guid, library_hdr_guid), creating it if needed"""
+        if not user_guid or not library_hdr_guid:
+            return
+        
+        if not session_count and not total_hrs and not total_seconds:
+            return
+        
+        await get_repository().rpc("apply_focus_session_rollup_delta", {
+            "p_user_guid": str(user_guid),
+            "p_library_hdr_guid": str(library_hdr_guid),
+            "p_session_count": session_count,
+            "p_total_hrs": total_hrs,
+            "p_total_seconds": total_seconds
+        })
+    
+    @staticmethod
+    async def get_stats_by_library(library_hdr_guids: List[UUID]) -> Dict[str, AppMmFocusSessionStatsResponse]:
+        """Get precomputed session count and total time keyed by library header GUID"""
+        if not library_hdr_guids:
+            return {}
+        
+        response = await get_repository().table(AppMmFocusSessionRollupService.TABLE_NAME).select("*").in_("library_hdr_guid", [str(guid) for guid in library_hdr_guids]).execute()
+        
+        stats_map: Dict[str, AppMmFocusSessionStatsResponse] = {}
+        
+        for rollup in response.data:
+            key = str(rollup["library_hdr_guid"])
+            stats = stats_map.setdefault(key, AppMmFocusSessionStatsResponse(library_hdr_guid=rollup["library_hdr_guid"]))
+            stats.session_count += int(rollup.get("session_count") or 0)
+            stats.total_hrs += float(rollup.get("total_hrs") or 0)
+            stats.total_seconds += int(rollup.get("total_seconds") or 0)
+        
+        return stats_map
+    
+    @staticmethod
+    async def get_user_stats(user_guid: UUID) -> AppMmFocusSessionUserStatsResponse:
+        """Get precomputed totals for a user, overall and per book"""
+        response = await get_repository().table(AppMmFocusSessionRollupService.TABLE_NAME).select("*").eq("user_guid", str(user_guid)).execute()
+        
+        books = [AppMmFocusSessionRollupResponse(**rollup) for rollup in response.data]
+        
+        return AppMmFocusSessionUserStatsResponse(
+            user_guid=user_guid,
+            session_count=sum(book.session_count for book in books),
+            total_hrs=sum(book.total_hrs for book in books),
+            total_seconds=sum(book.total_seconds for book in books),
+            books=books
+        )
+    
+    @staticmethod
+    async def rebuild_rollups() -> int:
+        """Recompute every rollup row from app_mm_focus_session, returns the number of rows written"""
+        response = await get_repository().rpc("rebuild_focus_session_rollup")
+        
+        return int(response.data or 0)
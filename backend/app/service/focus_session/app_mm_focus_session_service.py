@@ -1,19 +1,32 @@
 from uuid import UUID, uuid4
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime
-from util.supabase_config import supabase
+from service.repository.repository_provider import get_repository
+from service.repository.field_projection import parse_fields, select_columns, projection_model
+from service.repository.keyset_pagination import keyset_query, keyset_page
+from model.page_response import PageResponse
 from model.focus_session.app_mm_focus_session import (
     AppMmFocusSessionCreate,
     AppMmFocusSessionUpdate,
     AppMmFocusSessionResponse
 )
 from model.dto.focus_session_query_criteria import FocusSessionQueryCriteria
+from service.focus_session.app_mm_focus_session_rollup_service import AppMmFocusSessionRollupService
+
+def _rollup_delta(focus_session: AppMmFocusSessionResponse, sign: int) -> dict:
+    return {
+        "user_guid": focus_session.user_guid,
+        "library_hdr_guid": focus_session.library_hdr_guid,
+        "session_count": sign,
+        "total_hrs": sign * float(focus_session.time_hrs or 0),
+        "total_seconds": sign * int(focus_session.time_seconds or 0)
+    }
 
 class AppMmFocusSessionService:
     TABLE_NAME = "app_mm_focus_session"
     
     @staticmethod
-    def create_focus_session(focus_session_data: AppMmFocusSessionCreate) -> AppMmFocusSessionResponse:
+    async def create_focus_session(focus_session_data: AppMmFocusSessionCreate) -> AppMmFocusSessionResponse:
         """Create a new focus session"""
         new_focus_session = {
             "guid": str(uuid4()),
@@ -24,48 +37,57 @@ class AppMmFocusSessionService:
             "updated_date": datetime.utcnow().isoformat()
         }
         
-        response = supabase.table(AppMmFocusSessionService.TABLE_NAME).insert(new_focus_session).execute()
+        response = await get_repository().table(AppMmFocusSessionService.TABLE_NAME).insert(new_focus_session).execute()
         
         if not response.data:
             raise Exception("Failed to create focus session")
         
-        return AppMmFocusSessionResponse(**response.data[0])
+        focus_session = AppMmFocusSessionResponse(**response.data[0])
+        await AppMmFocusSessionRollupService.apply_delta(**_rollup_delta(focus_session, 1))
+        
+        return focus_session
     
     @staticmethod
-    def get_focus_session_by_id(focus_session_id: UUID) -> Optional[AppMmFocusSessionResponse]:
+    async def get_focus_session_by_id(focus_session_id: UUID, fields: Optional[str] = None) -> Optional[AppMmFocusSessionResponse]:
         """Get focus session by GUID"""
-        response = supabase.table(AppMmFocusSessionService.TABLE_NAME).select("*").eq("guid", str(focus_session_id)).execute()
+        columns = parse_fields(fields, AppMmFocusSessionResponse)
+        response = await get_repository().table(AppMmFocusSessionService.TABLE_NAME).select(select_columns(columns)).eq("guid", str(focus_session_id)).execute()
         
         if not response.data:
             return None
         
-        return AppMmFocusSessionResponse(**response.data[0])
+        return projection_model(AppMmFocusSessionResponse, columns)(**response.data[0])
     
     @staticmethod
-    def get_all_focus_sessions() -> List[AppMmFocusSessionResponse]:
-        """Get all focus sessions"""
-        response = supabase.table(AppMmFocusSessionService.TABLE_NAME).select("*").execute()
+    async def get_all_focus_sessions(limit: Optional[int] = None, cursor: Optional[str] = None) -> PageResponse[AppMmFocusSessionResponse]:
+        """Get a page of focus sessions"""
+        query = get_repository().table(AppMmFocusSessionService.TABLE_NAME).select("*")
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmFocusSessionResponse(**session) for session in response.data]
+        return keyset_page(response.data, limit, AppMmFocusSessionResponse)
     
     @staticmethod
-    def get_focus_sessions_by_user(user_guid: UUID) -> List[AppMmFocusSessionResponse]:
-        """Get all focus sessions for a specific user"""
-        response = supabase.table(AppMmFocusSessionService.TABLE_NAME).select("*").eq("user_guid", str(user_guid)).execute()
+    async def get_focus_sessions_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmFocusSessionResponse]:
+        """Get a page of focus sessions for a specific user"""
+        columns = parse_fields(fields, AppMmFocusSessionResponse, "created_date")
+        query = get_repository().table(AppMmFocusSessionService.TABLE_NAME).select(select_columns(columns)).eq("user_guid", str(user_guid))
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmFocusSessionResponse(**session) for session in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmFocusSessionResponse, columns))
     
     @staticmethod
-    def get_focus_sessions_by_library(library_hdr_guid: UUID) -> List[AppMmFocusSessionResponse]:
-        """Get all focus sessions for a specific library header"""
-        response = supabase.table(AppMmFocusSessionService.TABLE_NAME).select("*").eq("library_hdr_guid", str(library_hdr_guid)).execute()
+    async def get_focus_sessions_by_library(library_hdr_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmFocusSessionResponse]:
+        """Get a page of focus sessions for a specific library header"""
+        columns = parse_fields(fields, AppMmFocusSessionResponse, "created_date")
+        query = get_repository().table(AppMmFocusSessionService.TABLE_NAME).select(select_columns(columns)).eq("library_hdr_guid", str(library_hdr_guid))
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmFocusSessionResponse(**session) for session in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmFocusSessionResponse, columns))
     
     @staticmethod
-    def get_focus_sessions_by_criteria(criteria: FocusSessionQueryCriteria) -> List[AppMmFocusSessionResponse]:
-        """Get focus sessions by query criteria"""
-        query = supabase.table(AppMmFocusSessionService.TABLE_NAME).select("*")
+    async def get_focus_sessions_by_criteria(criteria: FocusSessionQueryCriteria) -> PageResponse[AppMmFocusSessionResponse]:
+        """Get a page of focus sessions by query criteria"""
+        query = get_repository().table(AppMmFocusSessionService.TABLE_NAME).select("*")
         
         # Apply filters based on provided criteria
         if criteria.guid:
@@ -75,17 +97,17 @@ class AppMmFocusSessionService:
         if criteria.library_hdr_guid:
             query = query.eq("library_hdr_guid", str(criteria.library_hdr_guid))
         
-        response = query.execute()
+        response = await keyset_query(query, criteria.cursor, criteria.limit).execute()
         
-        return [AppMmFocusSessionResponse(**session) for session in response.data]
+        return keyset_page(response.data, criteria.limit, AppMmFocusSessionResponse)
     
     @staticmethod
-    def update_focus_session(focus_session_id: UUID, focus_session_data: AppMmFocusSessionUpdate) -> Optional[AppMmFocusSessionResponse]:
+    async def update_focus_session(focus_session_id: UUID, focus_session_data: AppMmFocusSessionUpdate) -> Optional[AppMmFocusSessionResponse]:
         """Update focus session by GUID"""
         update_data = focus_session_data.model_dump(exclude_unset=True)
         
         if not update_data:
-            return AppMmFocusSessionService.get_focus_session_by_id(focus_session_id)
+            return await AppMmFocusSessionService.get_focus_session_by_id(focus_session_id)
         
         # Convert UUID fields to strings
         if "user_guid" in update_data:
@@ -95,9 +117,11 @@ class AppMmFocusSessionService:
         if "time_hrs" in update_data and update_data["time_hrs"] is not None:
             update_data["time_hrs"] = float(update_data["time_hrs"])
         
-        update_data["updated_date"] = datetime.utcnow().isoformat()
-        
-        response = supabase.table(AppMmFocusSessionService.TABLE_NAME).update(update_data).eq("guid", str(focus_session_id)).execute()
+        # One database call updates the row and moves its time between rollup rows atomically
+        response = await get_repository().rpc("update_focus_session_with_rollup", {
+            "p_guid": str(focus_session_id),
+            "p_changes": update_data
+        })
         
         if not response.data:
             return None
@@ -105,8 +129,11 @@ class AppMmFocusSessionService:
         return AppMmFocusSessionResponse(**response.data[0])
     
     @staticmethod
-    def delete_focus_session(focus_session_id: UUID) -> bool:
+    async def delete_focus_session(focus_session_id: UUID) -> bool:
         """Delete focus session by GUID"""
-        response = supabase.table(AppMmFocusSessionService.TABLE_NAME).delete().eq("guid", str(focus_session_id)).execute()
+        response = await get_repository().table(AppMmFocusSessionService.TABLE_NAME).delete().eq("guid", str(focus_session_id)).execute()
+        
+        for deleted in response.data:
+            await AppMmFocusSessionRollupService.apply_delta(**_rollup_delta(AppMmFocusSessionResponse(**deleted), -1))
         
         return len(response.data) > 0
@@ -0,0 +1,15 @@
+"""
+Recompute app_mm_focus_session_rollup from app_mm_focus_session to repair any drift.
+
+Run from backend/app:
+    python -m service.focus_session.rebuild_focus_session_rollup
+"""
+import asyncio
+from service.focus_session.app_mm_focus_session_rollup_service import AppMmFocusSessionRollupService
+
+async def main() -> None:
+    row_count = await AppMmFocusSessionRollupService.rebuild_rollups()
+    print(f"Rebuilt {row_count} focus session rollup rows")
+
+if __name__ == "__main__":
+    asyncio.run(main())
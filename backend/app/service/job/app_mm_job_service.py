@@ -0,0 +1,99 @@
+import random
+import asyncio
+from uuid import UUID, uuid4
+from typing import Any, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from service.repository.repository_provider import get_repository
+from model.job.app_mm_job import AppMmJobCreate, AppMmJobResponse, JobStatus
+
+# Set by enqueue so idle workers pick new jobs up without waiting for the next poll
+job_available = asyncio.Event()
+
+class AppMmJobService:
+    TABLE_NAME = "app_mm_job"
+    RETRY_BASE_SECONDS = 2.0
+    RETRY_MAX_SECONDS = 300.0
+    
+    @staticmethod
+    async def enqueue(job_data: AppMmJobCreate) -> AppMmJobResponse:
+        """Persist a new job in the QUEUED state"""
+        now = datetime.now(timezone.utc)
+        new_job = {
+            "guid": str(uuid4()),
+            "job_type": job_data.job_type,
+            "payload": job_data.payload,
+            "status": JobStatus.QUEUED.value,
+            "attempts": 0,
+            "max_attempts": job_data.max_attempts,
+            "run_after": (job_data.run_after or now).isoformat(),
+            "updated_date": now.isoformat()
+        }
+        
+        response = await get_repository().table(AppMmJobService.TABLE_NAME).insert(new_job).execute()
+        
+        if not response.data:
+            raise Exception("Failed to enqueue job")
+        
+        job_available.set()
+        
+        return AppMmJobResponse(**response.data[0])
+    
+    @staticmethod
+    async def get_job_by_id(job_id: UUID) -> Optional[AppMmJobResponse]:
+        """Get job by GUID"""
+        response = await get_repository().table(AppMmJobService.TABLE_NAME).select("*").eq("guid", str(job_id)).execute()
+        
+        if not response.data:
+            return None
+        
+        return AppMmJobResponse(**response.data[0])
+    
+    @staticmethod
+    async def claim_next_job() -> Optional[AppMmJobResponse]:
+        """Atomically move the oldest runnable job to RUNNING and return it"""
+        response = await get_repository().rpc("claim_next_job")
+        
+        if not response.data:
+            return None
+        
+        return AppMmJobResponse(**response.data[0])
+    
+    @staticmethod
+    async def mark_succeeded(job_id: UUID, result: Optional[Dict[str, Any]] = None) -> None:
+        """Record a finished job"""
+        update_data = {
+            "status": JobStatus.SUCCEEDED.value,
+            "result": result,
+            "last_error": None,
+            "updated_date": datetime.now(timezone.utc).isoformat()
+        }
+        
+        await get_repository().table(AppMmJobService.TABLE_NAME).update(update_data).eq("guid", str(job_id)).execute()
+    
+    @staticmethod
+    async def mark_failed(job: AppMmJobResponse, error: str) -> None:
+        """Requeue a failed attempt with jittered exponential backoff, or fail the job once attempts run out"""
+        now = datetime.now(timezone.utc)
+        update_data: Dict[str, Any] = {
+            "last_error": error,
+            "updated_date": now.isoformat()
+        }
+        
+        if job.attempts < job.max_attempts:
+            delay = min(AppMmJobService.RETRY_MAX_SECONDS, AppMmJobService.RETRY_BASE_SECONDS * (2 ** (job.attempts - 1)))
+            update_data["status"] = JobStatus.QUEUED.value
+            update_data["run_after"] = (now + timedelta(seconds=random.uniform(delay / 2, delay))).isoformat()
+        else:
+            update_data["status"] = JobStatus.FAILED.value
+        
+        await get_repository().table(AppMmJobService.TABLE_NAME).update(update_data).eq("guid", str(job.guid)).execute()
+    
+    @staticmethod
+    async def requeue_stale_jobs(stale_seconds: int) -> int:
+        """
+        Requeue jobs left RUNNING longer than stale_seconds, e.g. by a process that was killed mid job,
+        failing those already on their last attempt. Returns how many were recovered.
+        """
+        response = await get_repository().rpc("requeue_stale_jobs", {"p_stale_seconds": stale_seconds})
+        
+        return int(response.data or 0)
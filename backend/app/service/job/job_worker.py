@@ -0,0 +1,104 @@
+import asyncio
+import traceback
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from util.settings import get_settings
+from service.job.app_mm_job_service import AppMmJobService, job_available
+from model.job.app_mm_job import AppMmJobResponse
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+# Job handlers registered by job type. A handler gets the job payload and returns an optional result dict;
+# raising marks the attempt as failed and the job is retried until max_attempts.
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+def job_handler(job_type: str):
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = handler
+        return handler
+    return register
+
+class JobWorkerPool:
+    """
+    In-process pool of asyncio workers draining app_mm_job. Jobs are claimed through the claim_next_job
+    function, so several processes can run pools against the same table. Jobs stranded RUNNING by a
+    process that died are recovered at start and every stale_check_interval seconds after.
+    """
+    
+    def __init__(self, concurrency: int, poll_interval: float = 2.0, job_timeout: float = 120.0, stale_seconds: int = 600, stale_check_interval: float = 60.0):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.stale_seconds = stale_seconds
+        self.stale_check_interval = stale_check_interval
+        self._tasks: List[asyncio.Task] = []
+    
+    async def start(self) -> None:
+        if self._tasks or self.concurrency <= 0:
+            return
+        
+        await self._requeue_stale()
+        
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._reap()))
+    
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def _requeue_stale(self) -> None:
+        try:
+            recovered = await AppMmJobService.requeue_stale_jobs(self.stale_seconds)
+            if recovered:
+                print(f"Recovered {recovered} stale jobs")
+        except Exception as e:
+            print(f"Error requeueing stale jobs: {str(e)}")
+    
+    async def _reap(self) -> None:
+        while True:
+            await asyncio.sleep(self.stale_check_interval)
+            await self._requeue_stale()
+    
+    async def _work(self) -> None:
+        while True:
+            try:
+                job = await AppMmJobService.claim_next_job()
+            except Exception as e:
+                print(f"Error claiming job: {str(e)}")
+                job = None
+            
+            if job is None:
+                await self._wait_for_job()
+                continue
+            
+            await self._run(job)
+    
+    async def _wait_for_job(self) -> None:
+        job_available.clear()
+        try:
+            await asyncio.wait_for(job_available.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def _run(self, job: AppMmJobResponse) -> None:
+        handler = JOB_HANDLERS.get(job.job_type)
+        
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job type '{job.job_type}'")
+            
+            result = await asyncio.wait_for(handler(job.payload or {}), timeout=self.job_timeout)
+            await AppMmJobService.mark_succeeded(job.guid, result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Job {job.guid} ({job.job_type}) attempt {job.attempts} failed: {str(e)}")
+            traceback.print_exc()
+            await AppMmJobService.mark_failed(job, str(e) or e.__class__.__name__)
+
+job_worker_pool = JobWorkerPool(
+    concurrency=get_settings().job_workers,
+    poll_interval=get_settings().job_poll_interval_seconds
+)
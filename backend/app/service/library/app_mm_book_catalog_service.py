@@ -0,0 +1,99 @@
+from uuid import UUID, uuid4
+from typing import Optional
+from datetime import datetime
+from service.repository.repository_provider import get_repository
+from util.entity_cache import entity_cache
+from service.file.app_mm_file_upload_service import AppMmFileUploadService
+from model.library.app_mm_book_catalog import AppMmBookCatalogCreate, AppMmBookCatalogResponse
+
+class AppMmBookCatalogService:
+    TABLE_NAME = "app_mm_book_catalog"
+    ENTITY_TYPE = "book_catalog"
+    
+    @staticmethod
+    async def create_catalog(catalog_data: AppMmBookCatalogCreate) -> AppMmBookCatalogResponse:
+        """Create a new catalog entry"""
+        new_catalog = {
+            "guid": str(uuid4()),
+            "volume_id": catalog_data.volume_id,
+            "isbn_13": catalog_data.isbn_13,
+            "isbn_10": catalog_data.isbn_10,
+            "title": catalog_data.title,
+            "authors": catalog_data.authors,
+            "description": catalog_data.description,
+            "cover_file_guid": str(catalog_data.cover_file_guid) if catalog_data.cover_file_guid else None,
+            "updated_date": datetime.now().isoformat()
+        }
+        
+        response = await get_repository().table(AppMmBookCatalogService.TABLE_NAME).insert(new_catalog).execute()
+        
+        if not response.data:
+            raise Exception("Failed to create book catalog entry")
+        
+        return AppMmBookCatalogResponse(**response.data[0])
+    
+    @staticmethod
+    async def get_catalog_by_id(catalog_id: UUID) -> Optional[AppMmBookCatalogResponse]:
+        """Get catalog entry by GUID (served from the entity cache when possible)"""
+        return await entity_cache.get_or_load(AppMmBookCatalogService.ENTITY_TYPE, catalog_id, lambda: AppMmBookCatalogService._load_by_id(catalog_id))
+    
+    @staticmethod
+    async def _load_by_id(catalog_id: UUID) -> Optional[AppMmBookCatalogResponse]:
+        """Get catalog entry by GUID from the repository, bypassing the cache"""
+        response = await get_repository().table(AppMmBookCatalogService.TABLE_NAME).select("*").eq("guid", str(catalog_id)).execute()
+        
+        if not response.data:
+            return None
+        
+        return AppMmBookCatalogResponse(**response.data[0])
+    
+    @staticmethod
+    async def get_catalog_by_identifier(volume_id: Optional[str] = None, isbn_13: Optional[str] = None) -> Optional[AppMmBookCatalogResponse]:
+        """Get catalog entry by Google volume ID, falling back to ISBN-13"""
+        for column, value in (("volume_id", volume_id), ("isbn_13", isbn_13)):
+            if not value:
+                continue
+            
+            response = await get_repository().table(AppMmBookCatalogService.TABLE_NAME).select("*").eq(column, value).limit(1).execute()
+            
+            if response.data:
+                return AppMmBookCatalogResponse(**response.data[0])
+        
+        return None
+    
+    @staticmethod
+    async def get_or_create_catalog(catalog_data: AppMmBookCatalogCreate) -> AppMmBookCatalogResponse:
+        """Get the catalog entry for a volume or create it, tolerating a concurrent create of the same volume"""
+        catalog = await AppMmBookCatalogService.get_catalog_by_identifier(catalog_data.volume_id, catalog_data.isbn_13)
+        
+        if catalog:
+            return catalog
+        
+        try:
+            return await AppMmBookCatalogService.create_catalog(catalog_data)
+        except Exception:
+            # Lost the race on the unique volume_id / isbn_13, read the winner's row
+            catalog = await AppMmBookCatalogService.get_catalog_by_identifier(catalog_data.volume_id, catalog_data.isbn_13)
+            
+            if not catalog:
+                raise
+            
+            return catalog
+    
+    @staticmethod
+    async def set_cover_file_if_unset(catalog_id: UUID, cover_file_guid: UUID) -> Optional[AppMmBookCatalogResponse]:
+        """
+        Set the canonical cover file of a catalog entry that has none, taking the catalog's reference on
+        the file in the same statement. None when another cover was set first (no reference is taken).
+        """
+        response = await get_repository().rpc("set_book_catalog_cover_file", {
+            "p_catalog_guid": str(catalog_id),
+            "p_file_guid": str(cover_file_guid)
+        })
+        entity_cache.invalidate(AppMmBookCatalogService.ENTITY_TYPE, catalog_id)
+        
+        if not response.data:
+            return None
+        
+        entity_cache.invalidate(AppMmFileUploadService.ENTITY_TYPE, cover_file_guid)
+        return AppMmBookCatalogResponse(**response.data[0])
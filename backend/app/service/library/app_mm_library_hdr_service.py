@@ -1,25 +1,41 @@
 from uuid import UUID, uuid4
-from typing import List, Optional
-from util.supabase_config import supabase
-from model.library.app_mm_library_hdr import AppMmLibraryHdrCreate, AppMmLibraryHdrUpdate, AppMmLibraryHdrResponse, AppMmLibraryHdrWithFileResponse
+from typing import Any, Dict, List, Optional, Tuple
+from service.repository.repository_provider import get_repository
+from service.repository.field_projection import parse_fields, select_columns, projection_model, project
+from util.entity_cache import entity_cache
+from util.storage_url import build_public_urls
+from util.image_variants import validate_variant
+from util.text_normalization import normalize_book_name
+from service.repository.keyset_pagination import decode_cursor, encode_cursor, keyset_query, keyset_page, page_size, split_page
+from model.page_response import PageResponse
+from service.focus_session.app_mm_focus_session_rollup_service import AppMmFocusSessionRollupService
+from service.file.app_mm_file_upload_service import AppMmFileUploadService
+from model.focus_session.app_mm_focus_session_stats import AppMmFocusSessionStatsResponse
+from model.library.app_mm_library_hdr import AppMmLibraryHdrCreate, AppMmLibraryHdrUpdate, AppMmLibraryHdrResponse, AppMmLibraryHdrWithCoverResponse, AppMmLibraryHdrWithFileResponse
 
 class AppMmLibraryHdrService:
     TABLE_NAME = "app_mm_library_hdr"
+    ENTITY_TYPE = "library_hdr"
     FILE_UPLOAD_TABLE = "app_mm_file_upload"
-    FOCUS_SESSION_TABLE = "app_mm_focus_session"
+    WITH_COVER_COLUMNS = "*, cover_file:app_mm_file_upload!file_guid(*), book_catalog:app_mm_book_catalog!catalog_guid(*)"
+    # Trigram search needs a full trigram to match on, shorter names fall back to a substring match
+    FUZZY_MIN_QUERY_CHARS = 3
+    FUZZY_MIN_SIMILARITY = 0.4
+    FUZZY_MAX_RESULTS = 200
     
     @staticmethod
-    def create_library_hdr(library_hdr_data: AppMmLibraryHdrCreate) -> AppMmLibraryHdrResponse:
+    async def create_library_hdr(library_hdr_data: AppMmLibraryHdrCreate) -> AppMmLibraryHdrResponse:
         """Create a new library header"""
         new_library_hdr = {
             "guid": str(uuid4()),
             "user_guid": str(library_hdr_data.user_guid),
             "book_name": library_hdr_data.book_name,
             "book_desc": library_hdr_data.book_desc,
-            "file_guid": str(library_hdr_data.file_guid) if library_hdr_data.file_guid else None
+            "file_guid": str(library_hdr_data.file_guid) if library_hdr_data.file_guid else None,
+            "catalog_guid": str(library_hdr_data.catalog_guid) if library_hdr_data.catalog_guid else None
         }
         
-        response = supabase.table(AppMmLibraryHdrService.TABLE_NAME).insert(new_library_hdr).execute()
+        response = await get_repository().table(AppMmLibraryHdrService.TABLE_NAME).insert(new_library_hdr).execute()
         
         if not response.data:
             raise Exception("Failed to create library header")
@@ -27,9 +43,17 @@ class AppMmLibraryHdrService:
         return AppMmLibraryHdrResponse(**response.data[0])
     
     @staticmethod
-    def get_library_hdr_by_id(library_hdr_id: UUID) -> Optional[AppMmLibraryHdrResponse]:
-        """Get library header by GUID"""
-        response = supabase.table(AppMmLibraryHdrService.TABLE_NAME).select("*").eq("guid", str(library_hdr_id)).execute()
+    async def get_library_hdr_by_id(library_hdr_id: UUID, fields: Optional[str] = None) -> Optional[AppMmLibraryHdrResponse]:
+        """Get library header by GUID (served from the entity cache when possible)"""
+        columns = parse_fields(fields, AppMmLibraryHdrResponse)
+        entity = await entity_cache.get_or_load(AppMmLibraryHdrService.ENTITY_TYPE, library_hdr_id, lambda: AppMmLibraryHdrService._load_by_id(library_hdr_id))
+        
+        return project(entity, columns)
+    
+    @staticmethod
+    async def _load_by_id(library_hdr_id: UUID) -> Optional[AppMmLibraryHdrResponse]:
+        """Get library header by GUID from the repository, bypassing the cache"""
+        response = await get_repository().table(AppMmLibraryHdrService.TABLE_NAME).select("*").eq("guid", str(library_hdr_id)).execute()
         
         if not response.data:
             return None
@@ -37,40 +61,90 @@ class AppMmLibraryHdrService:
         return AppMmLibraryHdrResponse(**response.data[0])
     
     @staticmethod
-    def get_all_library_hdrs() -> List[AppMmLibraryHdrResponse]:
-        """Get all library headers"""
-        response = supabase.table(AppMmLibraryHdrService.TABLE_NAME).select("*").execute()
+    async def get_all_library_hdrs(limit: Optional[int] = None, cursor: Optional[str] = None) -> PageResponse[AppMmLibraryHdrResponse]:
+        """Get a page of library headers"""
+        query = get_repository().table(AppMmLibraryHdrService.TABLE_NAME).select("*")
+        response = await keyset_query(query, cursor, limit).execute()
+        
+        return keyset_page(response.data, limit, AppMmLibraryHdrResponse)
+    
+    @staticmethod
+    async def get_library_hdrs_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmLibraryHdrResponse]:
+        """Get a page of library headers for a specific user"""
+        columns = parse_fields(fields, AppMmLibraryHdrResponse, "created_date")
+        query = get_repository().table(AppMmLibraryHdrService.TABLE_NAME).select(select_columns(columns)).eq("user_guid", str(user_guid))
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmLibraryHdrResponse(**library_hdr) for library_hdr in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmLibraryHdrResponse, columns))
     
     @staticmethod
-    def get_library_hdrs_by_user(user_guid: UUID) -> List[AppMmLibraryHdrResponse]:
-        """Get all library headers for a specific user"""
-        response = supabase.table(AppMmLibraryHdrService.TABLE_NAME).select("*").eq("user_guid", str(user_guid)).execute()
+    async def get_library_hdr_by_book_name(user_guid: UUID, book_name: str) -> Optional[AppMmLibraryHdrWithCoverResponse]:
+        """Get a user's library header by normalized book name, with its cover file embedded (one indexed query)"""
+        response = await get_repository().table(AppMmLibraryHdrService.TABLE_NAME).select(AppMmLibraryHdrService.WITH_COVER_COLUMNS).eq("user_guid", str(user_guid)).eq("book_name_normalized", normalize_book_name(book_name)).limit(1).execute()
         
-        return [AppMmLibraryHdrResponse(**library_hdr) for library_hdr in response.data]
+        if not response.data:
+            return None
+        
+        return AppMmLibraryHdrWithCoverResponse(**response.data[0])
     
     @staticmethod
-    def update_library_hdr(library_hdr_id: UUID, library_hdr_data: AppMmLibraryHdrUpdate) -> Optional[AppMmLibraryHdrResponse]:
+    async def get_library_hdr_by_catalog(user_guid: UUID, catalog_guid: UUID) -> Optional[AppMmLibraryHdrWithCoverResponse]:
+        """Get a user's library header for a catalog book, with its cover file embedded"""
+        response = await get_repository().table(AppMmLibraryHdrService.TABLE_NAME).select(AppMmLibraryHdrService.WITH_COVER_COLUMNS).eq("user_guid", str(user_guid)).eq("catalog_guid", str(catalog_guid)).limit(1).execute()
+        
+        if not response.data:
+            return None
+        
+        return AppMmLibraryHdrWithCoverResponse(**response.data[0])
+    
+    @staticmethod
+    async def update_library_hdr(library_hdr_id: UUID, library_hdr_data: AppMmLibraryHdrUpdate) -> Optional[AppMmLibraryHdrResponse]:
         """Update library header by GUID"""
         update_data = library_hdr_data.model_dump(exclude_unset=True)
         
         if not update_data:
-            return AppMmLibraryHdrService.get_library_hdr_by_id(library_hdr_id)
+            return await AppMmLibraryHdrService.get_library_hdr_by_id(library_hdr_id)
         
-        # Convert UUID to string for Supabase
+        # The record holds its own reference on its cover file: take one on a new file, drop the old one once the update is in
+        previous_file_guid = None
+        acquired_file_guid = None
         if "file_guid" in update_data:
+            current = await AppMmLibraryHdrService._load_by_id(library_hdr_id)
+            
+            if not current:
+                return None
+            
+            if update_data["file_guid"] != current.file_guid:
+                previous_file_guid = current.file_guid
+                acquired_file_guid = update_data["file_guid"]
+                
+                if acquired_file_guid and not await AppMmFileUploadService.acquire_file_upload(acquired_file_guid):
+                    raise ValueError("File upload not found")
+            
+            # Convert UUID to string for Supabase
             update_data["file_guid"] = str(update_data["file_guid"]) if update_data["file_guid"] else None
         
-        response = supabase.table(AppMmLibraryHdrService.TABLE_NAME).update(update_data).eq("guid", str(library_hdr_id)).execute()
+        try:
+            response = await get_repository().table(AppMmLibraryHdrService.TABLE_NAME).update(update_data).eq("guid", str(library_hdr_id)).execute()
+        except Exception:
+            if acquired_file_guid:
+                await AppMmFileUploadService.delete_file_upload(acquired_file_guid)
+            raise
+        
+        entity_cache.invalidate(AppMmLibraryHdrService.ENTITY_TYPE, library_hdr_id)
         
         if not response.data:
+            if acquired_file_guid:
+                await AppMmFileUploadService.delete_file_upload(acquired_file_guid)
             return None
         
+        if previous_file_guid:
+            await AppMmFileUploadService.delete_file_upload(previous_file_guid)
+        
         return AppMmLibraryHdrResponse(**response.data[0])
     
     @staticmethod
-    def update_last_read(library_hdr_id: UUID) -> Optional[AppMmLibraryHdrResponse]:
+    async def update_last_read(library_hdr_id: UUID) -> Optional[AppMmLibraryHdrResponse]:
         """Update last_read timestamp to current time"""
         from datetime import datetime, timezone
         
@@ -78,7 +152,8 @@ class AppMmLibraryHdrService:
             "last_read": datetime.now(timezone.utc).isoformat()
         }
         
-        response = supabase.table(AppMmLibraryHdrService.TABLE_NAME).update(update_data).eq("guid", str(library_hdr_id)).execute()
+        response = await get_repository().table(AppMmLibraryHdrService.TABLE_NAME).update(update_data).eq("guid", str(library_hdr_id)).execute()
+        entity_cache.invalidate(AppMmLibraryHdrService.ENTITY_TYPE, library_hdr_id)
         
         if not response.data:
             return None
@@ -86,96 +161,115 @@ class AppMmLibraryHdrService:
         return AppMmLibraryHdrResponse(**response.data[0])
     
     @staticmethod
-    def delete_library_hdr(library_hdr_id: UUID) -> bool:
-        """Delete library header by GUID"""
-        response = supabase.table(AppMmLibraryHdrService.TABLE_NAME).delete().eq("guid", str(library_hdr_id)).execute()
+    async def delete_library_hdr(library_hdr_id: UUID) -> bool:
+        """Delete library header by GUID, releasing its reference on the cover file"""
+        response = await get_repository().table(AppMmLibraryHdrService.TABLE_NAME).delete().eq("guid", str(library_hdr_id)).execute()
+        entity_cache.invalidate(AppMmLibraryHdrService.ENTITY_TYPE, library_hdr_id)
+        
+        for row in response.data:
+            if row.get("file_guid"):
+                await AppMmFileUploadService.delete_file_upload(row["file_guid"])
         
         return len(response.data) > 0
-
+    
     @staticmethod
-    def get_library_hdrs_by_criteria(guid: Optional[UUID] = None, user_guid: Optional[UUID] = None, book_name: Optional[str] = None) -> List[AppMmLibraryHdrWithFileResponse]:
-        """Get library headers by criteria with file storage path and focus session stats (manual join), ordered by last_read descending"""
-        # First, query library headers with filters
-        query = supabase.table(AppMmLibraryHdrService.TABLE_NAME).select("*")
+    async def _search_by_book_name(book_name: str, guid: Optional[UUID], user_guid: Optional[UUID], limit: Optional[int], cursor: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        A page of library rows whose title fuzzily matches book_name (trigram word similarity, so typos
+        like "deap work" still match), best match first, with the cursor for the next page
+        """
+        response = await get_repository().rpc("search_library_hdrs_by_book_name", {
+            "p_user_guid": str(user_guid) if user_guid else None,
+            "p_query": book_name,
+            "p_min_similarity": AppMmLibraryHdrService.FUZZY_MIN_SIMILARITY,
+            "p_limit": AppMmLibraryHdrService.FUZZY_MAX_RESULTS
+        })
         
+        ranked = [str(row["guid"]) for row in response.data]
         if guid:
-            query = query.eq("guid", str(guid))
-        if user_guid:
-            query = query.eq("user_guid", str(user_guid))
-        if book_name:
-            query = query.ilike("book_name", f"%{book_name}%")
+            ranked = [ranked_guid for ranked_guid in ranked if ranked_guid == str(guid)]
+        
+        start = 0
+        if cursor:
+            position = decode_cursor(cursor)
+            # A last_read cursor from the unfiltered listing carries a timestamp, not a rank
+            if not isinstance(position["v"], int) or isinstance(position["v"], bool) or position["v"] < 0:
+                raise ValueError("Invalid cursor")
+            # Resume after the last title of the previous page, or at its rank when that title no longer matches
+            start = ranked.index(position["g"]) + 1 if position["g"] in ranked else position["v"] + 1
+        
+        size = page_size(limit)
+        page = ranked[start:start + size]
+        if not page:
+            return [], None
+        
+        next_cursor = encode_cursor({"rank": start + len(page) - 1, "guid": page[-1]}, "rank") if start + size < len(ranked) else None
+        
+        rows_response = await get_repository().table(AppMmLibraryHdrService.TABLE_NAME).select("*").in_("guid", page).execute()
+        rank = {ranked_guid: position for position, ranked_guid in enumerate(page)}
         
-        # Order by last_read descending
-        query = query.order("last_read", desc=True)
+        return sorted(rows_response.data, key=lambda row: rank[str(row["guid"])]), next_cursor
+    
+    @staticmethod
+    async def get_library_hdrs_by_criteria(guid: Optional[UUID] = None, user_guid: Optional[UUID] = None, book_name: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None, variant: Optional[str] = None) -> PageResponse[AppMmLibraryHdrWithFileResponse]:
+        """
+        Get a page of library headers by criteria with file storage path (optionally a sized image variant) and focus session stats (manual join),
+        ordered by last_read descending, or by title similarity when book_name is given
+        """
+        variant = validate_variant(variant)
+        book_name = normalize_book_name(book_name)
         
-        library_response = query.execute()
+        if book_name and len(book_name) >= AppMmLibraryHdrService.FUZZY_MIN_QUERY_CHARS:
+            library_rows, next_cursor = await AppMmLibraryHdrService._search_by_book_name(book_name, guid, user_guid, limit, cursor)
+        else:
+            # First, query library headers with filters
+            query = get_repository().table(AppMmLibraryHdrService.TABLE_NAME).select("*")
+            
+            if guid:
+                query = query.eq("guid", str(guid))
+            if user_guid:
+                query = query.eq("user_guid", str(user_guid))
+            if book_name:
+                query = query.ilike("book_name_normalized", f"%{book_name}%")
+            
+            # Order by last_read descending, one page at a time
+            library_response = await keyset_query(query, cursor, limit, "last_read").execute()
+            library_rows, next_cursor = split_page(library_response.data, limit, "last_read")
         
-        if not library_response.data:
-            return []
+        if not library_rows:
+            return PageResponse[AppMmLibraryHdrWithFileResponse](items=[])
         
         # Collect all library guids for focus session lookup
-        library_guids = [item["guid"] for item in library_response.data]
+        library_guids = [item["guid"] for item in library_rows]
         
         # Collect all unique file_guids that are not None
-        file_guids = [item["file_guid"] for item in library_response.data if item.get("file_guid")]
+        file_guids = [item["file_guid"] for item in library_rows if item.get("file_guid")]
         
         # Fetch file upload records if there are any file_guids
         file_map = {}
         if file_guids:
-            file_response = supabase.table(AppMmLibraryHdrService.FILE_UPLOAD_TABLE).select("guid, storage_path, bucket_name").in_("guid", file_guids).execute()
-            
-            # Create a map of file_guid -> public URL
-            for file_record in file_response.data:
-                try:
-                    # Get public URL from Supabase storage
-                    public_url = supabase.storage.from_(file_record["bucket_name"]).get_public_url(file_record["storage_path"])
-                    file_map[file_record["guid"]] = public_url
-                except Exception as e:
-                    print(f"Error getting public URL for {file_record['guid']}: {str(e)}")
-                    file_map[file_record["guid"]] = None
-        
-        # Fetch focus session stats
-        focus_stats_map = {}
-        if library_guids:
-            focus_response = supabase.table(AppMmLibraryHdrService.FOCUS_SESSION_TABLE).select("library_hdr_guid, time_hrs, time_seconds").in_("library_hdr_guid", library_guids).execute()
+            file_response = await get_repository().table(AppMmLibraryHdrService.FILE_UPLOAD_TABLE).select("guid, storage_path, bucket_name, public_url, metadata").in_("guid", file_guids).execute()
             
-            # Aggregate focus session data by library_hdr_guid
-            for session in focus_response.data:
-                lib_guid = session["library_hdr_guid"]
-                if lib_guid not in focus_stats_map:
-                    focus_stats_map[lib_guid] = {
-                        "count": 0,
-                        "total_hrs": 0.0,
-                        "total_seconds": 0
-                    }
-                
-                focus_stats_map[lib_guid]["count"] += 1
-                
-                # Add time_hrs (convert from Decimal/string to float)
-                if session.get("time_hrs"):
-                    try:
-                        focus_stats_map[lib_guid]["total_hrs"] += float(session["time_hrs"])
-                    except (ValueError, TypeError):
-                        pass
-                
-                # Add time_seconds
-                if session.get("time_seconds"):
-                    focus_stats_map[lib_guid]["total_seconds"] += int(session["time_seconds"])
+            # Create a map of file_guid -> public URL, built in bulk without storage client calls
+            file_map = build_public_urls(file_response.data, variant=variant)
+        
+        # Fetch focus session stats from the rollup table, one precomputed row per book
+        focus_stats_map = await AppMmFocusSessionRollupService.get_stats_by_library(library_guids)
         
         # Combine the data
         result = []
-        for item in library_response.data:
+        for item in library_rows:
             lib_guid = item["guid"]
             file_guid = item.get("file_guid")
             storage_path = file_map.get(file_guid) if file_guid else None
             
             # Get focus session stats
-            focus_stats = focus_stats_map.get(lib_guid, {"count": 0, "total_hrs": 0.0, "total_seconds": 0})
+            focus_stats = focus_stats_map.get(str(lib_guid), AppMmFocusSessionStatsResponse(library_hdr_guid=lib_guid))
             
             # Calculate total time focused
-            total_seconds = focus_stats["total_seconds"]
+            total_seconds = focus_stats.total_seconds
             total_hrs_from_seconds = total_seconds / 3600.0
-            total_hrs = focus_stats["total_hrs"] + total_hrs_from_seconds
+            total_hrs = focus_stats.total_hrs + total_hrs_from_seconds
             
             # Convert to hours and minutes
             time_focused_hrs = int(total_hrs)
@@ -193,11 +287,11 @@ class AppMmLibraryHdrService:
                 "created_date": item["created_date"],
                 "last_read": item["last_read"],
                 "storage_path": storage_path,
-                "session_count": focus_stats["count"],
+                "session_count": focus_stats.session_count,
                 "time_focused_hrs": time_focused_hrs,
                 "time_focused_minutes": time_focused_minutes,
                 "focus_time": focus_time
             }
             result.append(AppMmLibraryHdrWithFileResponse(**library_data))
         
-        return result
+        return PageResponse[AppMmLibraryHdrWithFileResponse](items=result, next_cursor=next_cursor)
@@ -1,77 +1,147 @@
-import requests
-import os
-from uuid import UUID, uuid4
+import asyncio
+from uuid import UUID
 from typing import Optional, Dict, Any
 from io import BytesIO
-from util.supabase_config import supabase, supabase_admin
+from util.settings import get_settings
+from util.storage_url import build_public_urls
+from util.disk_cache import DiskCache
+from util.http_client import http_client
+from util.text_normalization import normalize_book_name
 from service.library.app_mm_library_hdr_service import AppMmLibraryHdrService
+from service.file.file_store_service import FileStoreService
 from service.file.app_mm_file_upload_service import AppMmFileUploadService
-from model.library.app_mm_library_hdr import AppMmLibraryHdrCreate
-from model.file.app_mm_file_upload import AppMmFileUploadCreate
+from service.library.app_mm_book_catalog_service import AppMmBookCatalogService
+from service.job.app_mm_job_service import AppMmJobService
+from service.job.job_worker import job_handler
+from model.library.app_mm_library_hdr import AppMmLibraryHdrCreate, AppMmLibraryHdrUpdate
+from model.job.app_mm_job import AppMmJobCreate
+from model.library.app_mm_book_catalog import AppMmBookCatalogCreate
 from model.dto.book_search_dto import BookSearchResponseDto
-from dotenv import load_dotenv
 
-load_dotenv()
+_google_books_cache: Optional[DiskCache] = None
+
+def get_google_books_cache() -> DiskCache:
+    """Shared on-disk cache of Google Books lookups, opened on first use"""
+    global _google_books_cache
+    
+    if _google_books_cache is None:
+        _google_books_cache = DiskCache(get_settings().google_books_cache_path, "google_books_volume")
+    
+    return _google_books_cache
 
 class BookSearchService:
     GOOGLE_BOOKS_API_URL = "https://www.googleapis.com/books/v1/volumes"
-    STORAGE_BUCKET = os.environ.get("SUPABASE_STORAGE_BUCKET")
-    STORAGE_FOLDER = os.environ.get("SUPABASE_STORAGE_FOLDER")
+    STORAGE_BUCKET = get_settings().supabase_storage_bucket
+    STORAGE_FOLDER = get_settings().supabase_storage_folder
+    # Found volumes are kept for a week, empty results for an hour
+    CACHE_TTL_SECONDS = get_settings().google_books_cache_ttl_seconds
+    NEGATIVE_CACHE_TTL_SECONDS = get_settings().google_books_negative_cache_ttl_seconds
+    COVER_JOB_TYPE = "fetch_book_cover"
+    COVER_DOWNLOAD_DEADLINE_SECONDS = 20.0
     
     @staticmethod
-    def search_book(book_name: str, user_guid: UUID) -> Optional[BookSearchResponseDto]:
+    async def search_book(book_name: str, user_guid: UUID) -> Optional[BookSearchResponseDto]:
         """
         Search for a book by name. First checks local database, then Google Books API.
         """
         # Step 1: Search in local database
-        existing_books = AppMmLibraryHdrService.get_library_hdrs_by_user(user_guid)
-        for book in existing_books:
-            if book.book_name.lower() == book_name.lower():
-                # Found in database, retrieve file info if available
-                cover_url = None
-                if book.file_guid:
-                    file_record = AppMmFileUploadService.get_file_upload_by_id(book.file_guid)
-                    if file_record:
-                        # Get public URL from Supabase storage
-                        cover_url = BookSearchService._get_storage_public_url(
-                            file_record.bucket_name, 
-                            file_record.storage_path
-                        )
-                
+        book = await AppMmLibraryHdrService.get_library_hdr_by_book_name(user_guid, book_name)
+        if book:
+            # Found in database, the cover file record comes embedded in the same query
+            cover_url = None
+            if book.cover_file:
+                # Stored public URL, or one built locally for older rows
+                cover_url = build_public_urls([book.cover_file]).get(str(book.cover_file.guid))
+            
+            return BookSearchResponseDto(
+                guid=book.guid,
+                book_name=book.book_name,
+                author=book.book_catalog.authors if book.book_catalog else None,
+                description=book.book_desc,
+                cover_image_url=cover_url,
+                file_guid=book.file_guid,
+                catalog_guid=book.catalog_guid
+            )
+        
+        # Step 2: Not found locally, search Google Books API
+        google_book_data = await BookSearchService._search_google_books(book_name)
+        if not google_book_data:
+            return None
+        
+        cover_url = google_book_data.get("cover_url")
+        
+        # Step 3: Shared catalog entry, one per distinct volume across all users
+        catalog = None
+        if google_book_data.get("volume_id") or google_book_data.get("isbn_13"):
+            catalog = await AppMmBookCatalogService.get_or_create_catalog(AppMmBookCatalogCreate(
+                volume_id=google_book_data.get("volume_id"),
+                isbn_13=google_book_data.get("isbn_13"),
+                isbn_10=google_book_data.get("isbn_10"),
+                title=google_book_data.get("title") or book_name,
+                authors=google_book_data.get("author"),
+                description=google_book_data.get("description")
+            ))
+            
+            # The user may already own this volume under a different search string
+            book = await AppMmLibraryHdrService.get_library_hdr_by_catalog(user_guid, catalog.guid)
+            if book:
                 return BookSearchResponseDto(
                     guid=book.guid,
                     book_name=book.book_name,
-                    author=None,  # Not stored in current schema
+                    author=catalog.authors,
                     description=book.book_desc,
                     cover_image_url=cover_url,
-                    file_guid=book.file_guid
+                    file_guid=book.file_guid,
+                    catalog_guid=catalog.guid
                 )
         
-        # Step 2: Not found locally, search Google Books API
-        google_book_data = BookSearchService._search_google_books(book_name)
-        if not google_book_data:
-            return None
-        
-        # Step 3: Download and store cover image if available
+        # Step 4: Reuse the catalog cover when another user already stored it, through a reference on a row of this user's own
         file_guid = None
-        cover_url = google_book_data.get("cover_url")
-        
-        if cover_url:
-            file_guid = BookSearchService._download_and_store_cover(
-                cover_url, 
-                book_name, 
-                user_guid
+        catalog_cover = await AppMmFileUploadService.get_file_upload_by_id(catalog.cover_file_guid) if catalog and catalog.cover_file_guid else None
+        if catalog_cover and catalog_cover.content_hash:
+            file_record = await AppMmFileUploadService.acquire_file_upload_by_hash(
+                user_guid,
+                catalog_cover.bucket_name,
+                catalog_cover.content_hash,
+                {"source": "google_books", "book_name": google_book_data.get("title", book_name)}
             )
+            file_guid = file_record.guid if file_record else None
         
-        # Step 4: Create library record
+        # Step 5: Create library record, it is returned before any cover download
         library_create = AppMmLibraryHdrCreate(
             user_guid=user_guid,
             book_name=google_book_data.get("title", book_name),
             book_desc=google_book_data.get("description"),
-            file_guid=file_guid
+            file_guid=file_guid,
+            catalog_guid=catalog.guid if catalog else None
         )
         
-        library_record = AppMmLibraryHdrService.create_library_hdr(library_create)
+        try:
+            # The reference taken above becomes the library record's
+            library_record = await AppMmLibraryHdrService.create_library_hdr(library_create)
+        except Exception:
+            if file_guid:
+                await AppMmFileUploadService.delete_file_upload(file_guid)
+            raise
+        
+        # Step 6: Fetch and store the cover in the background, the job patches file_guid when done
+        cover_job_guid = None
+        if not file_guid and cover_url:
+            try:
+                job = await AppMmJobService.enqueue(AppMmJobCreate(
+                    job_type=BookSearchService.COVER_JOB_TYPE,
+                    payload={
+                        "library_hdr_guid": str(library_record.guid),
+                        "catalog_guid": str(catalog.guid) if catalog else None,
+                        "cover_url": cover_url,
+                        "book_name": library_record.book_name,
+                        "user_guid": str(user_guid)
+                    }
+                ))
+                cover_job_guid = job.guid
+            except Exception as e:
+                # The book is usable without a cover, a failed enqueue is not worth failing the search for
+                print(f"Error enqueueing cover job: {str(e)}")
         
         return BookSearchResponseDto(
             guid=library_record.guid,
@@ -79,106 +149,157 @@ class BookSearchService:
             author=google_book_data.get("author"),
             description=library_record.book_desc,
             cover_image_url=cover_url,
-            file_guid=file_guid
+            file_guid=file_guid,
+            catalog_guid=library_record.catalog_guid,
+            cover_job_guid=cover_job_guid
         )
     
     @staticmethod
-    def _search_google_books(book_name: str) -> Optional[Dict[str, Any]]:
-        """Search Google Books API for book information"""
-        try:
-            api_key = os.environ.get("GOOGLE_BOOKS_API_KEY")
-            params = {"q": book_name, "maxResults": 1, "key": api_key}
-            response = requests.get(
-                BookSearchService.GOOGLE_BOOKS_API_URL, 
-                params=params, 
-                timeout=10
+    async def fetch_cover(payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Background half of search_book: store the cover once per catalog entry and patch the library
+        record's file_guid. The catalog and each library record hold their own reference on the user's
+        file upload row. Errors propagate so the job worker retries.
+        """
+        library_hdr_guid = UUID(payload["library_hdr_guid"])
+        user_guid = UUID(payload["user_guid"])
+        
+        # A retry after the library record was patched must not take another reference
+        library_hdr = await AppMmLibraryHdrService.get_library_hdr_by_id(library_hdr_guid)
+        if library_hdr and library_hdr.file_guid:
+            return {"file_guid": str(library_hdr.file_guid)}
+        
+        catalog_guid = UUID(payload["catalog_guid"]) if payload.get("catalog_guid") else None
+        catalog = await AppMmBookCatalogService.get_catalog_by_id(catalog_guid) if catalog_guid else None
+        
+        # Another job may have stored the same volume's cover in the meantime, reuse its bytes under this user
+        file_guid = None
+        catalog_cover = await AppMmFileUploadService.get_file_upload_by_id(catalog.cover_file_guid) if catalog and catalog.cover_file_guid else None
+        if catalog_cover and catalog_cover.content_hash:
+            file_record = await AppMmFileUploadService.acquire_file_upload_by_hash(
+                user_guid,
+                catalog_cover.bucket_name,
+                catalog_cover.content_hash,
+                {"source": "google_books", "book_name": payload.get("book_name")}
             )
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if not data.get("items"):
-                return None
-            
-            book_info = data["items"][0]["volumeInfo"]
-            
-            # Extract cover image URL (prefer high quality)
-            cover_url = None
-            if "imageLinks" in book_info:
-                cover_url = (
-                    book_info["imageLinks"].get("large") or
-                    book_info["imageLinks"].get("medium") or
-                    book_info["imageLinks"].get("thumbnail")
-                )
-            
-            # Extract authors
-            authors = book_info.get("authors", [])
-            author_str = ", ".join(authors) if authors else None
+            file_guid = file_record.guid if file_record else None
+        
+        if not file_guid:
+            file_guid = await BookSearchService._download_and_store_cover(
+                payload["cover_url"],
+                payload.get("book_name"),
+                user_guid
+            )
+        
+        try:
+            if catalog and not catalog.cover_file_guid:
+                # The catalog keeps the cover alive for later searches with a reference of its own, set by the first job only
+                await AppMmBookCatalogService.set_cover_file_if_unset(catalog.guid, file_guid)
             
-            return {
-                "title": book_info.get("title"),
-                "author": author_str,
-                "description": book_info.get("description"),
-                "cover_url": cover_url
-            }
+            library_hdr = await AppMmLibraryHdrService.update_library_hdr(
+                library_hdr_guid,
+                AppMmLibraryHdrUpdate(file_guid=file_guid)
+            )
+        finally:
+            # The library record takes its own reference in update_library_hdr, the one taken above is only this job's
+            await AppMmFileUploadService.delete_file_upload(file_guid)
+        
+        # None when the library record was deleted while the cover was being fetched
+        return {"file_guid": str(file_guid) if library_hdr else None}
+    
+    @staticmethod
+    async def _search_google_books(book_name: str) -> Optional[Dict[str, Any]]:
+        """Search Google Books API for book information, through the shared cache keyed by normalized query"""
+        cache = get_google_books_cache()
+        cache_key = normalize_book_name(book_name)
+        
+        found, cached = await asyncio.to_thread(cache.get, cache_key)
+        if found:
+            return cached
         
+        try:
+            book_data = await BookSearchService._fetch_google_books(book_name)
         except Exception as e:
+            # Failures are not cached, the next search retries
             print(f"Error searching Google Books: {str(e)}")
             return None
+        
+        ttl = BookSearchService.CACHE_TTL_SECONDS if book_data else BookSearchService.NEGATIVE_CACHE_TTL_SECONDS
+        await asyncio.to_thread(cache.set, cache_key, book_data, ttl)
+        
+        return book_data
     
     @staticmethod
-    def _download_and_store_cover(
-        image_url: str, 
-        book_name: str, 
-        user_guid: UUID
-    ) -> Optional[UUID]:
-        """Download cover image and store in Supabase storage"""
-        try:
-            # Download image
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            
-            # Determine file extension from content type
-            content_type = response.headers.get("content-type", "image/jpeg")
-            extension = content_type.split("/")[-1]
-            if extension not in ["jpeg", "jpg", "png", "webp"]:
-                extension = "jpg"
-            
-            # Generate unique filename
-            filename = f"{book_name.replace(' ', '_')}_{uuid4()}.{extension}"
-            storage_path = f"{BookSearchService.STORAGE_FOLDER}/{filename}"
-            
-            # Upload to Supabase storage using admin client (bypasses RLS)
-            supabase_admin.storage.from_(BookSearchService.STORAGE_BUCKET).upload(
-                storage_path,
-                response.content,
-                {"content-type": content_type}
-            )
-            
-            # Create file upload record
-            file_create = AppMmFileUploadCreate(
-                user_guid=user_guid,
-                file_name=filename,
-                mime_type=content_type,
-                storage_path=storage_path,
-                bucket_name=BookSearchService.STORAGE_BUCKET,
-                is_public=True,
-                metadata={"source": "google_books", "book_name": book_name}
-            )
-            
-            file_record = AppMmFileUploadService.create_file_upload(file_create)
-            return file_record.guid
+    async def _fetch_google_books(book_name: str) -> Optional[Dict[str, Any]]:
+        """Call the Google Books API, None when it has no match (errors are raised)"""
+        api_key = get_settings().google_books_api_key
+        params = {"q": book_name, "maxResults": 1, "key": api_key}
+        response = await http_client.get(BookSearchService.GOOGLE_BOOKS_API_URL, params=params)
+        response.raise_for_status()
         
-        except Exception as e:
-            print(f"Error downloading/storing cover image: {str(e)}")
+        data = response.json()
+        
+        if not data.get("items"):
             return None
+        
+        volume = data["items"][0]
+        book_info = volume["volumeInfo"]
+        
+        # Extract cover image URL (prefer high quality)
+        cover_url = None
+        if "imageLinks" in book_info:
+            cover_url = (
+                book_info["imageLinks"].get("large") or
+                book_info["imageLinks"].get("medium") or
+                book_info["imageLinks"].get("thumbnail")
+            )
+        
+        # Extract identifiers used as catalog keys
+        identifiers = {identifier.get("type"): identifier.get("identifier") for identifier in book_info.get("industryIdentifiers", [])}
+        
+        # Extract authors
+        authors = book_info.get("authors", [])
+        author_str = ", ".join(authors) if authors else None
+        
+        return {
+            "volume_id": volume.get("id"),
+            "isbn_13": identifiers.get("ISBN_13"),
+            "isbn_10": identifiers.get("ISBN_10"),
+            "title": book_info.get("title"),
+            "author": author_str,
+            "description": book_info.get("description"),
+            "cover_url": cover_url
+        }
     
     @staticmethod
-    def _get_storage_public_url(bucket_name: str, storage_path: str) -> Optional[str]:
-        """Get public URL for a file in Supabase storage"""
-        try:
-            result = supabase.storage.from_(bucket_name).get_public_url(storage_path)
-            return result
-        except Exception as e:
-            print(f"Error getting public URL: {str(e)}")
-            return None
+    async def _download_and_store_cover(
+        image_url: str, 
+        book_name: str, 
+        user_guid: UUID
+    ) -> UUID:
+        """Download cover image and store in Supabase storage (errors are raised)"""
+        # Download image
+        response = await http_client.get(image_url, deadline=BookSearchService.COVER_DOWNLOAD_DEADLINE_SECONDS)
+        response.raise_for_status()
+        
+        # Determine file extension from content type
+        content_type = response.headers.get("content-type", "image/jpeg")
+        extension = content_type.split("/")[-1]
+        if extension not in ["jpeg", "jpg", "png", "webp"]:
+            extension = "jpg"
+        
+        # Store the bytes once, a cover already in the bucket is reused without another upload
+        file_record = await FileStoreService.store(
+            response.content,
+            user_guid=user_guid,
+            bucket_name=BookSearchService.STORAGE_BUCKET,
+            folder=BookSearchService.STORAGE_FOLDER,
+            extension=extension,
+            content_type=content_type,
+            metadata={"source": "google_books", "book_name": book_name}
+        )
+        return file_record.guid
+
+@job_handler(BookSearchService.COVER_JOB_TYPE)
+async def fetch_book_cover(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await BookSearchService.fetch_cover(payload)
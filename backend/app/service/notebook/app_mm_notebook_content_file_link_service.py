@@ -1,6 +1,10 @@
 from uuid import UUID, uuid4
 from typing import List, Optional
-from util.supabase_config import supabase
+from service.repository.repository_provider import get_repository
+from service.repository.field_projection import parse_fields, select_columns, projection_model
+from service.repository.keyset_pagination import keyset_query, keyset_page
+from service.file.app_mm_file_upload_service import AppMmFileUploadService
+from model.page_response import PageResponse
 from model.notebook.app_mm_notebook_content_file_link import (
     AppMmNotebookContentFileLinkCreate,
     AppMmNotebookContentFileLinkUpdate,
@@ -11,7 +15,7 @@ class NotebookContentFileLinkService:
     TABLE_NAME = "app_mm_notebook_content_file_link"
     
     @staticmethod
-    def create(link_data: AppMmNotebookContentFileLinkCreate) -> AppMmNotebookContentFileLinkResponse:
+    async def create(link_data: AppMmNotebookContentFileLinkCreate) -> AppMmNotebookContentFileLinkResponse:
         """Create a new notebook content file link"""
         new_link = {
             "guid": str(uuid4()),
@@ -23,7 +27,7 @@ class NotebookContentFileLinkService:
             "highlight_metadata": link_data.highlight_metadata
         }
         
-        response = supabase.table(NotebookContentFileLinkService.TABLE_NAME).insert(new_link).execute()
+        response = await get_repository().table(NotebookContentFileLinkService.TABLE_NAME).insert(new_link).execute()
         
         if not response.data:
             raise Exception("Failed to create notebook content file link")
@@ -31,57 +35,77 @@ class NotebookContentFileLinkService:
         return AppMmNotebookContentFileLinkResponse(**response.data[0])
     
     @staticmethod
-    def get_by_guid(link_id: UUID) -> Optional[AppMmNotebookContentFileLinkResponse]:
+    async def get_by_guid(link_id: UUID, fields: Optional[str] = None) -> Optional[AppMmNotebookContentFileLinkResponse]:
         """Get notebook content file link by GUID"""
-        response = supabase.table(NotebookContentFileLinkService.TABLE_NAME).select("*").eq("guid", str(link_id)).execute()
+        columns = parse_fields(fields, AppMmNotebookContentFileLinkResponse)
+        response = await get_repository().table(NotebookContentFileLinkService.TABLE_NAME).select(select_columns(columns)).eq("guid", str(link_id)).execute()
         
         if not response.data:
             return None
         
-        return AppMmNotebookContentFileLinkResponse(**response.data[0])
+        return projection_model(AppMmNotebookContentFileLinkResponse, columns)(**response.data[0])
     
     @staticmethod
-    def get_all() -> List[AppMmNotebookContentFileLinkResponse]:
-        """Get all notebook content file links"""
-        response = supabase.table(NotebookContentFileLinkService.TABLE_NAME).select("*").execute()
+    async def get_all(limit: Optional[int] = None, cursor: Optional[str] = None) -> PageResponse[AppMmNotebookContentFileLinkResponse]:
+        """Get a page of notebook content file links"""
+        query = get_repository().table(NotebookContentFileLinkService.TABLE_NAME).select("*")
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookContentFileLinkResponse(**link) for link in response.data]
+        return keyset_page(response.data, limit, AppMmNotebookContentFileLinkResponse)
     
     @staticmethod
-    def get_by_user(user_guid: UUID) -> List[AppMmNotebookContentFileLinkResponse]:
-        """Get all notebook content file links by user GUID"""
-        response = supabase.table(NotebookContentFileLinkService.TABLE_NAME).select("*").eq("user_guid", str(user_guid)).execute()
+    async def get_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmNotebookContentFileLinkResponse]:
+        """Get a page of notebook content file links by user GUID"""
+        columns = parse_fields(fields, AppMmNotebookContentFileLinkResponse, "created_date")
+        query = get_repository().table(NotebookContentFileLinkService.TABLE_NAME).select(select_columns(columns)).eq("user_guid", str(user_guid))
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookContentFileLinkResponse(**link) for link in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmNotebookContentFileLinkResponse, columns))
     
     @staticmethod
-    def get_by_notebook_hdr(notebook_hdr_guid: UUID) -> List[AppMmNotebookContentFileLinkResponse]:
-        """Get all notebook content file links by notebook header GUID"""
-        response = supabase.table(NotebookContentFileLinkService.TABLE_NAME).select("*").eq("notebook_hdr_guid", str(notebook_hdr_guid)).execute()
+    async def get_by_notebook_hdr(notebook_hdr_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmNotebookContentFileLinkResponse]:
+        """Get a page of notebook content file links by notebook header GUID"""
+        columns = parse_fields(fields, AppMmNotebookContentFileLinkResponse, "created_date")
+        query = get_repository().table(NotebookContentFileLinkService.TABLE_NAME).select(select_columns(columns)).eq("notebook_hdr_guid", str(notebook_hdr_guid))
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookContentFileLinkResponse(**link) for link in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmNotebookContentFileLinkResponse, columns))
     
     @staticmethod
-    def get_by_notebook_content(notebook_content_guid: UUID) -> List[AppMmNotebookContentFileLinkResponse]:
-        """Get all notebook content file links by notebook content GUID"""
-        response = supabase.table(NotebookContentFileLinkService.TABLE_NAME).select("*").eq("notebook_content_guid", str(notebook_content_guid)).execute()
+    async def get_by_notebook_contents(notebook_content_guids: List[UUID]) -> List[AppMmNotebookContentFileLinkResponse]:
+        """Get the notebook content file links of a batch of notebook contents (e.g. one page) in one query"""
+        if not notebook_content_guids:
+            return []
+        
+        response = await get_repository().table(NotebookContentFileLinkService.TABLE_NAME).select("*").in_("notebook_content_guid", [str(guid) for guid in notebook_content_guids]).order("sequence_no").execute()
         
         return [AppMmNotebookContentFileLinkResponse(**link) for link in response.data]
     
     @staticmethod
-    def get_by_file_upload(file_upload_guid: UUID) -> List[AppMmNotebookContentFileLinkResponse]:
-        """Get all notebook content file links by file upload GUID"""
-        response = supabase.table(NotebookContentFileLinkService.TABLE_NAME).select("*").eq("file_upload_guid", str(file_upload_guid)).execute()
+    async def get_by_notebook_content(notebook_content_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmNotebookContentFileLinkResponse]:
+        """Get a page of notebook content file links by notebook content GUID"""
+        columns = parse_fields(fields, AppMmNotebookContentFileLinkResponse, "created_date")
+        query = get_repository().table(NotebookContentFileLinkService.TABLE_NAME).select(select_columns(columns)).eq("notebook_content_guid", str(notebook_content_guid))
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookContentFileLinkResponse(**link) for link in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmNotebookContentFileLinkResponse, columns))
     
     @staticmethod
-    def update(link_id: UUID, link_data: AppMmNotebookContentFileLinkUpdate) -> Optional[AppMmNotebookContentFileLinkResponse]:
+    async def get_by_file_upload(file_upload_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmNotebookContentFileLinkResponse]:
+        """Get a page of notebook content file links by file upload GUID"""
+        columns = parse_fields(fields, AppMmNotebookContentFileLinkResponse, "created_date")
+        query = get_repository().table(NotebookContentFileLinkService.TABLE_NAME).select(select_columns(columns)).eq("file_upload_guid", str(file_upload_guid))
+        response = await keyset_query(query, cursor, limit).execute()
+        
+        return keyset_page(response.data, limit, projection_model(AppMmNotebookContentFileLinkResponse, columns))
+    
+    @staticmethod
+    async def update(link_id: UUID, link_data: AppMmNotebookContentFileLinkUpdate) -> Optional[AppMmNotebookContentFileLinkResponse]:
         """Update notebook content file link by GUID"""
         update_data = link_data.model_dump(exclude_unset=True)
         
         if not update_data:
-            return NotebookContentFileLinkService.get_by_guid(link_id)
+            return await NotebookContentFileLinkService.get_by_guid(link_id)
         
         # Convert UUID fields to strings
         if "user_guid" in update_data:
@@ -90,19 +114,49 @@ class NotebookContentFileLinkService:
             update_data["notebook_hdr_guid"] = str(update_data["notebook_hdr_guid"])
         if "notebook_content_guid" in update_data:
             update_data["notebook_content_guid"] = str(update_data["notebook_content_guid"]) if update_data["notebook_content_guid"] else None
+        
+        # The link holds its own reference on its file: take one on a new file, drop the old one once the update is in
+        previous_file_upload_guid = None
+        acquired_file_upload_guid = None
         if "file_upload_guid" in update_data:
+            current = await NotebookContentFileLinkService.get_by_guid(link_id)
+            
+            if not current:
+                return None
+            
+            if update_data["file_upload_guid"] != current.file_upload_guid:
+                previous_file_upload_guid = current.file_upload_guid
+                acquired_file_upload_guid = update_data["file_upload_guid"]
+                
+                if acquired_file_upload_guid and not await AppMmFileUploadService.acquire_file_upload(acquired_file_upload_guid):
+                    raise ValueError("File upload not found")
+            
             update_data["file_upload_guid"] = str(update_data["file_upload_guid"]) if update_data["file_upload_guid"] else None
         
-        response = supabase.table(NotebookContentFileLinkService.TABLE_NAME).update(update_data).eq("guid", str(link_id)).execute()
+        try:
+            response = await get_repository().table(NotebookContentFileLinkService.TABLE_NAME).update(update_data).eq("guid", str(link_id)).execute()
+        except Exception:
+            if acquired_file_upload_guid:
+                await AppMmFileUploadService.delete_file_upload(acquired_file_upload_guid)
+            raise
         
         if not response.data:
+            if acquired_file_upload_guid:
+                await AppMmFileUploadService.delete_file_upload(acquired_file_upload_guid)
             return None
         
+        if previous_file_upload_guid:
+            await AppMmFileUploadService.delete_file_upload(previous_file_upload_guid)
+        
         return AppMmNotebookContentFileLinkResponse(**response.data[0])
     
     @staticmethod
-    def delete_by_guid(link_id: UUID) -> bool:
-        """Delete notebook content file link by GUID"""
-        response = supabase.table(NotebookContentFileLinkService.TABLE_NAME).delete().eq("guid", str(link_id)).execute()
+    async def delete_by_guid(link_id: UUID) -> bool:
+        """Delete notebook content file link by GUID, releasing its reference on the linked file"""
+        response = await get_repository().table(NotebookContentFileLinkService.TABLE_NAME).delete().eq("guid", str(link_id)).execute()
+        
+        for row in response.data:
+            if row.get("file_upload_guid"):
+                await AppMmFileUploadService.delete_file_upload(row["file_upload_guid"])
         
         return len(response.data) > 0
@@ -1,14 +1,21 @@
 from uuid import UUID, uuid4
 from typing import List, Optional
 from datetime import datetime
-from util.supabase_config import supabase
-from model.notebook.app_mm_notebook_content import AppMmNotebookContentCreate, AppMmNotebookContentUpdate, AppMmNotebookContentResponse
+from service.repository.repository_provider import get_repository
+from service.repository.field_projection import parse_fields, select_columns, projection_model
+from service.repository.keyset_pagination import keyset_query, keyset_page
+from model.page_response import PageResponse
+from util.llm_response_cache import llm_response_cache
+from service.notebook.notebook_content_embedding_service import NotebookContentEmbeddingService
+from service.search.notebook_search_service import NotebookSearchService
+from model.notebook.app_mm_notebook_content import AppMmNotebookContentCreate, AppMmNotebookContentBulkCreate, AppMmNotebookContentUpdate, AppMmNotebookContentResponse
 
 class AppMmNotebookContentService:
     TABLE_NAME = "app_mm_notebook_content"
+    MAX_BULK_CREATE = 500
     
     @staticmethod
-    def create_notebook_content(content_data: AppMmNotebookContentCreate) -> AppMmNotebookContentResponse:
+    async def create_notebook_content(content_data: AppMmNotebookContentCreate) -> AppMmNotebookContentResponse:
         """Create a new notebook content entry"""
         new_content = {
             "guid": str(uuid4()),
@@ -23,51 +30,98 @@ class AppMmNotebookContentService:
             "updated_date": datetime.now().isoformat()
         }
         
-        response = supabase.table(AppMmNotebookContentService.TABLE_NAME).insert(new_content).execute()
+        response = await get_repository().table(AppMmNotebookContentService.TABLE_NAME).insert(new_content).execute()
         
         if not response.data:
             raise Exception("Failed to create notebook content")
         
+        # Cached chat replies were grounded in the notebook as it was
+        llm_response_cache.invalidate_scope(content_data.notebook_hdr_guid)
+        await NotebookContentEmbeddingService.enqueue([response.data[0]["guid"]])
+        await NotebookSearchService.index_contents(response.data)
+        
         return AppMmNotebookContentResponse(**response.data[0])
     
     @staticmethod
-    def get_notebook_content_by_id(content_id: UUID) -> Optional[AppMmNotebookContentResponse]:
+    async def bulk_create_notebook_contents(bulk_data: AppMmNotebookContentBulkCreate) -> List[AppMmNotebookContentResponse]:
+        """Create a batch of notebook contents in one round trip, numbered contiguously after the notebook's last sequence_no"""
+        if not bulk_data.contents:
+            return []
+        
+        if len(bulk_data.contents) > AppMmNotebookContentService.MAX_BULK_CREATE:
+            raise ValueError(f"At most {AppMmNotebookContentService.MAX_BULK_CREATE} contents per bulk create")
+        
+        new_contents = [
+            {
+                "guid": str(uuid4()),
+                "user_guid": str(bulk_data.user_guid),
+                "library_hdr_guid": str(bulk_data.library_hdr_guid) if bulk_data.library_hdr_guid else None,
+                "focus_session_guid": str(bulk_data.focus_session_guid) if bulk_data.focus_session_guid else None,
+                "content_text": item.content_text,
+                "image_url": item.image_url,
+                "highlight_metadata": item.highlight_metadata
+            }
+            for item in bulk_data.contents
+        ]
+        
+        response = await get_repository().rpc("bulk_create_notebook_content", {
+            "p_notebook_hdr_guid": str(bulk_data.notebook_hdr_guid),
+            "p_contents": new_contents
+        })
+        
+        if not response.data:
+            raise Exception("Failed to create notebook contents")
+        
+        llm_response_cache.invalidate_scope(bulk_data.notebook_hdr_guid)
+        await NotebookContentEmbeddingService.enqueue([content["guid"] for content in response.data])
+        await NotebookSearchService.index_contents(response.data)
+        
+        return sorted((AppMmNotebookContentResponse(**content) for content in response.data), key=lambda content: content.sequence_no)
+    
+    @staticmethod
+    async def get_notebook_content_by_id(content_id: UUID, fields: Optional[str] = None) -> Optional[AppMmNotebookContentResponse]:
         """Get notebook content by GUID"""
-        response = supabase.table(AppMmNotebookContentService.TABLE_NAME).select("*").eq("guid", str(content_id)).execute()
+        columns = parse_fields(fields, AppMmNotebookContentResponse)
+        response = await get_repository().table(AppMmNotebookContentService.TABLE_NAME).select(select_columns(columns)).eq("guid", str(content_id)).execute()
         
         if not response.data:
             return None
         
-        return AppMmNotebookContentResponse(**response.data[0])
+        return projection_model(AppMmNotebookContentResponse, columns)(**response.data[0])
     
     @staticmethod
-    def get_all_notebook_contents() -> List[AppMmNotebookContentResponse]:
-        """Get all notebook contents"""
-        response = supabase.table(AppMmNotebookContentService.TABLE_NAME).select("*").execute()
+    async def get_all_notebook_contents(limit: Optional[int] = None, cursor: Optional[str] = None) -> PageResponse[AppMmNotebookContentResponse]:
+        """Get a page of notebook contents"""
+        query = get_repository().table(AppMmNotebookContentService.TABLE_NAME).select("*")
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookContentResponse(**content) for content in response.data]
+        return keyset_page(response.data, limit, AppMmNotebookContentResponse)
     
     @staticmethod
-    def get_contents_by_notebook_hdr(notebook_hdr_guid: UUID) -> List[AppMmNotebookContentResponse]:
-        """Get all contents for a specific notebook header"""
-        response = supabase.table(AppMmNotebookContentService.TABLE_NAME).select("*").eq("notebook_hdr_guid", str(notebook_hdr_guid)).order("sequence_no").execute()
+    async def get_contents_by_notebook_hdr(notebook_hdr_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmNotebookContentResponse]:
+        """Get a page of contents for a specific notebook header"""
+        columns = parse_fields(fields, AppMmNotebookContentResponse, "sequence_no")
+        query = get_repository().table(AppMmNotebookContentService.TABLE_NAME).select(select_columns(columns)).eq("notebook_hdr_guid", str(notebook_hdr_guid))
+        response = await keyset_query(query, cursor, limit, "sequence_no", desc=False).execute()
         
-        return [AppMmNotebookContentResponse(**content) for content in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmNotebookContentResponse, columns), "sequence_no")
     
     @staticmethod
-    def get_contents_by_user(user_guid: UUID) -> List[AppMmNotebookContentResponse]:
-        """Get all contents for a specific user"""
-        response = supabase.table(AppMmNotebookContentService.TABLE_NAME).select("*").eq("user_guid", str(user_guid)).order("created_date", desc=True).execute()
+    async def get_contents_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmNotebookContentResponse]:
+        """Get a page of contents for a specific user"""
+        columns = parse_fields(fields, AppMmNotebookContentResponse, "created_date")
+        query = get_repository().table(AppMmNotebookContentService.TABLE_NAME).select(select_columns(columns)).eq("user_guid", str(user_guid))
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookContentResponse(**content) for content in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmNotebookContentResponse, columns))
     
     @staticmethod
-    def update_notebook_content(content_id: UUID, content_data: AppMmNotebookContentUpdate) -> Optional[AppMmNotebookContentResponse]:
+    async def update_notebook_content(content_id: UUID, content_data: AppMmNotebookContentUpdate) -> Optional[AppMmNotebookContentResponse]:
         """Update notebook content by GUID"""
         update_data = content_data.model_dump(exclude_unset=True)
         
         if not update_data:
-            return AppMmNotebookContentService.get_notebook_content_by_id(content_id)
+            return await AppMmNotebookContentService.get_notebook_content_by_id(content_id)
         
         # Convert UUIDs to strings for Supabase
         if "user_guid" in update_data:
@@ -79,18 +133,39 @@ class AppMmNotebookContentService:
         if "focus_session_guid" in update_data:
             update_data["focus_session_guid"] = str(update_data["focus_session_guid"]) if update_data["focus_session_guid"] else None
         
+        # A content moving to another notebook changes the text of the notebook it leaves as well
+        previous_notebook_hdr_guid = None
+        if "notebook_hdr_guid" in update_data:
+            current = await get_repository().table(AppMmNotebookContentService.TABLE_NAME).select("notebook_hdr_guid").eq("guid", str(content_id)).execute()
+            previous_notebook_hdr_guid = current.data[0]["notebook_hdr_guid"] if current.data else None
+        
         update_data["updated_date"] = datetime.now().isoformat()
         
-        response = supabase.table(AppMmNotebookContentService.TABLE_NAME).update(update_data).eq("guid", str(content_id)).execute()
+        response = await get_repository().table(AppMmNotebookContentService.TABLE_NAME).update(update_data).eq("guid", str(content_id)).execute()
         
         if not response.data:
             return None
         
-        return AppMmNotebookContentResponse(**response.data[0])
+        updated = AppMmNotebookContentResponse(**response.data[0])
+        # Replies cached for this notebook no longer match its text
+        llm_response_cache.invalidate_scope(updated.notebook_hdr_guid)
+        if previous_notebook_hdr_guid and str(previous_notebook_hdr_guid) != str(updated.notebook_hdr_guid):
+            llm_response_cache.invalidate_scope(previous_notebook_hdr_guid)
+        if {"content_text", "library_hdr_guid", "notebook_hdr_guid", "user_guid"} & update_data.keys():
+            await NotebookContentEmbeddingService.enqueue([updated.guid])
+        await NotebookSearchService.index_contents(response.data)
+        
+        return updated
     
     @staticmethod
-    def delete_notebook_content(content_id: UUID) -> bool:
+    async def delete_notebook_content(content_id: UUID) -> bool:
         """Delete notebook content by GUID"""
-        response = supabase.table(AppMmNotebookContentService.TABLE_NAME).delete().eq("guid", str(content_id)).execute()
+        await NotebookContentEmbeddingService.remove_content(content_id)
+        
+        response = await get_repository().table(AppMmNotebookContentService.TABLE_NAME).delete().eq("guid", str(content_id)).execute()
+        
+        for content in response.data:
+            llm_response_cache.invalidate_scope(content["notebook_hdr_guid"])
+        NotebookSearchService.remove_rows(NotebookSearchService.SOURCE_CONTENT, response.data)
         
         return len(response.data) > 0
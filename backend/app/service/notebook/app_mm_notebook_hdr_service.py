@@ -1,13 +1,18 @@
 from uuid import UUID, uuid4
-from typing import List, Optional
-from util.supabase_config import supabase
+from typing import Optional
+from service.repository.repository_provider import get_repository
+from service.repository.field_projection import parse_fields, select_columns, projection_model, project
+from util.entity_cache import entity_cache
+from service.repository.keyset_pagination import keyset_query, keyset_page
+from model.page_response import PageResponse
 from model.notebook.app_mm_notebook_hdr import AppMmNotebookHdrCreate, AppMmNotebookHdrUpdate, AppMmNotebookHdrResponse
 
 class AppMmNotebookHdrService:
     TABLE_NAME = "app_mm_notebook_hdr"
+    ENTITY_TYPE = "notebook_hdr"
     
     @staticmethod
-    def create_notebook_hdr(notebook_hdr_data: AppMmNotebookHdrCreate) -> AppMmNotebookHdrResponse:
+    async def create_notebook_hdr(notebook_hdr_data: AppMmNotebookHdrCreate) -> AppMmNotebookHdrResponse:
         """Create a new notebook header"""
         new_notebook_hdr = {
             "guid": str(uuid4()),
@@ -17,7 +22,7 @@ class AppMmNotebookHdrService:
             "name": notebook_hdr_data.name
         }
         
-        response = supabase.table(AppMmNotebookHdrService.TABLE_NAME).insert(new_notebook_hdr).execute()
+        response = await get_repository().table(AppMmNotebookHdrService.TABLE_NAME).insert(new_notebook_hdr).execute()
         
         if not response.data:
             raise Exception("Failed to create notebook header")
@@ -25,9 +30,17 @@ class AppMmNotebookHdrService:
         return AppMmNotebookHdrResponse(**response.data[0])
     
     @staticmethod
-    def get_notebook_hdr_by_id(notebook_hdr_id: UUID) -> Optional[AppMmNotebookHdrResponse]:
-        """Get notebook header by GUID"""
-        response = supabase.table(AppMmNotebookHdrService.TABLE_NAME).select("*").eq("guid", str(notebook_hdr_id)).execute()
+    async def get_notebook_hdr_by_id(notebook_hdr_id: UUID, fields: Optional[str] = None) -> Optional[AppMmNotebookHdrResponse]:
+        """Get notebook header by GUID (served from the entity cache when possible)"""
+        columns = parse_fields(fields, AppMmNotebookHdrResponse)
+        entity = await entity_cache.get_or_load(AppMmNotebookHdrService.ENTITY_TYPE, notebook_hdr_id, lambda: AppMmNotebookHdrService._load_by_id(notebook_hdr_id))
+        
+        return project(entity, columns)
+    
+    @staticmethod
+    async def _load_by_id(notebook_hdr_id: UUID) -> Optional[AppMmNotebookHdrResponse]:
+        """Get notebook header by GUID from the repository, bypassing the cache"""
+        response = await get_repository().table(AppMmNotebookHdrService.TABLE_NAME).select("*").eq("guid", str(notebook_hdr_id)).execute()
         
         if not response.data:
             return None
@@ -35,38 +48,43 @@ class AppMmNotebookHdrService:
         return AppMmNotebookHdrResponse(**response.data[0])
     
     @staticmethod
-    def get_all_notebook_hdrs() -> List[AppMmNotebookHdrResponse]:
-        """Get all notebook headers"""
-        response = supabase.table(AppMmNotebookHdrService.TABLE_NAME).select("*").execute()
+    async def get_all_notebook_hdrs(limit: Optional[int] = None, cursor: Optional[str] = None) -> PageResponse[AppMmNotebookHdrResponse]:
+        """Get a page of notebook headers"""
+        query = get_repository().table(AppMmNotebookHdrService.TABLE_NAME).select("*")
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookHdrResponse(**notebook_hdr) for notebook_hdr in response.data]
+        return keyset_page(response.data, limit, AppMmNotebookHdrResponse)
     
     @staticmethod
-    def get_notebook_hdrs_by_user(user_guid: UUID) -> List[AppMmNotebookHdrResponse]:
-        """Get all notebook headers for a specific user"""
-        response = supabase.table(AppMmNotebookHdrService.TABLE_NAME).select("*").eq("user_guid", str(user_guid)).execute()
+    async def get_notebook_hdrs_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmNotebookHdrResponse]:
+        """Get a page of notebook headers for a specific user"""
+        columns = parse_fields(fields, AppMmNotebookHdrResponse, "created_date")
+        query = get_repository().table(AppMmNotebookHdrService.TABLE_NAME).select(select_columns(columns)).eq("user_guid", str(user_guid))
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookHdrResponse(**notebook_hdr) for notebook_hdr in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmNotebookHdrResponse, columns))
     
     @staticmethod
-    def get_notebook_hdrs_by_library(library_hdr_guid: UUID) -> Optional[AppMmNotebookHdrResponse]:
+    async def get_notebook_hdrs_by_library(library_hdr_guid: UUID, fields: Optional[str] = None) -> Optional[AppMmNotebookHdrResponse]:
         """Get first notebook header for a specific library"""
-        response = supabase.table(AppMmNotebookHdrService.TABLE_NAME).select("*").eq("library_hdr_guid", str(library_hdr_guid)).limit(1).execute()
+        columns = parse_fields(fields, AppMmNotebookHdrResponse)
+        response = await get_repository().table(AppMmNotebookHdrService.TABLE_NAME).select(select_columns(columns)).eq("library_hdr_guid", str(library_hdr_guid)).limit(1).execute()
         
         if not response.data:
             return None
         
-        return AppMmNotebookHdrResponse(**response.data[0])
+        return projection_model(AppMmNotebookHdrResponse, columns)(**response.data[0])
     
     @staticmethod
-    def update_notebook_hdr(notebook_hdr_id: UUID, notebook_hdr_data: AppMmNotebookHdrUpdate) -> Optional[AppMmNotebookHdrResponse]:
+    async def update_notebook_hdr(notebook_hdr_id: UUID, notebook_hdr_data: AppMmNotebookHdrUpdate) -> Optional[AppMmNotebookHdrResponse]:
         """Update notebook header by GUID"""
         update_data = notebook_hdr_data.model_dump(exclude_unset=True)
         
         if not update_data:
-            return AppMmNotebookHdrService.get_notebook_hdr_by_id(notebook_hdr_id)
+            return await AppMmNotebookHdrService.get_notebook_hdr_by_id(notebook_hdr_id)
         
-        response = supabase.table(AppMmNotebookHdrService.TABLE_NAME).update(update_data).eq("guid", str(notebook_hdr_id)).execute()
+        response = await get_repository().table(AppMmNotebookHdrService.TABLE_NAME).update(update_data).eq("guid", str(notebook_hdr_id)).execute()
+        entity_cache.invalidate(AppMmNotebookHdrService.ENTITY_TYPE, notebook_hdr_id)
         
         if not response.data:
             return None
@@ -74,8 +92,9 @@ class AppMmNotebookHdrService:
         return AppMmNotebookHdrResponse(**response.data[0])
     
     @staticmethod
-    def delete_notebook_hdr(notebook_hdr_id: UUID) -> bool:
+    async def delete_notebook_hdr(notebook_hdr_id: UUID) -> bool:
         """Delete notebook header by GUID"""
-        response = supabase.table(AppMmNotebookHdrService.TABLE_NAME).delete().eq("guid", str(notebook_hdr_id)).execute()
+        response = await get_repository().table(AppMmNotebookHdrService.TABLE_NAME).delete().eq("guid", str(notebook_hdr_id)).execute()
+        entity_cache.invalidate(AppMmNotebookHdrService.ENTITY_TYPE, notebook_hdr_id)
         
         return len(response.data) > 0
@@ -1,7 +1,11 @@
 from uuid import UUID, uuid4
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime
-from util.supabase_config import supabase
+from service.repository.repository_provider import get_repository
+from service.repository.field_projection import parse_fields, select_columns, projection_model
+from service.repository.keyset_pagination import keyset_query, keyset_page
+from model.page_response import PageResponse
+from service.search.notebook_search_service import NotebookSearchService
 from model.notebook.app_mm_notebook_llm_chat_hdr import (
     AppMmNotebookLlmChatHdrCreate,
     AppMmNotebookLlmChatHdrUpdate,
@@ -12,7 +16,7 @@ class NotebookLlmChatHdrService:
     TABLE_NAME = "app_mm_notebook_llm_chat_hdr"
     
     @staticmethod
-    def create_chat_hdr(chat_hdr_data: AppMmNotebookLlmChatHdrCreate) -> AppMmNotebookLlmChatHdrResponse:
+    async def create_chat_hdr(chat_hdr_data: AppMmNotebookLlmChatHdrCreate) -> AppMmNotebookLlmChatHdrResponse:
         """Create a new notebook LLM chat header"""
         new_chat_hdr = {
             "guid": str(uuid4()),
@@ -21,7 +25,7 @@ class NotebookLlmChatHdrService:
             "library_hdr_guid": str(chat_hdr_data.library_hdr_guid) if chat_hdr_data.library_hdr_guid else None
         }
         
-        response = supabase.table(NotebookLlmChatHdrService.TABLE_NAME).insert(new_chat_hdr).execute()
+        response = await get_repository().table(NotebookLlmChatHdrService.TABLE_NAME).insert(new_chat_hdr).execute()
         
         if not response.data:
             raise Exception("Failed to create notebook LLM chat header")
@@ -29,50 +33,58 @@ class NotebookLlmChatHdrService:
         return AppMmNotebookLlmChatHdrResponse(**response.data[0])
     
     @staticmethod
-    def get_chat_hdr_by_id(chat_hdr_id: UUID) -> Optional[AppMmNotebookLlmChatHdrResponse]:
+    async def get_chat_hdr_by_id(chat_hdr_id: UUID, fields: Optional[str] = None) -> Optional[AppMmNotebookLlmChatHdrResponse]:
         """Get notebook LLM chat header by GUID"""
-        response = supabase.table(NotebookLlmChatHdrService.TABLE_NAME).select("*").eq("guid", str(chat_hdr_id)).execute()
+        columns = parse_fields(fields, AppMmNotebookLlmChatHdrResponse)
+        response = await get_repository().table(NotebookLlmChatHdrService.TABLE_NAME).select(select_columns(columns)).eq("guid", str(chat_hdr_id)).execute()
         
         if not response.data:
             return None
         
-        return AppMmNotebookLlmChatHdrResponse(**response.data[0])
+        return projection_model(AppMmNotebookLlmChatHdrResponse, columns)(**response.data[0])
     
     @staticmethod
-    def get_all_chat_hdrs() -> List[AppMmNotebookLlmChatHdrResponse]:
-        """Get all notebook LLM chat headers"""
-        response = supabase.table(NotebookLlmChatHdrService.TABLE_NAME).select("*").execute()
+    async def get_all_chat_hdrs(limit: Optional[int] = None, cursor: Optional[str] = None) -> PageResponse[AppMmNotebookLlmChatHdrResponse]:
+        """Get a page of notebook LLM chat headers"""
+        query = get_repository().table(NotebookLlmChatHdrService.TABLE_NAME).select("*")
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookLlmChatHdrResponse(**chat_hdr) for chat_hdr in response.data]
+        return keyset_page(response.data, limit, AppMmNotebookLlmChatHdrResponse)
     
     @staticmethod
-    def get_chat_hdrs_by_user(user_guid: UUID) -> List[AppMmNotebookLlmChatHdrResponse]:
-        """Get all notebook LLM chat headers for a specific user"""
-        response = supabase.table(NotebookLlmChatHdrService.TABLE_NAME).select("*").eq("user_guid", str(user_guid)).execute()
+    async def get_chat_hdrs_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmNotebookLlmChatHdrResponse]:
+        """Get a page of notebook LLM chat headers for a specific user"""
+        columns = parse_fields(fields, AppMmNotebookLlmChatHdrResponse, "created_date")
+        query = get_repository().table(NotebookLlmChatHdrService.TABLE_NAME).select(select_columns(columns)).eq("user_guid", str(user_guid))
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookLlmChatHdrResponse(**chat_hdr) for chat_hdr in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmNotebookLlmChatHdrResponse, columns))
     
     @staticmethod
-    def get_chat_hdrs_by_notebook(notebook_hdr_guid: UUID) -> List[AppMmNotebookLlmChatHdrResponse]:
-        """Get all notebook LLM chat headers for a specific notebook"""
-        response = supabase.table(NotebookLlmChatHdrService.TABLE_NAME).select("*").eq("notebook_hdr_guid", str(notebook_hdr_guid)).execute()
+    async def get_chat_hdrs_by_notebook(notebook_hdr_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmNotebookLlmChatHdrResponse]:
+        """Get a page of notebook LLM chat headers for a specific notebook"""
+        columns = parse_fields(fields, AppMmNotebookLlmChatHdrResponse, "created_date")
+        query = get_repository().table(NotebookLlmChatHdrService.TABLE_NAME).select(select_columns(columns)).eq("notebook_hdr_guid", str(notebook_hdr_guid))
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookLlmChatHdrResponse(**chat_hdr) for chat_hdr in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmNotebookLlmChatHdrResponse, columns))
     
     @staticmethod
-    def get_chat_hdrs_by_library(library_hdr_guid: UUID) -> List[AppMmNotebookLlmChatHdrResponse]:
-        """Get all notebook LLM chat headers for a specific library"""
-        response = supabase.table(NotebookLlmChatHdrService.TABLE_NAME).select("*").eq("library_hdr_guid", str(library_hdr_guid)).execute()
+    async def get_chat_hdrs_by_library(library_hdr_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmNotebookLlmChatHdrResponse]:
+        """Get a page of notebook LLM chat headers for a specific library"""
+        columns = parse_fields(fields, AppMmNotebookLlmChatHdrResponse, "created_date")
+        query = get_repository().table(NotebookLlmChatHdrService.TABLE_NAME).select(select_columns(columns)).eq("library_hdr_guid", str(library_hdr_guid))
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookLlmChatHdrResponse(**chat_hdr) for chat_hdr in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmNotebookLlmChatHdrResponse, columns))
     
     @staticmethod
-    def update_chat_hdr(chat_hdr_id: UUID, chat_hdr_data: AppMmNotebookLlmChatHdrUpdate) -> Optional[AppMmNotebookLlmChatHdrResponse]:
+    async def update_chat_hdr(chat_hdr_id: UUID, chat_hdr_data: AppMmNotebookLlmChatHdrUpdate) -> Optional[AppMmNotebookLlmChatHdrResponse]:
         """Update notebook LLM chat header by GUID"""
         update_data = chat_hdr_data.model_dump(exclude_unset=True)
         
         if not update_data:
-            return NotebookLlmChatHdrService.get_chat_hdr_by_id(chat_hdr_id)
+            return await NotebookLlmChatHdrService.get_chat_hdr_by_id(chat_hdr_id)
         
         # Convert UUIDs to strings
         if "user_guid" in update_data:
@@ -85,7 +97,27 @@ class NotebookLlmChatHdrService:
         # Add updated_date
         update_data["updated_date"] = datetime.now().isoformat()
         
-        response = supabase.table(NotebookLlmChatHdrService.TABLE_NAME).update(update_data).eq("guid", str(chat_hdr_id)).execute()
+        response = await get_repository().table(NotebookLlmChatHdrService.TABLE_NAME).update(update_data).eq("guid", str(chat_hdr_id)).execute()
+        
+        if not response.data:
+            return None
+        
+        if "notebook_hdr_guid" in update_data or "library_hdr_guid" in update_data:
+            NotebookSearchService.update_chat_hdr(response.data[0])
+        
+        return AppMmNotebookLlmChatHdrResponse(**response.data[0])
+    
+    @staticmethod
+    async def update_running_summary(chat_hdr_id: UUID, running_summary: str, summary_through_guid: UUID, summary_through_date: datetime) -> Optional[AppMmNotebookLlmChatHdrResponse]:
+        """Store the rolling conversation summary and the last transcript it covers"""
+        update_data = {
+            "running_summary": running_summary,
+            "summary_through_guid": str(summary_through_guid),
+            "summary_through_date": summary_through_date.isoformat(),
+            "updated_date": datetime.now().isoformat()
+        }
+        
+        response = await get_repository().table(NotebookLlmChatHdrService.TABLE_NAME).update(update_data).eq("guid", str(chat_hdr_id)).execute()
         
         if not response.data:
             return None
@@ -93,8 +125,11 @@ class NotebookLlmChatHdrService:
         return AppMmNotebookLlmChatHdrResponse(**response.data[0])
     
     @staticmethod
-    def delete_chat_hdr(chat_hdr_id: UUID) -> bool:
+    async def delete_chat_hdr(chat_hdr_id: UUID) -> bool:
         """Delete notebook LLM chat header by GUID"""
-        response = supabase.table(NotebookLlmChatHdrService.TABLE_NAME).delete().eq("guid", str(chat_hdr_id)).execute()
+        response = await get_repository().table(NotebookLlmChatHdrService.TABLE_NAME).delete().eq("guid", str(chat_hdr_id)).execute()
+        
+        for chat_hdr in response.data:
+            NotebookSearchService.remove_chat_hdr(chat_hdr)
         
         return len(response.data) > 0
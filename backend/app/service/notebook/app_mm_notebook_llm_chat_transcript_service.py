@@ -1,7 +1,11 @@
 from uuid import UUID, uuid4
 from typing import List, Optional
-from datetime import datetime
-from util.supabase_config import supabase
+from datetime import datetime, timezone
+from service.repository.repository_provider import get_repository
+from service.repository.field_projection import parse_fields, select_columns, projection_model
+from service.repository.keyset_pagination import keyset_query, keyset_page
+from model.page_response import PageResponse
+from service.search.notebook_search_service import NotebookSearchService
 from model.notebook.app_mm_notebook_llm_chat_transcript import (
     AppMmNotebookLlmChatTranscriptCreate,
     AppMmNotebookLlmChatTranscriptUpdate,
@@ -10,9 +14,12 @@ from model.notebook.app_mm_notebook_llm_chat_transcript import (
 
 class NotebookLlmChatTranscriptService:
     TABLE_NAME = "app_mm_notebook_llm_chat_transcript"
+    # sender values, named after the chat model's roles
+    SENDER_USER = "user"
+    SENDER_MODEL = "model"
     
     @staticmethod
-    def create_transcript(transcript_data: AppMmNotebookLlmChatTranscriptCreate) -> AppMmNotebookLlmChatTranscriptResponse:
+    async def create_transcript(transcript_data: AppMmNotebookLlmChatTranscriptCreate) -> AppMmNotebookLlmChatTranscriptResponse:
         """Create a new notebook LLM chat transcript"""
         new_transcript = {
             "guid": str(uuid4()),
@@ -22,51 +29,83 @@ class NotebookLlmChatTranscriptService:
             "sender": transcript_data.sender
         }
         
-        response = supabase.table(NotebookLlmChatTranscriptService.TABLE_NAME).insert(new_transcript).execute()
+        response = await get_repository().table(NotebookLlmChatTranscriptService.TABLE_NAME).insert(new_transcript).execute()
         
         if not response.data:
             raise Exception("Failed to create notebook LLM chat transcript")
         
+        await NotebookSearchService.index_transcripts(response.data)
+        
         return AppMmNotebookLlmChatTranscriptResponse(**response.data[0])
     
     @staticmethod
-    def get_transcript_by_id(transcript_id: UUID) -> Optional[AppMmNotebookLlmChatTranscriptResponse]:
+    async def create_transcripts(transcripts: List[AppMmNotebookLlmChatTranscriptCreate]) -> List[AppMmNotebookLlmChatTranscriptResponse]:
+        """Create several notebook LLM chat transcripts in one insert, e.g. a user message and its reply"""
+        new_transcripts = [
+            {
+                "guid": str(uuid4()),
+                "user_guid": str(transcript_data.user_guid),
+                "llm_chat_hdr_guid": str(transcript_data.llm_chat_hdr_guid),
+                "msg_content": transcript_data.msg_content,
+                "sender": transcript_data.sender,
+                "created_date": (transcript_data.created_date or datetime.now(timezone.utc)).isoformat()
+            }
+            for transcript_data in transcripts
+        ]
+        
+        response = await get_repository().table(NotebookLlmChatTranscriptService.TABLE_NAME).insert(new_transcripts).execute()
+        
+        if len(response.data) != len(new_transcripts):
+            raise Exception("Failed to create notebook LLM chat transcripts")
+        
+        await NotebookSearchService.index_transcripts(response.data)
+        
+        return [AppMmNotebookLlmChatTranscriptResponse(**transcript) for transcript in response.data]
+    
+    @staticmethod
+    async def get_transcript_by_id(transcript_id: UUID, fields: Optional[str] = None) -> Optional[AppMmNotebookLlmChatTranscriptResponse]:
         """Get notebook LLM chat transcript by GUID"""
-        response = supabase.table(NotebookLlmChatTranscriptService.TABLE_NAME).select("*").eq("guid", str(transcript_id)).execute()
+        columns = parse_fields(fields, AppMmNotebookLlmChatTranscriptResponse)
+        response = await get_repository().table(NotebookLlmChatTranscriptService.TABLE_NAME).select(select_columns(columns)).eq("guid", str(transcript_id)).execute()
         
         if not response.data:
             return None
         
-        return AppMmNotebookLlmChatTranscriptResponse(**response.data[0])
+        return projection_model(AppMmNotebookLlmChatTranscriptResponse, columns)(**response.data[0])
     
     @staticmethod
-    def get_all_transcripts() -> List[AppMmNotebookLlmChatTranscriptResponse]:
-        """Get all notebook LLM chat transcripts"""
-        response = supabase.table(NotebookLlmChatTranscriptService.TABLE_NAME).select("*").execute()
+    async def get_all_transcripts(limit: Optional[int] = None, cursor: Optional[str] = None) -> PageResponse[AppMmNotebookLlmChatTranscriptResponse]:
+        """Get a page of notebook LLM chat transcripts"""
+        query = get_repository().table(NotebookLlmChatTranscriptService.TABLE_NAME).select("*")
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookLlmChatTranscriptResponse(**transcript) for transcript in response.data]
+        return keyset_page(response.data, limit, AppMmNotebookLlmChatTranscriptResponse)
     
     @staticmethod
-    def get_transcripts_by_user(user_guid: UUID) -> List[AppMmNotebookLlmChatTranscriptResponse]:
-        """Get all notebook LLM chat transcripts for a specific user"""
-        response = supabase.table(NotebookLlmChatTranscriptService.TABLE_NAME).select("*").eq("user_guid", str(user_guid)).execute()
+    async def get_transcripts_by_user(user_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmNotebookLlmChatTranscriptResponse]:
+        """Get a page of notebook LLM chat transcripts for a specific user"""
+        columns = parse_fields(fields, AppMmNotebookLlmChatTranscriptResponse, "created_date")
+        query = get_repository().table(NotebookLlmChatTranscriptService.TABLE_NAME).select(select_columns(columns)).eq("user_guid", str(user_guid))
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmNotebookLlmChatTranscriptResponse(**transcript) for transcript in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmNotebookLlmChatTranscriptResponse, columns))
     
     @staticmethod
-    def get_transcripts_by_chat_hdr(llm_chat_hdr_guid: UUID) -> List[AppMmNotebookLlmChatTranscriptResponse]:
-        """Get all notebook LLM chat transcripts for a specific chat header"""
-        response = supabase.table(NotebookLlmChatTranscriptService.TABLE_NAME).select("*").eq("llm_chat_hdr_guid", str(llm_chat_hdr_guid)).order("created_date").execute()
+    async def get_transcripts_by_chat_hdr(llm_chat_hdr_guid: UUID, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None) -> PageResponse[AppMmNotebookLlmChatTranscriptResponse]:
+        """Get a page of notebook LLM chat transcripts for a specific chat header"""
+        columns = parse_fields(fields, AppMmNotebookLlmChatTranscriptResponse, "created_date")
+        query = get_repository().table(NotebookLlmChatTranscriptService.TABLE_NAME).select(select_columns(columns)).eq("llm_chat_hdr_guid", str(llm_chat_hdr_guid))
+        response = await keyset_query(query, cursor, limit, "created_date", desc=False).execute()
         
-        return [AppMmNotebookLlmChatTranscriptResponse(**transcript) for transcript in response.data]
+        return keyset_page(response.data, limit, projection_model(AppMmNotebookLlmChatTranscriptResponse, columns), "created_date")
     
     @staticmethod
-    def update_transcript(transcript_id: UUID, transcript_data: AppMmNotebookLlmChatTranscriptUpdate) -> Optional[AppMmNotebookLlmChatTranscriptResponse]:
+    async def update_transcript(transcript_id: UUID, transcript_data: AppMmNotebookLlmChatTranscriptUpdate) -> Optional[AppMmNotebookLlmChatTranscriptResponse]:
         """Update notebook LLM chat transcript by GUID"""
         update_data = transcript_data.model_dump(exclude_unset=True)
         
         if not update_data:
-            return NotebookLlmChatTranscriptService.get_transcript_by_id(transcript_id)
+            return await NotebookLlmChatTranscriptService.get_transcript_by_id(transcript_id)
         
         # Convert UUIDs to strings
         if "user_guid" in update_data:
@@ -77,16 +116,19 @@ class NotebookLlmChatTranscriptService:
         # Add updated_date
         update_data["updated_date"] = datetime.now().isoformat()
         
-        response = supabase.table(NotebookLlmChatTranscriptService.TABLE_NAME).update(update_data).eq("guid", str(transcript_id)).execute()
+        response = await get_repository().table(NotebookLlmChatTranscriptService.TABLE_NAME).update(update_data).eq("guid", str(transcript_id)).execute()
         
         if not response.data:
             return None
         
+        await NotebookSearchService.index_transcripts(response.data)
+        
         return AppMmNotebookLlmChatTranscriptResponse(**response.data[0])
     
     @staticmethod
-    def delete_transcript(transcript_id: UUID) -> bool:
+    async def delete_transcript(transcript_id: UUID) -> bool:
         """Delete notebook LLM chat transcript by GUID"""
-        response = supabase.table(NotebookLlmChatTranscriptService.TABLE_NAME).delete().eq("guid", str(transcript_id)).execute()
+        response = await get_repository().table(NotebookLlmChatTranscriptService.TABLE_NAME).delete().eq("guid", str(transcript_id)).execute()
+        NotebookSearchService.remove_rows(NotebookSearchService.SOURCE_CHAT, response.data)
         
         return len(response.data) > 0
@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+from uuid import UUID
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from service.repository.repository_provider import get_repository
+from service.repository.keyset_pagination import MAX_PAGE_SIZE, keyset_query, split_page
+from service.job.app_mm_job_service import AppMmJobService
+from service.job.job_worker import job_handler
+from model.job.app_mm_job import AppMmJobCreate
+from model.notebook.app_mm_notebook_content_embedding import NotebookContentSearchHit
+from util.embedding_provider import get_embedding_provider
+from util.vector_index import VectorIndex
+from util.index_registry import IndexRegistry
+from util.settings import get_settings
+
+# Loaded per-user/per-book indexes, filled from app_mm_notebook_content_embedding on first search
+vector_indexes = IndexRegistry(maxsize=get_settings().vector_index_max_loaded, ttl=get_settings().index_ttl_seconds)
+
+class NotebookContentEmbeddingService:
+    """
+    Embeddings of notebook content_text, persisted in app_mm_notebook_content_embedding and searched
+    through an in-process VectorIndex per (user, book). Content writes enqueue an index job, so the
+    embedding call never sits in the request path.
+    """
+    TABLE_NAME = "app_mm_notebook_content_embedding"
+    CONTENT_TABLE = "app_mm_notebook_content"
+    NOTEBOOK_HDR_TABLE = "app_mm_notebook_hdr"
+    JOB_TYPE = "index_notebook_content"
+    DEFAULT_TOP_K = 8
+    
+    @staticmethod
+    def _scope(user_guid: Any, library_hdr_guid: Any) -> Tuple[str, Optional[str]]:
+        return str(user_guid), str(library_hdr_guid) if library_hdr_guid else None
+    
+    @staticmethod
+    async def enqueue(content_guids: List[UUID]) -> None:
+        """Queue (re)indexing of content rows after they were created or changed, one job per batch"""
+        if not content_guids:
+            return
+        
+        try:
+            await AppMmJobService.enqueue(AppMmJobCreate(
+                job_type=NotebookContentEmbeddingService.JOB_TYPE,
+                payload={"content_guids": [str(guid) for guid in content_guids]}
+            ))
+        except Exception as e:
+            # Search just misses this content until it is written again
+            print(f"Error enqueueing notebook content index job: {str(e)}")
+    
+    @staticmethod
+    async def library_of_notebook(notebook_hdr_guid: Any) -> Optional[str]:
+        """The book a notebook belongs to"""
+        response = await get_repository().table(NotebookContentEmbeddingService.NOTEBOOK_HDR_TABLE).select("library_hdr_guid").eq("guid", str(notebook_hdr_guid)).execute()
+        
+        return response.data[0]["library_hdr_guid"] if response.data else None
+    
+    @staticmethod
+    async def index_content(content_guid: UUID) -> Optional[Dict[str, Any]]:
+        """Embed the content's current text and store it, skipped when text and model are unchanged"""
+        response = await get_repository().table(NotebookContentEmbeddingService.CONTENT_TABLE).select("guid, user_guid, notebook_hdr_guid, library_hdr_guid, content_text").eq("guid", str(content_guid)).execute()
+        
+        text = (response.data[0].get("content_text") or "").strip() if response.data else ""
+        if not text:
+            await NotebookContentEmbeddingService.remove_content(content_guid)
+            return None
+        
+        content = response.data[0]
+        library_hdr_guid = content.get("library_hdr_guid") or await NotebookContentEmbeddingService.library_of_notebook(content["notebook_hdr_guid"])
+        scope = NotebookContentEmbeddingService._scope(content["user_guid"], library_hdr_guid)
+        provider = get_embedding_provider()
+        content_hash = hashlib.sha256(text.encode()).hexdigest()
+        
+        existing = await get_repository().table(NotebookContentEmbeddingService.TABLE_NAME).select("user_guid, library_hdr_guid, embedding_model, content_hash").eq("guid", str(content_guid)).execute()
+        if existing.data:
+            current = existing.data[0]
+            if current["content_hash"] == content_hash and current["embedding_model"] == provider.name and NotebookContentEmbeddingService._scope(current["user_guid"], current["library_hdr_guid"]) == scope:
+                return {"skipped": True}
+        
+        [vector] = await provider.embed([text])
+        
+        # Replace the stored row, dropping it from whatever index held it before
+        await NotebookContentEmbeddingService.remove_content(content_guid)
+        
+        now = datetime.now(timezone.utc).isoformat()
+        await get_repository().table(NotebookContentEmbeddingService.TABLE_NAME).insert({
+            "guid": str(content_guid),
+            "user_guid": str(content["user_guid"]),
+            "library_hdr_guid": str(library_hdr_guid) if library_hdr_guid else None,
+            "embedding_model": provider.name,
+            "content_hash": content_hash,
+            "embedding": [float(value) for value in vector],
+            "created_date": now,
+            "updated_date": now
+        }).execute()
+        
+        vector_indexes.apply(scope, lambda index: index.add(str(content_guid), vector))
+        
+        return {"dimension": len(vector)}
+    
+    @staticmethod
+    async def remove_content(content_guid: UUID) -> None:
+        """Drop a content's embedding from the store and from its loaded index; call before deleting the content, the FK cascade would hide the row"""
+        response = await get_repository().table(NotebookContentEmbeddingService.TABLE_NAME).delete().eq("guid", str(content_guid)).execute()
+        
+        for row in response.data:
+            vector_indexes.apply(NotebookContentEmbeddingService._scope(row["user_guid"], row["library_hdr_guid"]), lambda index: index.remove(str(content_guid)))
+    
+    @staticmethod
+    async def _load_index(scope: Tuple[str, Optional[str]]) -> VectorIndex:
+        """
+        Build the index for one user and book from the embedding store, a page at a time. Embeddings
+        written during the scan are replayed onto it by the registry.
+        """
+        vector_indexes.begin_load(scope)
+        try:
+            index = await NotebookContentEmbeddingService._build_index(scope)
+        except BaseException:
+            vector_indexes.cancel_load(scope)
+            raise
+        
+        return vector_indexes.put(scope, index)
+    
+    @staticmethod
+    async def _build_index(scope: Tuple[str, Optional[str]]) -> VectorIndex:
+        provider = get_embedding_provider()
+        ids: List[str] = []
+        vectors: List[List[float]] = []
+        cursor = None
+        
+        while True:
+            query = get_repository().table(NotebookContentEmbeddingService.TABLE_NAME).select("guid, embedding, embedding_model, created_date").eq("user_guid", scope[0]).eq("library_hdr_guid", scope[1])
+            response = await keyset_query(query, cursor, MAX_PAGE_SIZE, "created_date", desc=False).execute()
+            rows, cursor = split_page(response.data, MAX_PAGE_SIZE, "created_date")
+            
+            for row in rows:
+                # Vectors from another model live in a different space, they are re-embedded on the next write
+                if row["embedding_model"] == provider.name:
+                    ids.append(str(row["guid"]))
+                    vectors.append(row["embedding"])
+            
+            if not cursor:
+                break
+        
+        index = VectorIndex(provider.dimension or (len(vectors[0]) if vectors else 1), capacity=max(64, len(ids)))
+        # Normalizing a large matrix is CPU bound, keep it off the event loop
+        await asyncio.to_thread(index.add_many, ids, vectors)
+        
+        return index
+    
+    @staticmethod
+    async def search(user_guid: UUID, library_hdr_guid: UUID, query_text: str, k: Optional[int] = None) -> List[NotebookContentSearchHit]:
+        """The k contents of this user's book closest to query_text, best first, with their text"""
+        scope = NotebookContentEmbeddingService._scope(user_guid, library_hdr_guid)
+        index = vector_indexes.get(scope) or await NotebookContentEmbeddingService._load_index(scope)
+        
+        if len(index) == 0:
+            return []
+        
+        [query_vector] = await get_embedding_provider().embed([query_text], is_query=True)
+        matches = index.search(query_vector, k or NotebookContentEmbeddingService.DEFAULT_TOP_K)
+        
+        if not matches:
+            return []
+        
+        response = await get_repository().table(NotebookContentEmbeddingService.CONTENT_TABLE).select("guid, content_text").in_("guid", [guid for guid, _ in matches]).execute()
+        texts = {str(row["guid"]): row.get("content_text") for row in response.data}
+        
+        return [
+            NotebookContentSearchHit(content_guid=UUID(guid), score=score, content_text=texts.get(guid))
+            for guid, score in matches
+            if guid in texts
+        ]
+
+@job_handler(NotebookContentEmbeddingService.JOB_TYPE)
+async def index_notebook_content(payload: Dict[str, Any]) -> Dict[str, Any]:
+    indexed = 0
+    for content_guid in payload["content_guids"]:
+        result = await NotebookContentEmbeddingService.index_content(UUID(content_guid))
+        if result and not result.get("skipped"):
+            indexed += 1
+    
+    return {"indexed": indexed}
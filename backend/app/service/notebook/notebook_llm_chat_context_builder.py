@@ -0,0 +1,79 @@
+from typing import List
+from service.repository.repository_provider import get_repository
+from service.repository.keyset_pagination import MAX_PAGE_SIZE
+from service.notebook.app_mm_notebook_llm_chat_hdr_service import NotebookLlmChatHdrService
+from service.notebook.app_mm_notebook_llm_chat_transcript_service import NotebookLlmChatTranscriptService
+from model.notebook.app_mm_notebook_llm_chat_hdr import AppMmNotebookLlmChatHdrResponse
+from model.notebook.app_mm_notebook_llm_chat_transcript import AppMmNotebookLlmChatTranscriptResponse
+from util.llm_provider import ChatTurn, get_llm_provider
+
+class NotebookLlmChatContextBuilder:
+    """
+    Assembles the conversation sent to the chat model: the running summary stored on the chat header
+    followed by the turns not yet folded into it. Once more than WINDOW_TURNS + SUMMARY_BATCH_TURNS turns
+    are unsummarized, all but the last WINDOW_TURNS are folded into the summary in one model call, so
+    the prompt stays bounded and the summary is only recomputed every SUMMARY_BATCH_TURNS turns.
+    """
+    WINDOW_TURNS = 12
+    SUMMARY_BATCH_TURNS = 8
+    MAX_SUMMARY_CHARS = 4000
+    MAX_TURN_CHARS = 2000
+    
+    @staticmethod
+    async def _unsummarized_turns(chat_hdr: AppMmNotebookLlmChatHdrResponse) -> List[AppMmNotebookLlmChatTranscriptResponse]:
+        """Oldest first, the turns after the last one folded into the summary (at most one page)"""
+        query = get_repository().table(NotebookLlmChatTranscriptService.TABLE_NAME).select("*").eq("llm_chat_hdr_guid", str(chat_hdr.guid))
+        
+        if chat_hdr.summary_through_guid and chat_hdr.summary_through_date:
+            query = query.keyset_after("created_date", chat_hdr.summary_through_date.isoformat(), str(chat_hdr.summary_through_guid))
+        
+        response = await query.order("created_date").order("guid").limit(MAX_PAGE_SIZE).execute()
+        
+        return [AppMmNotebookLlmChatTranscriptResponse(**row) for row in response.data]
+    
+    @staticmethod
+    async def _summarize(previous_summary: str, turns: List[AppMmNotebookLlmChatTranscriptResponse]) -> str:
+        """Fold turns into the running summary with one (non streamed) model call"""
+        transcript = "\n".join(
+            f"{'Tutor' if turn.sender == NotebookLlmChatTranscriptService.SENDER_MODEL else 'Reader'}: {turn.msg_content[:NotebookLlmChatContextBuilder.MAX_TURN_CHARS]}"
+            for turn in turns
+        )
+        prompt = (
+            "Update the running summary of a study conversation between a reader and a tutor. Keep the questions asked, "
+            "the explanations given, open threads and anything the reader said about themselves. "
+            f"Reply with the summary only, under {NotebookLlmChatContextBuilder.MAX_SUMMARY_CHARS // 5} words.\n\n"
+            f"Current summary:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}"
+        )
+        
+        parts = [text async for text in get_llm_provider().stream([{"role": NotebookLlmChatTranscriptService.SENDER_USER, "parts": [prompt]}])]
+        
+        return "".join(parts).strip()[:NotebookLlmChatContextBuilder.MAX_SUMMARY_CHARS]
+    
+    @staticmethod
+    async def build(chat_hdr: AppMmNotebookLlmChatHdrResponse) -> List[ChatTurn]:
+        """Summary turn pair (when there is a summary) followed by the recent turns, oldest first"""
+        summary = chat_hdr.running_summary or ""
+        turns = await NotebookLlmChatContextBuilder._unsummarized_turns(chat_hdr)
+        
+        while len(turns) > NotebookLlmChatContextBuilder.WINDOW_TURNS + NotebookLlmChatContextBuilder.SUMMARY_BATCH_TURNS:
+            evicted = turns[:-NotebookLlmChatContextBuilder.WINDOW_TURNS]
+            summary = await NotebookLlmChatContextBuilder._summarize(summary, evicted)
+            
+            updated = await NotebookLlmChatHdrService.update_running_summary(chat_hdr.guid, summary, evicted[-1].guid, evicted[-1].created_date)
+            if not updated:
+                break
+            
+            chat_hdr = updated
+            turns = await NotebookLlmChatContextBuilder._unsummarized_turns(chat_hdr)
+        
+        contents: List[ChatTurn] = []
+        
+        if summary:
+            contents.append({"role": NotebookLlmChatTranscriptService.SENDER_USER, "parts": [f"Summary of our conversation so far:\n{summary}"]})
+            contents.append({"role": NotebookLlmChatTranscriptService.SENDER_MODEL, "parts": ["Understood, I will keep that in mind."]})
+        
+        for turn in turns:
+            role = NotebookLlmChatTranscriptService.SENDER_MODEL if turn.sender == NotebookLlmChatTranscriptService.SENDER_MODEL else NotebookLlmChatTranscriptService.SENDER_USER
+            contents.append({"role": role, "parts": [turn.msg_content]})
+        
+        return contents
@@ -0,0 +1,111 @@
+import hashlib
+from uuid import UUID
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+from service.repository.repository_provider import get_repository
+from service.notebook.app_mm_notebook_llm_chat_hdr_service import NotebookLlmChatHdrService
+from service.notebook.app_mm_notebook_llm_chat_transcript_service import NotebookLlmChatTranscriptService
+from service.notebook.app_mm_notebook_content_service import AppMmNotebookContentService
+from model.notebook.app_mm_notebook_llm_chat_transcript import AppMmNotebookLlmChatTranscriptCreate
+from service.repository.keyset_pagination import MAX_PAGE_SIZE
+from service.notebook.notebook_llm_chat_context_builder import NotebookLlmChatContextBuilder
+from service.notebook.notebook_content_embedding_service import NotebookContentEmbeddingService
+from util.llm_provider import get_llm_provider
+from util.llm_response_cache import llm_response_cache
+
+class NotebookLlmChatService:
+    """Talks to the chat model for a chat header and records the exchange in its transcript"""
+    MAX_CONTEXT_CHARS = 16000
+    
+    @staticmethod
+    async def _notebook_context(notebook_hdr_guid: Optional[UUID]) -> str:
+        """The notebook's text in sequence order, capped at MAX_CONTEXT_CHARS, that replies are grounded in"""
+        if not notebook_hdr_guid:
+            return ""
+        
+        response = await get_repository().table(AppMmNotebookContentService.TABLE_NAME).select("content_text, sequence_no").eq("notebook_hdr_guid", str(notebook_hdr_guid)).order("sequence_no").limit(MAX_PAGE_SIZE).execute()
+        
+        context = "\n\n".join(row["content_text"] for row in response.data if row.get("content_text"))
+        return context[:NotebookLlmChatService.MAX_CONTEXT_CHARS]
+    
+    @staticmethod
+    async def _retrieved_context(chat_hdr: Any, message: str) -> str:
+        """The highlights from the chat's book closest to the message, best first; empty when the book has none indexed"""
+        library_hdr_guid = chat_hdr.library_hdr_guid
+        if not library_hdr_guid and chat_hdr.notebook_hdr_guid:
+            library_hdr_guid = await NotebookContentEmbeddingService.library_of_notebook(chat_hdr.notebook_hdr_guid)
+        if not library_hdr_guid:
+            return ""
+        
+        try:
+            hits = await NotebookContentEmbeddingService.search(chat_hdr.user_guid, library_hdr_guid, message)
+        except Exception as e:
+            # Retrieval is an improvement, not a requirement, the whole notebook still grounds the reply
+            print(f"Error searching notebook content embeddings: {str(e)}")
+            return ""
+        
+        context = "\n\n".join(hit.content_text for hit in hits if hit.content_text)
+        return context[:NotebookLlmChatService.MAX_CONTEXT_CHARS]
+    
+    @staticmethod
+    async def stream_reply(chat_hdr_guid: UUID, user_guid: UUID, message: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the model's reply, grounded in the chat's notebook, as {"type": "token", "text"} events, then
+        persist the user message and the full reply in one insert and finish with {"type": "done", "transcripts"}.
+        Nothing is written when the model fails or the client goes away before the end. A repeated opening
+        question about an unchanged notebook is answered from the response cache as a single token event.
+        """
+        if not message or not message.strip():
+            raise ValueError("Message is empty")
+        
+        chat_hdr = await NotebookLlmChatHdrService.get_chat_hdr_by_id(chat_hdr_guid)
+        if not chat_hdr:
+            raise ValueError("Notebook LLM chat header not found")
+        if chat_hdr.user_guid != user_guid:
+            raise ValueError("Notebook LLM chat header belongs to another user")
+        
+        asked_at = datetime.now(timezone.utc)
+        # Running summary plus the recent turns, bounded however long the chat gets
+        history = await NotebookLlmChatContextBuilder.build(chat_hdr)
+        # The highlights relevant to the question, or the notebook from the top when none are indexed yet
+        context = await NotebookLlmChatService._retrieved_context(chat_hdr, message) or await NotebookLlmChatService._notebook_context(chat_hdr.notebook_hdr_guid)
+        
+        # Only an opening question is answered from the cache, a follow up depends on the conversation so far
+        cache_scope = str(chat_hdr.notebook_hdr_guid) if chat_hdr.notebook_hdr_guid and not history else None
+        context_hash = hashlib.sha256(context.encode()).hexdigest()
+        cached_reply = llm_response_cache.get(cache_scope, context_hash, message) if cache_scope else None
+        
+        if cached_reply is not None:
+            reply = cached_reply
+            yield {"type": "token", "text": reply, "cached": True}
+        else:
+            parts = [f"Notes from my notebook:\n{context}", message] if context else [message]
+            contents = history + [{"role": NotebookLlmChatTranscriptService.SENDER_USER, "parts": parts}]
+            
+            reply_parts: List[str] = []
+            async for text in get_llm_provider().stream(contents):
+                reply_parts.append(text)
+                yield {"type": "token", "text": text}
+            
+            reply = "".join(reply_parts)
+            if cache_scope and reply:
+                llm_response_cache.set(cache_scope, context_hash, message, reply)
+        
+        transcripts = await NotebookLlmChatTranscriptService.create_transcripts([
+            AppMmNotebookLlmChatTranscriptCreate(
+                user_guid=user_guid,
+                llm_chat_hdr_guid=chat_hdr_guid,
+                msg_content=message,
+                sender=NotebookLlmChatTranscriptService.SENDER_USER,
+                created_date=asked_at
+            ),
+            AppMmNotebookLlmChatTranscriptCreate(
+                user_guid=user_guid,
+                llm_chat_hdr_guid=chat_hdr_guid,
+                msg_content=reply,
+                sender=NotebookLlmChatTranscriptService.SENDER_MODEL,
+                created_date=datetime.now(timezone.utc)
+            )
+        ])
+        
+        yield {"type": "done", "cached": cached_reply is not None, "transcripts": [transcript.model_dump(mode="json") for transcript in transcripts]}
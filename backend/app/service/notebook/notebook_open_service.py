@@ -0,0 +1,53 @@
+import asyncio
+from uuid import UUID
+from typing import Dict, List, Optional
+from service.notebook.app_mm_notebook_hdr_service import AppMmNotebookHdrService
+from service.notebook.app_mm_notebook_content_service import AppMmNotebookContentService
+from service.notebook.app_mm_notebook_content_file_link_service import NotebookContentFileLinkService
+from service.file.app_mm_file_upload_service import AppMmFileUploadService
+from util.storage_url import build_public_urls
+from model.dto.notebook_open_dto import NotebookAttachmentDto, NotebookContentWithAttachmentsDto, NotebookOpenResponseDto
+
+class NotebookOpenService:
+    @staticmethod
+    async def open_notebook(notebook_hdr_id: UUID, limit: Optional[int] = None, cursor: Optional[str] = None) -> Optional[NotebookOpenResponseDto]:
+        """
+        Get a notebook header with a page of its ordered contents, each carrying its attachments
+        (public URL and highlight metadata). The header and the contents page are fetched concurrently,
+        then the links of that page's contents and the file uploads behind them in one batched query each.
+        """
+        notebook, contents_page = await asyncio.gather(
+            AppMmNotebookHdrService.get_notebook_hdr_by_id(notebook_hdr_id),
+            AppMmNotebookContentService.get_contents_by_notebook_hdr(notebook_hdr_id, limit=limit, cursor=cursor)
+        )
+        
+        if not notebook:
+            return None
+        
+        # Only the links of contents on this page are read
+        links = await NotebookContentFileLinkService.get_by_notebook_contents([content.guid for content in contents_page.items])
+        
+        file_upload_guids = list({link.file_upload_guid for link in links if link.file_upload_guid})
+        file_records = await AppMmFileUploadService.get_file_uploads_by_ids(file_upload_guids)
+        public_urls = build_public_urls(file_records)
+        
+        attachments_by_content: Dict[str, List[NotebookAttachmentDto]] = {}
+        for link in links:
+            file_path = public_urls.get(str(link.file_upload_guid)) if link.file_upload_guid else None
+            
+            attachments_by_content.setdefault(str(link.notebook_content_guid), []).append(NotebookAttachmentDto(
+                link_guid=link.guid,
+                file_upload_guid=link.file_upload_guid,
+                file_path=file_path or link.image_url,
+                highlight_metadata=link.highlight_metadata
+            ))
+        
+        contents = [
+            NotebookContentWithAttachmentsDto(
+                **content.model_dump(),
+                attachments=attachments_by_content.get(str(content.guid), [])
+            )
+            for content in contents_page.items
+        ]
+        
+        return NotebookOpenResponseDto(notebook=notebook, contents=contents, next_cursor=contents_page.next_cursor)
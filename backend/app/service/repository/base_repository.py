@@ -0,0 +1,75 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+@dataclass
+class RepositoryResponse:
+    """Result of an executed query, shaped like the PostgREST APIResponse (rows in data)"""
+    data: List[Dict[str, Any]] = field(default_factory=list)
+    count: Optional[int] = None
+
+class BaseQuery(ABC):
+    """
+    Chainable table query. Mirrors the subset of the PostgREST builder used by the services,
+    so a call reads the same against every backend:
+    
+        await get_repository().table("app_mm_user").select("*").eq("guid", guid).execute()
+    """
+    
+    @abstractmethod
+    def select(self, columns: str = "*") -> "BaseQuery":
+        """Select the given comma separated columns"""
+    
+    @abstractmethod
+    def insert(self, rows: Union[Dict[str, Any], List[Dict[str, Any]]]) -> "BaseQuery":
+        """Insert one row or a list of rows"""
+    
+    @abstractmethod
+    def update(self, data: Dict[str, Any]) -> "BaseQuery":
+        """Update the matching rows with data"""
+    
+    @abstractmethod
+    def delete(self) -> "BaseQuery":
+        """Delete the matching rows"""
+    
+    @abstractmethod
+    def eq(self, column: str, value: Any) -> "BaseQuery":
+        """Filter rows where column equals value"""
+    
+    @abstractmethod
+    def in_(self, column: str, values: List[Any]) -> "BaseQuery":
+        """Filter rows where column is one of values"""
+    
+    @abstractmethod
+    def ilike(self, column: str, pattern: str) -> "BaseQuery":
+        """Filter rows where column matches a case-insensitive LIKE pattern (% and _ wildcards)"""
+    
+    @abstractmethod
+    def keyset_after(self, column: str, value: Any, guid: str, desc: bool = False) -> "BaseQuery":
+        """
+        Keep rows that come after (value, guid) when ordered by column then guid.
+        Nulls sort last ascending and first descending, as in Postgres.
+        """
+    
+    @abstractmethod
+    def order(self, column: str, desc: bool = False) -> "BaseQuery":
+        """Order by column, earlier calls take precedence"""
+    
+    @abstractmethod
+    def limit(self, count: int) -> "BaseQuery":
+        """Return at most count rows"""
+    
+    @abstractmethod
+    async def execute(self) -> RepositoryResponse:
+        """Run the query"""
+
+class BaseRepository(ABC):
+    """Storage backend that every service goes through for table access"""
+    
+    @abstractmethod
+    def table(self, table_name: str) -> BaseQuery:
+        """Start a query against table_name"""
+    
+    @abstractmethod
+    async def rpc(self, function_name: str, params: Optional[Dict[str, Any]] = None) -> RepositoryResponse:
+        """Call a database function (Postgres function exposed through PostgREST /rpc)"""
@@ -0,0 +1,44 @@
+from functools import lru_cache
+from typing import Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel, create_model
+
+T = TypeVar('T', bound=BaseModel)
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel], *required: str) -> Optional[Tuple[str, ...]]:
+    """
+    Turn a fields=a,b,c query value into the column tuple to select, in model field order.
+    required columns (guid and the page sort column) are always included so cursors keep working.
+    Returns None when no projection was asked for.
+    """
+    if not fields:
+        return None
+    
+    wanted = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = wanted - set(model.model_fields)
+    
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    
+    wanted.update(("guid",) + required)
+    
+    return tuple(name for name in model.model_fields if name in wanted)
+
+def select_columns(columns: Optional[Tuple[str, ...]]) -> str:
+    """PostgREST select list for parse_fields output"""
+    return ",".join(columns) if columns else "*"
+
+@lru_cache(maxsize=256)
+def sparse_model(model: Type[T], columns: Tuple[str, ...]) -> Type[BaseModel]:
+    """Response model with only the selected fields of model, so unselected columns are not serialized at all"""
+    definitions = {name: (Optional[model.model_fields[name].annotation], None) for name in columns}
+    return create_model(f"{model.__name__}Sparse", **definitions)
+
+def projection_model(model: Type[T], columns: Optional[Tuple[str, ...]]) -> Type[BaseModel]:
+    return sparse_model(model, columns) if columns else model
+
+def project(instance: Optional[T], columns: Optional[Tuple[str, ...]]) -> Optional[BaseModel]:
+    """Trim an already loaded model (e.g. from the entity cache) to the selected fields"""
+    if instance is None or not columns:
+        return instance
+    
+    return sparse_model(type(instance), columns)(**instance.model_dump(include=set(columns)))
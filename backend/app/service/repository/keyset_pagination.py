@@ -0,0 +1,57 @@
+import json
+import base64
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel
+from model.page_response import PageResponse
+from service.repository.base_repository import BaseQuery
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+T = TypeVar('T', bound=BaseModel)
+
+def page_size(limit: Optional[int]) -> int:
+    """Clamp the requested page size to the server enforced bounds"""
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+def encode_cursor(row: Dict[str, Any], sort_column: str) -> str:
+    """Opaque cursor holding the sort value and guid of the last row on a page"""
+    payload = json.dumps({"v": row.get(sort_column), "g": str(row["guid"])}, default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return {"v": payload["v"], "g": str(payload["g"])}
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def keyset_query(query: BaseQuery, cursor: Optional[str], limit: Optional[int], sort_column: str = "created_date", desc: bool = True) -> BaseQuery:
+    """
+    Order query by (sort_column, guid) and seek past the cursor instead of using OFFSET.
+    One extra row is fetched so keyset_page can tell whether another page exists.
+    """
+    if cursor:
+        position = decode_cursor(cursor)
+        query = query.keyset_after(sort_column, position["v"], position["g"], desc=desc)
+    
+    return query.order(sort_column, desc=desc).order("guid", desc=desc).limit(page_size(limit) + 1)
+
+def split_page(rows: List[Dict[str, Any]], limit: Optional[int], sort_column: str = "created_date") -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Trim rows fetched with keyset_query to one page and return it with the next cursor"""
+    size = page_size(limit)
+    has_more = len(rows) > size
+    rows = rows[:size]
+    
+    next_cursor = encode_cursor(rows[-1], sort_column) if has_more and rows else None
+    
+    return rows, next_cursor
+
+def keyset_page(rows: List[Dict[str, Any]], limit: Optional[int], model: Type[T], sort_column: str = "created_date") -> PageResponse[T]:
+    """Build the page for rows fetched with keyset_query"""
+    rows, next_cursor = split_page(rows, limit, sort_column)
+    
+    return PageResponse[model](items=[model(**row) for row in rows], next_cursor=next_cursor)
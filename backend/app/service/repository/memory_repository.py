@@ -0,0 +1,303 @@
+import re
+import copy
+import itertools
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from service.repository.base_repository import BaseQuery, BaseRepository, RepositoryResponse
+from service.repository.memory_rpc import MEMORY_RPC_HANDLERS
+from util.text_normalization import normalize_book_name
+from util.trigram import TrigramIndex
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+# Column defaults the Supabase schema fills in on insert
+COMMON_DEFAULTS: Dict[str, Callable[[], Any]] = {
+    "created_date": _now_iso,
+    "updated_date": _now_iso,
+}
+
+TABLE_DEFAULTS: Dict[str, Dict[str, Callable[[], Any]]] = {
+    "app_mm_library_hdr": {"last_read": _now_iso},
+}
+
+# Columns backed by a serial sequence
+TABLE_SEQUENCES: Dict[str, List[str]] = {
+    "app_mm_notebook_content_file_link": ["sequence_no"],
+}
+
+# Generated (computed) columns, refreshed on insert and update
+TABLE_GENERATED: Dict[str, Dict[str, Callable[[Dict[str, Any]], Any]]] = {
+    "app_mm_library_hdr": {"book_name_normalized": lambda row: normalize_book_name(row.get("book_name"))},
+}
+
+# Trigram indexes, the in-process counterpart of pg_trgm GIN indexes, as (text column, partition column);
+# rows are indexed by guid, one index per partition value, and kept in step on insert, update and delete
+TABLE_TRIGRAM_INDEXES: Dict[str, Tuple[str, str]] = {
+    "app_mm_library_hdr": ("book_name_normalized", "user_guid"),
+}
+
+# alias:table!fk_column(columns), PostgREST's embedded resource syntax for a many-to-one relation
+_EMBED = re.compile(r"^(?:(\w+):)?(\w+)!(\w+)\((.*)\)$", re.DOTALL)
+
+def _same_value(row_value: Any, value: Any) -> bool:
+    """Compare the way PostgREST does over the wire, where everything is sent as text"""
+    if row_value is None or value is None:
+        return row_value is None and value is None
+    return row_value == value or str(row_value) == str(value)
+
+def _like_to_regex(pattern: str) -> "re.Pattern[str]":
+    parts = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            parts.append(re.escape(char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
+
+def _split_columns(columns: str) -> List[str]:
+    """Split a select list on top level commas, leaving embedded column lists intact"""
+    names, depth, current = [], 0, []
+    for char in columns:
+        if char == "," and depth == 0:
+            names.append("".join(current).strip())
+            current = []
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current.append(char)
+    names.append("".join(current).strip())
+    return [name for name in names if name]
+
+def _parse_columns(columns: str) -> Tuple[Optional[List[str]], List[tuple]]:
+    """Plain column names (None for all) and embeds as (alias, table, fk_column, columns)"""
+    names, embeds = [], []
+    for name in _split_columns(columns):
+        embed = _EMBED.match(name)
+        if embed:
+            alias, table_name, fk_column, inner = embed.groups()
+            embeds.append((alias or table_name, table_name, fk_column, inner))
+        else:
+            names.append(name)
+    if not names or "*" in names:
+        return None, embeds
+    return names, embeds
+
+class MemoryQuery(BaseQuery):
+    """Evaluates the query against the rows held by a MemoryRepository"""
+    
+    def __init__(self, repository: "MemoryRepository", table_name: str):
+        self._repository = repository
+        self._table_name = table_name
+        self._action = "select"
+        self._columns: Optional[List[str]] = None
+        self._embeds: List[tuple] = []
+        self._payload: Any = None
+        self._filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self._orders: List[tuple] = []
+        self._limit: Optional[int] = None
+    
+    def select(self, columns: str = "*") -> "MemoryQuery":
+        self._columns, self._embeds = _parse_columns(columns)
+        return self
+    
+    def insert(self, rows: Union[Dict[str, Any], List[Dict[str, Any]]]) -> "MemoryQuery":
+        self._action = "insert"
+        self._payload = rows if isinstance(rows, list) else [rows]
+        return self
+    
+    def update(self, data: Dict[str, Any]) -> "MemoryQuery":
+        self._action = "update"
+        self._payload = data
+        return self
+    
+    def delete(self) -> "MemoryQuery":
+        self._action = "delete"
+        return self
+    
+    def eq(self, column: str, value: Any) -> "MemoryQuery":
+        self._filters.append(lambda row: _same_value(row.get(column), value))
+        return self
+    
+    def in_(self, column: str, values: List[Any]) -> "MemoryQuery":
+        wanted = {str(value) for value in values}
+        self._filters.append(lambda row: row.get(column) is not None and str(row.get(column)) in wanted)
+        return self
+    
+    def ilike(self, column: str, pattern: str) -> "MemoryQuery":
+        regex = _like_to_regex(pattern)
+        self._filters.append(lambda row: row.get(column) is not None and regex.fullmatch(str(row.get(column))) is not None)
+        return self
+    
+    def keyset_after(self, column: str, value: Any, guid: str, desc: bool = False) -> "MemoryQuery":
+        def comes_after(row: Dict[str, Any]) -> bool:
+            row_value = row.get(column)
+            row_guid = str(row.get("guid"))
+            guid_after = row_guid < guid if desc else row_guid > guid
+            
+            if value is None:
+                if row_value is None:
+                    return guid_after
+                return desc
+            if row_value is None:
+                return not desc
+            if _same_value(row_value, value):
+                return guid_after
+            return row_value < value if desc else row_value > value
+        
+        self._filters.append(comes_after)
+        return self
+    
+    def order(self, column: str, desc: bool = False) -> "MemoryQuery":
+        self._orders.append((column, desc))
+        return self
+    
+    def limit(self, count: int) -> "MemoryQuery":
+        self._limit = count
+        return self
+    
+    def _matches(self, row: Dict[str, Any]) -> bool:
+        return all(check(row) for check in self._filters)
+    
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if self._columns is None:
+            projected = copy.deepcopy(row)
+        else:
+            projected = {column: copy.deepcopy(row.get(column)) for column in self._columns}
+        
+        for alias, table_name, fk_column, columns in self._embeds:
+            embedded_columns, _ = _parse_columns(columns)
+            target = next((target for target in self._repository.rows(table_name) if row.get(fk_column) is not None and _same_value(target.get("guid"), row.get(fk_column))), None)
+            
+            if target is None:
+                projected[alias] = None
+            elif embedded_columns is None:
+                projected[alias] = copy.deepcopy(target)
+            else:
+                projected[alias] = {column: copy.deepcopy(target.get(column)) for column in embedded_columns}
+        
+        return projected
+    
+    async def execute(self) -> RepositoryResponse:
+        rows = self._repository.rows(self._table_name)
+        
+        if self._action == "insert":
+            inserted = [self._repository.apply_defaults(self._table_name, copy.deepcopy(row)) for row in self._payload]
+            rows.extend(inserted)
+            self._repository.index_rows(self._table_name, inserted)
+            return RepositoryResponse(data=[self._project(row) for row in inserted])
+        
+        matching = [row for row in rows if self._matches(row)]
+        
+        if self._action == "update":
+            self._repository.unindex_rows(self._table_name, matching)
+            for row in matching:
+                row.update(copy.deepcopy(self._payload))
+                self._repository.apply_generated(self._table_name, row)
+            self._repository.index_rows(self._table_name, matching)
+            return RepositoryResponse(data=[self._project(row) for row in matching])
+        
+        if self._action == "delete":
+            matched_ids = {id(row) for row in matching}
+            rows[:] = [row for row in rows if id(row) not in matched_ids]
+            self._repository.unindex_rows(self._table_name, matching)
+            return RepositoryResponse(data=[self._project(row) for row in matching])
+        
+        # Stable sorts applied last key first; nulls sort last ascending and first descending, as in Postgres
+        for column, desc in reversed(self._orders):
+            matching.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        
+        if self._limit is not None:
+            matching = matching[:self._limit]
+        
+        return RepositoryResponse(data=[self._project(row) for row in matching])
+
+class MemoryRepository(BaseRepository):
+    """
+    In-process stand-in for Supabase. Rows live in plain dicts keyed by table name, so the API can be
+    load tested and profiled without a live project. Seed it with MemoryRepository(tables={...}).
+    """
+    
+    def __init__(self, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        self._tables: Dict[str, List[Dict[str, Any]]] = {}
+        self._sequences: Dict[tuple, "itertools.count[int]"] = {}
+        self._trigram_indexes: Dict[Tuple[str, str], TrigramIndex] = {}
+        
+        for table_name, rows in (tables or {}).items():
+            self.seed(table_name, rows)
+    
+    def table(self, table_name: str) -> MemoryQuery:
+        return MemoryQuery(self, table_name)
+    
+    async def rpc(self, function_name: str, params: Optional[Dict[str, Any]] = None) -> RepositoryResponse:
+        handler = MEMORY_RPC_HANDLERS.get(function_name)
+        
+        if handler is None:
+            raise ValueError(f"Unknown rpc '{function_name}' for the memory repository")
+        
+        return RepositoryResponse(data=handler(self, params or {}))
+    
+    def rows(self, table_name: str) -> List[Dict[str, Any]]:
+        """Live row list for table_name (created on first use)"""
+        return self._tables.setdefault(table_name, [])
+    
+    def seed(self, table_name: str, rows: List[Dict[str, Any]]) -> None:
+        """Bulk load rows, filling the same defaults an insert would"""
+        seeded = [self.apply_defaults(table_name, copy.deepcopy(row)) for row in rows]
+        self.rows(table_name).extend(seeded)
+        self.index_rows(table_name, seeded)
+    
+    def trigram_indexes(self, table_name: str, partition: Optional[Any] = None) -> List[TrigramIndex]:
+        """The table's trigram index for one partition value, or every partition's when partition is None"""
+        if partition is not None:
+            index = self._trigram_indexes.get((table_name, str(partition)))
+            return [index] if index is not None else []
+        
+        return [index for (indexed_table, _), index in self._trigram_indexes.items() if indexed_table == table_name]
+    
+    def index_rows(self, table_name: str, rows: List[Dict[str, Any]]) -> None:
+        if table_name not in TABLE_TRIGRAM_INDEXES:
+            return
+        
+        column, partition_column = TABLE_TRIGRAM_INDEXES[table_name]
+        for row in rows:
+            index = self._trigram_indexes.setdefault((table_name, str(row.get(partition_column))), TrigramIndex())
+            index.add(str(row["guid"]), row.get(column) or "")
+    
+    def unindex_rows(self, table_name: str, rows: List[Dict[str, Any]]) -> None:
+        if table_name not in TABLE_TRIGRAM_INDEXES:
+            return
+        
+        _, partition_column = TABLE_TRIGRAM_INDEXES[table_name]
+        for row in rows:
+            index = self._trigram_indexes.get((table_name, str(row.get(partition_column))))
+            if index is not None:
+                index.remove(str(row["guid"]))
+    
+    def apply_defaults(self, table_name: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        defaults = {**COMMON_DEFAULTS, **TABLE_DEFAULTS.get(table_name, {})}
+        
+        for column, default in defaults.items():
+            if row.get(column) is None:
+                row[column] = default()
+        
+        for column in TABLE_SEQUENCES.get(table_name, []):
+            if row.get(column) is None:
+                sequence = self._sequences.setdefault((table_name, column), itertools.count(1))
+                row[column] = next(sequence)
+        
+        return self.apply_generated(table_name, row)
+    
+    def apply_generated(self, table_name: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        for column, compute in TABLE_GENERATED.get(table_name, {}).items():
+            row[column] = compute(row)
+        
+        return row
@@ -0,0 +1,229 @@
+import copy
+from uuid import uuid4
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+# In-memory equivalents of the Postgres functions the services call through rpc(),
+# registered by name. Each handler gets the MemoryRepository and the rpc params.
+MEMORY_RPC_HANDLERS: Dict[str, Callable[[Any, Dict[str, Any]], Any]] = {}
+
+def memory_rpc(function_name: str):
+    def register(handler):
+        MEMORY_RPC_HANDLERS[function_name] = handler
+        return handler
+    return register
+
+def _rollup_key(row: Dict[str, Any]) -> tuple:
+    return (str(row.get("user_guid")), str(row.get("library_hdr_guid")))
+
+@memory_rpc("apply_focus_session_rollup_delta")
+def apply_focus_session_rollup_delta(repository, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """See model/focus_session/app_mm_focus_session_rollup.py for the SQL version"""
+    rollups = repository.rows("app_mm_focus_session_rollup")
+    key = (str(params["p_user_guid"]), str(params["p_library_hdr_guid"]))
+    rollup = next((row for row in rollups if _rollup_key(row) == key), None)
+    
+    if rollup is None:
+        rollup = {"user_guid": key[0], "library_hdr_guid": key[1], "session_count": 0, "total_hrs": 0.0, "total_seconds": 0}
+        rollups.append(rollup)
+    
+    rollup["session_count"] += int(params.get("p_session_count") or 0)
+    rollup["total_hrs"] += float(params.get("p_total_hrs") or 0)
+    rollup["total_seconds"] += int(params.get("p_total_seconds") or 0)
+    rollup["updated_date"] = datetime.now(timezone.utc).isoformat()
+    
+    return [dict(rollup)]
+
+@memory_rpc("update_focus_session_with_rollup")
+def update_focus_session_with_rollup(repository, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """See model/focus_session/app_mm_focus_session_rollup.py for the SQL version"""
+    session = next((row for row in repository.rows("app_mm_focus_session") if str(row.get("guid")) == str(params["p_guid"])), None)
+    if session is None:
+        return []
+    
+    def delta(row: Dict[str, Any], sign: int) -> None:
+        if row.get("user_guid") and row.get("library_hdr_guid"):
+            apply_focus_session_rollup_delta(repository, {
+                "p_user_guid": row["user_guid"],
+                "p_library_hdr_guid": row["library_hdr_guid"],
+                "p_session_count": sign,
+                "p_total_hrs": sign * float(row.get("time_hrs") or 0),
+                "p_total_seconds": sign * int(row.get("time_seconds") or 0)
+            })
+    
+    delta(session, -1)
+    session.update(copy.deepcopy(params["p_changes"]))
+    session["updated_date"] = datetime.now(timezone.utc).isoformat()
+    delta(session, 1)
+    
+    return [dict(session)]
+
+@memory_rpc("rebuild_focus_session_rollup")
+def rebuild_focus_session_rollup(repository, params: Dict[str, Any]) -> int:
+    """See model/focus_session/app_mm_focus_session_rollup.py for the SQL version"""
+    rebuilt: Dict[tuple, Dict[str, Any]] = {}
+    now = datetime.now(timezone.utc).isoformat()
+    
+    for session in repository.rows("app_mm_focus_session"):
+        key = _rollup_key(session)
+        rollup = rebuilt.setdefault(key, {"user_guid": key[0], "library_hdr_guid": key[1], "session_count": 0, "total_hrs": 0.0, "total_seconds": 0, "updated_date": now})
+        rollup["session_count"] += 1
+        rollup["total_hrs"] += float(session.get("time_hrs") or 0)
+        rollup["total_seconds"] += int(session.get("time_seconds") or 0)
+    
+    repository.rows("app_mm_focus_session_rollup")[:] = list(rebuilt.values())
+    
+    return len(rebuilt)
+
+@memory_rpc("bulk_create_notebook_content")
+def bulk_create_notebook_content(repository, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """See model/notebook/app_mm_notebook_content.py for the SQL version"""
+    notebook_hdr_guid = str(params["p_notebook_hdr_guid"])
+    contents = repository.rows("app_mm_notebook_content")
+    start_no = max((row.get("sequence_no") or 0 for row in contents if str(row.get("notebook_hdr_guid")) == notebook_hdr_guid), default=0)
+    created = []
+    
+    for offset, item in enumerate(params.get("p_contents") or [], start=1):
+        row = repository.apply_defaults("app_mm_notebook_content", {
+            **copy.deepcopy(item),
+            "notebook_hdr_guid": notebook_hdr_guid,
+            "sequence_no": start_no + offset
+        })
+        contents.append(row)
+        created.append(copy.deepcopy(row))
+    
+    return created
+
+@memory_rpc("acquire_file_upload_by_hash")
+def acquire_file_upload_by_hash(repository, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """See model/file/app_mm_file_upload.py for the SQL version"""
+    rows = repository.rows("app_mm_file_upload")
+    same_bytes = [row for row in rows if row.get("bucket_name") == params["p_bucket_name"] and row.get("content_hash") == params["p_content_hash"]]
+    
+    if not same_bytes:
+        return []
+    
+    now = datetime.now(timezone.utc).isoformat()
+    own = next((row for row in same_bytes if str(row.get("user_guid")) == str(params["p_user_guid"])), None)
+    
+    if own is not None:
+        own["ref_count"] = (own.get("ref_count") or 1) + 1
+        own["updated_date"] = now
+        return [copy.deepcopy(own)]
+    
+    source = same_bytes[0]
+    metadata = copy.deepcopy(params.get("p_metadata"))
+    if "variants" in (source.get("metadata") or {}):
+        metadata = {**(metadata or {}), "variants": copy.deepcopy(source["metadata"]["variants"])}
+    
+    row = repository.apply_defaults("app_mm_file_upload", {
+        **copy.deepcopy(source),
+        "guid": str(uuid4()),
+        "user_guid": str(params["p_user_guid"]),
+        "metadata": metadata,
+        "ref_count": 1,
+        "created_date": now,
+        "updated_date": now
+    })
+    rows.append(row)
+    
+    return [copy.deepcopy(row)]
+
+@memory_rpc("acquire_file_upload")
+def acquire_file_upload(repository, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """See model/file/app_mm_file_upload.py for the SQL version"""
+    for row in repository.rows("app_mm_file_upload"):
+        if str(row.get("guid")) == str(params["p_guid"]):
+            row["ref_count"] = (row.get("ref_count") or 1) + 1
+            row["updated_date"] = datetime.now(timezone.utc).isoformat()
+            return [copy.deepcopy(row)]
+    
+    return []
+
+@memory_rpc("release_file_upload")
+def release_file_upload(repository, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """See model/file/app_mm_file_upload.py for the SQL version"""
+    rows = repository.rows("app_mm_file_upload")
+    
+    for index, row in enumerate(rows):
+        if str(row.get("guid")) == str(params["p_guid"]):
+            row["ref_count"] = (row.get("ref_count") or 1) - 1
+            row["updated_date"] = datetime.now(timezone.utc).isoformat()
+            released = copy.deepcopy(row)
+            
+            if row["ref_count"] <= 0:
+                del rows[index]
+            
+            return [released]
+    
+    return []
+
+@memory_rpc("set_book_catalog_cover_file")
+def set_book_catalog_cover_file(repository, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """See model/file/app_mm_file_upload.py for the SQL version"""
+    catalog = next((row for row in repository.rows("app_mm_book_catalog") if str(row.get("guid")) == str(params["p_catalog_guid"])), None)
+    
+    if catalog is None or catalog.get("cover_file_guid"):
+        return []
+    
+    now = datetime.now(timezone.utc).isoformat()
+    catalog["cover_file_guid"] = str(params["p_file_guid"])
+    catalog["updated_date"] = now
+    acquire_file_upload(repository, {"p_guid": params["p_file_guid"]})
+    
+    return [copy.deepcopy(catalog)]
+
+def _parse_timestamp(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+@memory_rpc("claim_next_job")
+def claim_next_job(repository, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """See model/job/app_mm_job.py for the SQL version"""
+    now = datetime.now(timezone.utc)
+    runnable = [row for row in repository.rows("app_mm_job") if row.get("status") == "QUEUED" and _parse_timestamp(row["run_after"]) <= now]
+    
+    if not runnable:
+        return []
+    
+    job = min(runnable, key=lambda row: _parse_timestamp(row["run_after"]))
+    job["status"] = "RUNNING"
+    job["attempts"] = (job.get("attempts") or 0) + 1
+    job["updated_date"] = now.isoformat()
+    return [copy.deepcopy(job)]
+
+@memory_rpc("requeue_stale_jobs")
+def requeue_stale_jobs(repository, params: Dict[str, Any]) -> int:
+    """See model/job/app_mm_job.py for the SQL version"""
+    now = datetime.now(timezone.utc)
+    requeued = 0
+    
+    for row in repository.rows("app_mm_job"):
+        if row.get("status") == "RUNNING" and (now - _parse_timestamp(row["updated_date"])).total_seconds() > params["p_stale_seconds"]:
+            if (row.get("attempts") or 0) >= (row.get("max_attempts") or 0):
+                row["status"] = "FAILED"
+                row["last_error"] = "Worker stopped while running the job"
+            else:
+                row["status"] = "QUEUED"
+            row["updated_date"] = now.isoformat()
+            requeued += 1
+    
+    return requeued
+
+@memory_rpc("search_library_hdrs_by_book_name")
+def search_library_hdrs_by_book_name(repository, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """See model/library/app_mm_library_hdr.py for the SQL version"""
+    limit = int(params["p_limit"])
+    results = []
+    
+    # The repository keeps a trigram index per user in step with the table, only titles sharing a trigram with the query are scored
+    for index in repository.trigram_indexes("app_mm_library_hdr", params.get("p_user_guid") or None):
+        results.extend(index.search(params["p_query"], float(params["p_min_similarity"]), limit))
+    
+    results.sort(key=lambda result: (-result[1], -result[2], str(result[0])))
+    return [
+        {"guid": guid, "name_word_similarity": word_score, "name_similarity": score}
+        for guid, word_score, score in results[:limit]
+    ]
+
@@ -0,0 +1,31 @@
+from typing import Optional
+from util.settings import get_settings
+from service.repository.base_repository import BaseRepository
+
+_repository: Optional[BaseRepository] = None
+
+def get_repository() -> BaseRepository:
+    """
+    Get the process wide repository. MM_REPOSITORY_BACKEND selects the backend:
+    "supabase" (default) or "memory" for offline benchmarks and scaling tests.
+    """
+    global _repository
+    
+    if _repository is None:
+        backend = get_settings().repository_backend
+        
+        if backend == "supabase":
+            from service.repository.supabase_repository import SupabaseRepository
+            _repository = SupabaseRepository()
+        elif backend == "memory":
+            from service.repository.memory_repository import MemoryRepository
+            _repository = MemoryRepository()
+        else:
+            raise ValueError(f"Unknown MM_REPOSITORY_BACKEND '{backend}'")
+    
+    return _repository
+
+def set_repository(repository: Optional[BaseRepository]) -> None:
+    """Swap the process wide repository, e.g. for a seeded MemoryRepository in a benchmark"""
+    global _repository
+    _repository = repository
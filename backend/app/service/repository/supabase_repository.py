@@ -0,0 +1,85 @@
+from typing import Any, Callable, Dict, List, Optional, Union
+from util.supabase_config import get_async_supabase, get_async_supabase_admin
+from service.repository.base_repository import BaseQuery, BaseRepository, RepositoryResponse
+
+class SupabaseQuery(BaseQuery):
+    """Records the builder calls and replays them on the async PostgREST builder at execute time"""
+    
+    def __init__(self, table_name: str, use_admin: bool = False):
+        self._table_name = table_name
+        self._use_admin = use_admin
+        self._steps: List[Callable[[Any], Any]] = []
+    
+    def _chain(self, step: Callable[[Any], Any]) -> "SupabaseQuery":
+        self._steps.append(step)
+        return self
+    
+    def select(self, columns: str = "*") -> "SupabaseQuery":
+        return self._chain(lambda builder: builder.select(columns))
+    
+    def insert(self, rows: Union[Dict[str, Any], List[Dict[str, Any]]]) -> "SupabaseQuery":
+        return self._chain(lambda builder: builder.insert(rows))
+    
+    def update(self, data: Dict[str, Any]) -> "SupabaseQuery":
+        return self._chain(lambda builder: builder.update(data))
+    
+    def delete(self) -> "SupabaseQuery":
+        return self._chain(lambda builder: builder.delete())
+    
+    def eq(self, column: str, value: Any) -> "SupabaseQuery":
+        return self._chain(lambda builder: builder.eq(column, value))
+    
+    def in_(self, column: str, values: List[Any]) -> "SupabaseQuery":
+        return self._chain(lambda builder: builder.in_(column, values))
+    
+    def ilike(self, column: str, pattern: str) -> "SupabaseQuery":
+        return self._chain(lambda builder: builder.ilike(column, pattern))
+    
+    def keyset_after(self, column: str, value: Any, guid: str, desc: bool = False) -> "SupabaseQuery":
+        op = "lt" if desc else "gt"
+        
+        if value is None:
+            # Nulls come first descending (everything non-null follows) and last ascending
+            conditions = [f"and({column}.is.null,guid.{op}.{guid})"]
+            if desc:
+                conditions.append(f"{column}.not.is.null")
+        else:
+            quoted = '"' + str(value).replace('"', '\\"') + '"'
+            conditions = [f"{column}.{op}.{quoted}", f"and({column}.eq.{quoted},guid.{op}.{guid})"]
+            if not desc:
+                conditions.append(f"{column}.is.null")
+        
+        filters = ",".join(conditions)
+        return self._chain(lambda builder: builder.or_(filters))
+    
+    def order(self, column: str, desc: bool = False) -> "SupabaseQuery":
+        return self._chain(lambda builder: builder.order(column, desc=desc))
+    
+    def limit(self, count: int) -> "SupabaseQuery":
+        return self._chain(lambda builder: builder.limit(count))
+    
+    async def execute(self) -> RepositoryResponse:
+        client = await (get_async_supabase_admin() if self._use_admin else get_async_supabase())
+        builder = client.table(self._table_name)
+        
+        for step in self._steps:
+            builder = step(builder)
+        
+        response = await builder.execute()
+        
+        return RepositoryResponse(data=response.data or [], count=response.count)
+
+class SupabaseRepository(BaseRepository):
+    """Repository backed by the Supabase project configured in .env"""
+    
+    def __init__(self, use_admin: bool = False):
+        self._use_admin = use_admin
+    
+    def table(self, table_name: str) -> SupabaseQuery:
+        return SupabaseQuery(table_name, self._use_admin)
+    
+    async def rpc(self, function_name: str, params: Optional[Dict[str, Any]] = None) -> RepositoryResponse:
+        client = await (get_async_supabase_admin() if self._use_admin else get_async_supabase())
+        response = await client.rpc(function_name, params or {}).execute()
+        
+        return RepositoryResponse(data=response.data or [], count=response.count)
@@ -0,0 +1,247 @@
+import asyncio
+from uuid import UUID
+from typing import Any, Dict, Iterable, List, Optional
+from service.repository.repository_provider import get_repository
+from service.repository.keyset_pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, keyset_query, page_size, split_page
+from model.page_response import PageResponse
+from model.dto.notebook_search_dto import NotebookSearchHit
+from util.index_registry import IndexRegistry
+from util.text_search import TextSearchIndex, snippet
+from util.settings import get_settings
+
+# One full-text index per user over their highlights and chat messages, built on their first search
+search_indexes = IndexRegistry(maxsize=get_settings().search_index_max_loaded, ttl=get_settings().index_ttl_seconds)
+
+class NotebookSearchService:
+    """
+    Full-text search over a user's notebook contents (content_text) and chat transcripts (msg_content),
+    ranked with BM25 from an in-process inverted index. The content and transcript services push their
+    writes here, so a loaded index stays in step with the tables without being rebuilt; writes made
+    while an index is loading are replayed onto it by the registry.
+    """
+    CONTENT_TABLE = "app_mm_notebook_content"
+    TRANSCRIPT_TABLE = "app_mm_notebook_llm_chat_transcript"
+    NOTEBOOK_HDR_TABLE = "app_mm_notebook_hdr"
+    CHAT_HDR_TABLE = "app_mm_notebook_llm_chat_hdr"
+    SOURCE_CONTENT = "content"
+    SOURCE_CHAT = "chat"
+    
+    @staticmethod
+    def _doc_id(source: str, guid: Any) -> str:
+        return f"{source}:{guid}"
+    
+    @staticmethod
+    def _str(value: Any) -> Optional[str]:
+        return str(value) if value else None
+    
+    @staticmethod
+    async def _scan(table_name: str, columns: str, user_guid: str) -> List[Dict[str, Any]]:
+        """Every row of a table for one user, a page at a time"""
+        rows: List[Dict[str, Any]] = []
+        cursor = None
+        
+        while True:
+            query = get_repository().table(table_name).select(columns).eq("user_guid", user_guid)
+            response = await keyset_query(query, cursor, MAX_PAGE_SIZE, "created_date", desc=False).execute()
+            page, cursor = split_page(response.data, MAX_PAGE_SIZE, "created_date")
+            rows.extend(page)
+            
+            if not cursor:
+                return rows
+    
+    @staticmethod
+    def _add_content(index: TextSearchIndex, row: Dict[str, Any], library_hdr_guid: Any) -> None:
+        index.add(NotebookSearchService._doc_id(NotebookSearchService.SOURCE_CONTENT, row["guid"]), row.get("content_text") or "", {
+            "source": NotebookSearchService.SOURCE_CONTENT,
+            "guid": str(row["guid"]),
+            "notebook_hdr_guid": NotebookSearchService._str(row.get("notebook_hdr_guid")),
+            "library_hdr_guid": NotebookSearchService._str(library_hdr_guid),
+            "created_date": row.get("created_date"),
+            "text": row.get("content_text") or ""
+        })
+    
+    @staticmethod
+    def _add_transcript(index: TextSearchIndex, row: Dict[str, Any], chat_hdr: Optional[Dict[str, Any]]) -> None:
+        chat_hdr = chat_hdr or {}
+        index.add(NotebookSearchService._doc_id(NotebookSearchService.SOURCE_CHAT, row["guid"]), row.get("msg_content") or "", {
+            "source": NotebookSearchService.SOURCE_CHAT,
+            "guid": str(row["guid"]),
+            "llm_chat_hdr_guid": NotebookSearchService._str(row.get("llm_chat_hdr_guid")),
+            "notebook_hdr_guid": NotebookSearchService._str(chat_hdr.get("notebook_hdr_guid")),
+            "library_hdr_guid": NotebookSearchService._str(chat_hdr.get("library_hdr_guid")),
+            "created_date": row.get("created_date"),
+            "text": row.get("msg_content") or ""
+        })
+    
+    @staticmethod
+    async def _load_index(user_guid: str) -> TextSearchIndex:
+        """Build a user's index from their contents and transcripts, then register it with the writes made meanwhile"""
+        search_indexes.begin_load(user_guid)
+        try:
+            index = await NotebookSearchService._build_index(user_guid)
+        except BaseException:
+            search_indexes.cancel_load(user_guid)
+            raise
+        
+        return search_indexes.put(user_guid, index)
+    
+    @staticmethod
+    async def _build_index(user_guid: str) -> TextSearchIndex:
+        """Tokenizing runs off the event loop"""
+        notebooks, chat_hdrs, contents, transcripts = await asyncio.gather(
+            NotebookSearchService._scan(NotebookSearchService.NOTEBOOK_HDR_TABLE, "guid, library_hdr_guid, created_date", user_guid),
+            NotebookSearchService._scan(NotebookSearchService.CHAT_HDR_TABLE, "guid, notebook_hdr_guid, library_hdr_guid, created_date", user_guid),
+            NotebookSearchService._scan(NotebookSearchService.CONTENT_TABLE, "guid, notebook_hdr_guid, library_hdr_guid, content_text, created_date", user_guid),
+            NotebookSearchService._scan(NotebookSearchService.TRANSCRIPT_TABLE, "guid, llm_chat_hdr_guid, msg_content, created_date", user_guid)
+        )
+        
+        notebook_libraries = {str(row["guid"]): row.get("library_hdr_guid") for row in notebooks}
+        chat_hdrs_by_guid = {str(row["guid"]): row for row in chat_hdrs}
+        
+        def build() -> TextSearchIndex:
+            index = TextSearchIndex()
+            for row in contents:
+                NotebookSearchService._add_content(index, row, row.get("library_hdr_guid") or notebook_libraries.get(str(row.get("notebook_hdr_guid"))))
+            for row in transcripts:
+                # Transcripts outlive a deleted chat header (no FK), they are not searchable without it
+                chat_hdr = chat_hdrs_by_guid.get(str(row.get("llm_chat_hdr_guid")))
+                if chat_hdr is not None:
+                    NotebookSearchService._add_transcript(index, row, chat_hdr)
+            return index
+        
+        return await asyncio.to_thread(build)
+    
+    @staticmethod
+    async def _lookup(table_name: str, columns: str, guids: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        guids = list({str(guid) for guid in guids if guid})
+        if not guids:
+            return {}
+        
+        response = await get_repository().table(table_name).select(columns).in_("guid", guids).execute()
+        
+        return {str(row["guid"]): row for row in response.data}
+    
+    @staticmethod
+    async def index_contents(rows: List[Dict[str, Any]]) -> None:
+        """Add or replace created/updated content rows in their users' loaded (or loading) indexes"""
+        rows = [row for row in rows if search_indexes.is_tracked(str(row["user_guid"]))]
+        if not rows:
+            return
+        
+        notebooks = await NotebookSearchService._lookup(
+            NotebookSearchService.NOTEBOOK_HDR_TABLE,
+            "guid, library_hdr_guid",
+            [row.get("notebook_hdr_guid") for row in rows if not row.get("library_hdr_guid")]
+        )
+        
+        for row in rows:
+            library_hdr_guid = row.get("library_hdr_guid") or notebooks.get(str(row.get("notebook_hdr_guid")), {}).get("library_hdr_guid")
+            search_indexes.apply(
+                str(row["user_guid"]),
+                lambda index, row=row, library_hdr_guid=library_hdr_guid: NotebookSearchService._add_content(index, row, library_hdr_guid)
+            )
+    
+    @staticmethod
+    async def index_transcripts(rows: List[Dict[str, Any]]) -> None:
+        """Add or replace created/updated transcript rows in their users' loaded (or loading) indexes"""
+        rows = [row for row in rows if search_indexes.is_tracked(str(row["user_guid"]))]
+        if not rows:
+            return
+        
+        chat_hdrs = await NotebookSearchService._lookup(
+            NotebookSearchService.CHAT_HDR_TABLE,
+            "guid, notebook_hdr_guid, library_hdr_guid",
+            [row.get("llm_chat_hdr_guid") for row in rows]
+        )
+        
+        for row in rows:
+            chat_hdr = chat_hdrs.get(str(row.get("llm_chat_hdr_guid")))
+            search_indexes.apply(
+                str(row["user_guid"]),
+                lambda index, row=row, chat_hdr=chat_hdr: NotebookSearchService._add_transcript(index, row, chat_hdr)
+            )
+    
+    @staticmethod
+    def remove_rows(source: str, rows: List[Dict[str, Any]]) -> None:
+        """Drop deleted content or transcript rows (with their user_guid) from loaded indexes"""
+        for row in rows:
+            doc_id = NotebookSearchService._doc_id(source, row["guid"])
+            search_indexes.apply(str(row["user_guid"]), lambda index, doc_id=doc_id: index.remove(doc_id))
+    
+    @staticmethod
+    def update_chat_hdr(chat_hdr: Dict[str, Any]) -> None:
+        """Move a chat's indexed messages to the notebook and book the chat header now points at"""
+        chat_hdr_guid = str(chat_hdr["guid"])
+        changes = {
+            "notebook_hdr_guid": NotebookSearchService._str(chat_hdr.get("notebook_hdr_guid")),
+            "library_hdr_guid": NotebookSearchService._str(chat_hdr.get("library_hdr_guid"))
+        }
+        
+        search_indexes.apply(
+            str(chat_hdr["user_guid"]),
+            lambda index: index.update_fields(lambda fields: fields.get("llm_chat_hdr_guid") == chat_hdr_guid, changes)
+        )
+    
+    @staticmethod
+    def remove_chat_hdr(chat_hdr: Dict[str, Any]) -> None:
+        """Drop a deleted chat header's messages from its user's loaded index"""
+        chat_hdr_guid = str(chat_hdr["guid"])
+        
+        search_indexes.apply(
+            str(chat_hdr["user_guid"]),
+            lambda index: index.remove_where(lambda fields: fields.get("llm_chat_hdr_guid") == chat_hdr_guid)
+        )
+    
+    @staticmethod
+    async def search(
+        user_guid: UUID,
+        query: str,
+        library_hdr_guid: Optional[UUID] = None,
+        notebook_hdr_guid: Optional[UUID] = None,
+        sources: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> PageResponse[NotebookSearchHit]:
+        """A page of the user's highlights and chat messages matching query, best match first, with highlighted snippets"""
+        if not query or not query.strip():
+            raise ValueError("Query is empty")
+        
+        unknown = set(sources or []) - {NotebookSearchService.SOURCE_CONTENT, NotebookSearchService.SOURCE_CHAT}
+        if unknown:
+            raise ValueError(f"Unknown search sources: {', '.join(sorted(unknown))}")
+        
+        index = search_indexes.get(str(user_guid)) or await NotebookSearchService._load_index(str(user_guid))
+        
+        ranked = index.search(query, {
+            "source": sources or None,
+            "library_hdr_guid": NotebookSearchService._str(library_hdr_guid),
+            "notebook_hdr_guid": NotebookSearchService._str(notebook_hdr_guid)
+        })
+        
+        # Seek past the last (score, doc id) of the previous page, the same ordering the ranking uses
+        if cursor:
+            position = decode_cursor(cursor)
+            ranked = [
+                (doc_id, score) for doc_id, score in ranked
+                if (-score, doc_id) > (-float(position["v"]), position["g"])
+            ]
+        
+        size = page_size(limit)
+        page = ranked[:size]
+        next_cursor = encode_cursor({"score": page[-1][1], "guid": page[-1][0]}, "score") if len(ranked) > size else None
+        
+        hits = []
+        for doc_id, score in page:
+            fields = index.fields(doc_id)
+            hits.append(NotebookSearchHit(
+                source=fields["source"],
+                guid=UUID(fields["guid"]),
+                score=score,
+                snippet=snippet(fields["text"], query),
+                notebook_hdr_guid=fields.get("notebook_hdr_guid"),
+                library_hdr_guid=fields.get("library_hdr_guid"),
+                llm_chat_hdr_guid=fields.get("llm_chat_hdr_guid"),
+                created_date=fields.get("created_date")
+            ))
+        
+        return PageResponse[NotebookSearchHit](items=hits, next_cursor=next_cursor)
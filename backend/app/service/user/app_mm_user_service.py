@@ -1,20 +1,25 @@
 from uuid import UUID, uuid4
-from typing import List, Optional
-from util.supabase_config import supabase
+from typing import Optional
+from service.repository.repository_provider import get_repository
+from service.repository.field_projection import parse_fields, project
+from util.entity_cache import entity_cache
+from service.repository.keyset_pagination import keyset_query, keyset_page
+from model.page_response import PageResponse
 from model.user.app_mm_user import AppMmUserCreate, AppMmUserUpdate, AppMmUserResponse
 
 class AppMmUserService:
     TABLE_NAME = "app_mm_user"
+    ENTITY_TYPE = "user"
     
     @staticmethod
-    def create_user(user_data: AppMmUserCreate) -> AppMmUserResponse:
+    async def create_user(user_data: AppMmUserCreate) -> AppMmUserResponse:
         """Create a new user"""
         new_user = {
             "guid": str(uuid4()),
             "email": user_data.email
         }
         
-        response = supabase.table(AppMmUserService.TABLE_NAME).insert(new_user).execute()
+        response = await get_repository().table(AppMmUserService.TABLE_NAME).insert(new_user).execute()
         
         if not response.data:
             raise Exception("Failed to create user")
@@ -22,9 +27,17 @@ class AppMmUserService:
         return AppMmUserResponse(**response.data[0])
     
     @staticmethod
-    def get_user_by_id(user_id: UUID) -> Optional[AppMmUserResponse]:
-        """Get user by GUID"""
-        response = supabase.table(AppMmUserService.TABLE_NAME).select("*").eq("guid", str(user_id)).execute()
+    async def get_user_by_id(user_id: UUID, fields: Optional[str] = None) -> Optional[AppMmUserResponse]:
+        """Get user by GUID (served from the entity cache when possible)"""
+        columns = parse_fields(fields, AppMmUserResponse)
+        entity = await entity_cache.get_or_load(AppMmUserService.ENTITY_TYPE, user_id, lambda: AppMmUserService._load_by_id(user_id))
+        
+        return project(entity, columns)
+    
+    @staticmethod
+    async def _load_by_id(user_id: UUID) -> Optional[AppMmUserResponse]:
+        """Get user by GUID from the repository, bypassing the cache"""
+        response = await get_repository().table(AppMmUserService.TABLE_NAME).select("*").eq("guid", str(user_id)).execute()
         
         if not response.data:
             return None
@@ -32,21 +45,23 @@ class AppMmUserService:
         return AppMmUserResponse(**response.data[0])
     
     @staticmethod
-    def get_all_users() -> List[AppMmUserResponse]:
-        """Get all users"""
-        response = supabase.table(AppMmUserService.TABLE_NAME).select("*").execute()
+    async def get_all_users(limit: Optional[int] = None, cursor: Optional[str] = None) -> PageResponse[AppMmUserResponse]:
+        """Get a page of users"""
+        query = get_repository().table(AppMmUserService.TABLE_NAME).select("*")
+        response = await keyset_query(query, cursor, limit).execute()
         
-        return [AppMmUserResponse(**user) for user in response.data]
+        return keyset_page(response.data, limit, AppMmUserResponse)
     
     @staticmethod
-    def update_user(user_id: UUID, user_data: AppMmUserUpdate) -> Optional[AppMmUserResponse]:
+    async def update_user(user_id: UUID, user_data: AppMmUserUpdate) -> Optional[AppMmUserResponse]:
         """Update user by GUID"""
         update_data = user_data.model_dump(exclude_unset=True)
         
         if not update_data:
-            return AppMmUserService.get_user_by_id(user_id)
+            return await AppMmUserService.get_user_by_id(user_id)
         
-        response = supabase.table(AppMmUserService.TABLE_NAME).update(update_data).eq("guid", str(user_id)).execute()
+        response = await get_repository().table(AppMmUserService.TABLE_NAME).update(update_data).eq("guid", str(user_id)).execute()
+        entity_cache.invalidate(AppMmUserService.ENTITY_TYPE, user_id)
         
         if not response.data:
             return None
@@ -54,8 +69,9 @@ class AppMmUserService:
         return AppMmUserResponse(**response.data[0])
     
     @staticmethod
-    def delete_user(user_id: UUID) -> bool:
+    async def delete_user(user_id: UUID) -> bool:
         """Delete user by GUID"""
-        response = supabase.table(AppMmUserService.TABLE_NAME).delete().eq("guid", str(user_id)).execute()
+        response = await get_repository().table(AppMmUserService.TABLE_NAME).delete().eq("guid", str(user_id)).execute()
+        entity_cache.invalidate(AppMmUserService.ENTITY_TYPE, user_id)
         
         return len(response.data) > 0
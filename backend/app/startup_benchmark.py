@@ -0,0 +1,90 @@
+"""
+Cold start budget for the API. Imports main in fresh interpreters, reports the median import time and
+the slowest modules (from -X importtime), and exits non-zero when the median is over budget or when a
+module that must stay lazy was imported at startup.
+
+Run from backend/app:
+    python startup_benchmark.py [--runs 5] [--budget-ms 1500]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+# Heavy SDKs that are only imported on first use (util/supabase_config.py, util/gemini_config.py, util/image_variants.py)
+LAZY_MODULES = ["google.generativeai", "grpc", "supabase", "PIL"]
+
+DEFAULT_BUDGET_MS = float(os.environ.get("MM_STARTUP_BUDGET_MS", "1500"))
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed_ms": elapsed * 1000, "loaded": [name for name in %r if name in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+def _run_once() -> Tuple[float, List[str], Dict[str, int]]:
+    """One cold import of main: (milliseconds, lazy modules that got loaded, cumulative microseconds per top level module)"""
+    # Disable bytecode writing so every run sees the same cache state
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1", "MM_JOB_WORKERS": "0"}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing main failed:\n{completed.stderr}")
+    
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    
+    # -X importtime lines: "import time: self [us] | cumulative | imported package", nesting shown by indentation
+    cumulative: Dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if total.isdigit() and "." not in name:
+            cumulative[name] = max(cumulative.get(name, 0), int(total))
+    
+    return result["elapsed_ms"], result["loaded"], cumulative
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure cold import time of main.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="slowest top level imports to list")
+    args = parser.parse_args()
+    
+    timings = []
+    loaded: List[str] = []
+    cumulative: Dict[str, int] = {}
+    
+    for _ in range(args.runs):
+        elapsed_ms, loaded, cumulative = _run_once()
+        timings.append(elapsed_ms)
+    
+    median_ms = statistics.median(timings)
+    print(f"import main: median {median_ms:.0f}ms over {args.runs} runs (min {min(timings):.0f}ms, max {max(timings):.0f}ms), budget {args.budget_ms:.0f}ms")
+    print("slowest top level imports:")
+    for name, total in sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {total / 1000:8.1f}ms  {name}")
+    
+    failed = False
+    if loaded:
+        print(f"FAIL: imported at startup but should load lazily: {', '.join(loaded)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL: cold import is over budget by {median_ms - args.budget_ms:.0f}ms")
+        failed = True
+    
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+class DiskCache:
+    """
+    Small persistent key/value cache backed by a local SQLite file, so entries survive restarts.
+    Values are stored as JSON with their own expiry. A None value is a cached miss (negative entry).
+    """
+    
+    def __init__(self, path: str, table_name: str = "cache_entry"):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        
+        self._table_name = table_name
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(f"CREATE TABLE IF NOT EXISTS {table_name} (key TEXT PRIMARY KEY, value TEXT, expires_at REAL NOT NULL)")
+        self._connection.commit()
+        
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Tuple[bool, Optional[Any]]:
+        """(found, value); found is True for a live entry, including a cached None"""
+        with self._lock:
+            row = self._connection.execute(f"SELECT value, expires_at FROM {self._table_name} WHERE key = ?", (key,)).fetchone()
+            
+            if row is None or row[1] <= time.time():
+                self.misses += 1
+                return False, None
+            
+            value = json.loads(row[0]) if row[0] is not None else None
+            
+            if value is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            
+            return True, value
+    
+    def set(self, key: str, value: Optional[Any], ttl: float) -> None:
+        """Store value (None caches a miss) for ttl seconds"""
+        payload = json.dumps(value) if value is not None else None
+        
+        with self._lock:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self._table_name} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, time.time() + ttl)
+            )
+            self._connection.commit()
+    
+    def purge_expired(self) -> int:
+        """Delete expired entries, returns how many were removed"""
+        with self._lock:
+            cursor = self._connection.execute(f"DELETE FROM {self._table_name} WHERE expires_at <= ?", (time.time(),))
+            self._connection.commit()
+            return cursor.rowcount
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters since start and number of stored entries"""
+        with self._lock:
+            size = self._connection.execute(f"SELECT COUNT(*) FROM {self._table_name}").fetchone()[0]
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": size,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0
+            }
@@ -0,0 +1,70 @@
+import re
+import hashlib
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List
+from util.settings import get_settings
+from util.gemini_config import get_gemini_model
+
+_WORD = re.compile(r"\w+")
+
+class EmbeddingProvider(ABC):
+    """Turns texts into fixed size vectors; name identifies the model so vectors from different models are never mixed"""
+    name: str = ""
+    dimension: int = 0
+    
+    @abstractmethod
+    async def embed(self, texts: List[str], is_query: bool = False) -> List[List[float]]:
+        """One vector per text; is_query marks search queries for models that embed them differently"""
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, model_name: str, dimension: int = 768):
+        self.name = model_name
+        self.dimension = dimension
+    
+    async def embed(self, texts: List[str], is_query: bool = False) -> List[List[float]]:
+        import google.generativeai as genai
+        
+        # Configures the API key on first use
+        get_gemini_model()
+        result = await genai.embed_content_async(
+            model=self.name,
+            content=texts,
+            task_type="retrieval_query" if is_query else "retrieval_document"
+        )
+        return result["embedding"]
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic local embeddings for development and tests (MM_EMBEDDING_PROVIDER=fake): hashed bag of
+    words, so texts sharing words are close, without network access or an API key
+    """
+    
+    def __init__(self, dimension: int = 256):
+        self.name = f"fake-hashed-bow-{dimension}"
+        self.dimension = dimension
+    
+    async def embed(self, texts: List[str], is_query: bool = False) -> List[List[float]]:
+        vectors = []
+        
+        for text in texts:
+            vector = [0.0] * self.dimension
+            for word in _WORD.findall(text.lower()):
+                digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dimension
+                vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+            vectors.append(vector)
+        
+        return vectors
+
+@lru_cache(maxsize=1)
+def get_embedding_provider() -> EmbeddingProvider:
+    """Process wide embedding model, MM_EMBEDDING_PROVIDER selects gemini (default) or fake"""
+    settings = get_settings()
+    
+    if settings.embedding_provider == "gemini":
+        return GeminiEmbeddingProvider(settings.embedding_model_name)
+    if settings.embedding_provider == "fake":
+        return FakeEmbeddingProvider()
+    
+    raise ValueError(f"Unknown MM_EMBEDDING_PROVIDER '{settings.embedding_provider}'")
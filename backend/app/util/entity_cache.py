@@ -0,0 +1,76 @@
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+from cachetools import TTLCache
+from util.settings import get_settings
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+class EntityCache:
+    """
+    In-process read-through cache of single rows keyed by (entity type, guid).
+    TTLCache bounds the size (least recently used entries are evicted first) and expires entries after ttl seconds.
+    Services call invalidate() from their update/delete methods so reads never outlive a write made through the API.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        # Bumped on every invalidation, a load that raced a write is not stored
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+    
+    async def get_or_load(self, entity_type: str, guid: Any, loader: Callable[[], Awaitable[Optional[T]]]) -> Optional[T]:
+        """Return the cached entity or await loader() and cache its result (None is not cached)"""
+        key = (entity_type, str(guid))
+        
+        with self._lock:
+            value = self._cache.get(key, _MISSING)
+            if value is not _MISSING:
+                self.hits += 1
+            else:
+                self.misses += 1
+            version = self._version
+        
+        if value is not _MISSING:
+            return value.model_copy(deep=True)
+        
+        value = await loader()
+        
+        if value is not None:
+            with self._lock:
+                if version == self._version:
+                    self._cache[key] = value.model_copy(deep=True)
+        
+        return value
+    
+    def invalidate(self, entity_type: str, guid: Any) -> None:
+        """Drop one entity, called after it is updated or deleted"""
+        with self._lock:
+            self._version += 1
+            self._cache.pop((entity_type, str(guid)), None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._cache.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl": self._cache.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+entity_cache = EntityCache(
+    maxsize=get_settings().entity_cache_maxsize,
+    ttl=get_settings().entity_cache_ttl_seconds
+)
@@ -0,0 +1,27 @@
+from typing import Dict, Optional
+
+# File extension stored for each accepted image type
+IMAGE_EXTENSIONS: Dict[str, str] = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+
+# Bytes needed to recognise every type in IMAGE_EXTENSIONS
+SNIFF_LENGTH = 12
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """
+    MIME type of an image from its leading magic bytes, None when it is not one of IMAGE_EXTENSIONS.
+    The client supplied content type is never trusted for stored uploads.
+    """
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header.startswith(b"GIF87a") or header.startswith(b"GIF89a"):
+        return "image/gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
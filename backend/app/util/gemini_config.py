@@ -1,17 +1,19 @@
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
+from functools import lru_cache
+from typing import Any
+from util.settings import get_settings
 
-load_dotenv()
-
-def init_gemini():
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
+@lru_cache(maxsize=1)
+def get_gemini_model() -> Any:
+    """
+    Shared Gemini model, configured on first use. google.generativeai (and grpc behind it) is imported
+    here rather than at module import, so workers that never call the LLM do not pay for it.
+    """
+    import google.generativeai as genai
+    
+    settings = get_settings()
+    if not settings.google_api_key:
         raise ValueError("GOOGLE_API_KEY missing in .env")
     
-    genai.configure(api_key=api_key)
-    # Using gemini-1.5-flash for speed and efficiency
-    return genai.GenerativeModel('gemini-1.5-flash')
-
-# Initialize the model instance
-model = init_gemini()
\ No newline at end of file
+    genai.configure(api_key=settings.google_api_key)
+    # Using gemini-1.5-flash (MM_GEMINI_MODEL) for speed and efficiency
+    return genai.GenerativeModel(settings.gemini_model_name)
@@ -0,0 +1,168 @@
+import time
+import random
+import asyncio
+import importlib.util
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+from util.settings import get_settings
+
+# HTTP/2 needs the optional h2 package, without it the client stays on HTTP/1.1 keep-alive
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+RETRY_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+class DeadlineExceeded(Exception):
+    """The request could not complete before its deadline, including retries"""
+
+class HostMetrics:
+    """Request counters and a window of recent latencies for one host"""
+    
+    def __init__(self, window: int):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.in_flight = 0
+        self.latencies: Deque[float] = deque(maxlen=window)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        
+        def percentile(fraction: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 1)
+        
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "in_flight": self.in_flight,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(ordered[-1] * 1000, 1) if ordered else None
+        }
+
+class HttpClient:
+    """
+    Shared outbound HTTP client for third-party calls. One pooled httpx.AsyncClient (HTTP/2 when h2 is
+    installed) is created on first use and reused, each host gets a concurrency limit, every request runs
+    against an overall deadline, and transient failures on idempotent requests are retried with jittered
+    exponential backoff inside that deadline.
+    """
+    
+    def __init__(self, max_connections: int, max_per_host: int, default_deadline: float, max_retries: int, metrics_window: int = 500):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.default_deadline = default_deadline
+        self.max_retries = max_retries
+        self.retry_base_seconds = 0.25
+        self._metrics_window = metrics_window
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._metrics: Dict[str, HostMetrics] = {}
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                follow_redirects=True
+            )
+        
+        return self._client
+    
+    def _host_state(self, host: str) -> tuple:
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+            self._metrics[host] = HostMetrics(self._metrics_window)
+        
+        return self._host_limits[host], self._metrics[host]
+    
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        
+        # Full jitter, spreads out retries from concurrent callers
+        return random.uniform(0, self.retry_base_seconds * (2 ** attempt))
+    
+    async def request(self, method: str, url: str, deadline: Optional[float] = None, retries: Optional[int] = None, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request and return the final response; status codes are not raised, callers decide.
+        deadline is the total budget in seconds for all attempts and backoff. Raises DeadlineExceeded
+        when it runs out and httpx errors when the last attempt fails.
+        """
+        method = method.upper()
+        host = urlsplit(url).hostname or ""
+        limit, metrics = self._host_state(host)
+        expires_at = time.monotonic() + (deadline if deadline is not None else self.default_deadline)
+        max_retries = (retries if retries is not None else self.max_retries) if method in IDEMPOTENT_METHODS else 0
+        attempt = 0
+        
+        while True:
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"{method} {url} exceeded its deadline")
+            
+            response: Optional[httpx.Response] = None
+            error: Optional[Exception] = None
+            
+            async with limit:
+                metrics.requests += 1
+                metrics.in_flight += 1
+                started = time.monotonic()
+                try:
+                    response = await self._get_client().request(method, url, timeout=remaining, **kwargs)
+                except (httpx.TimeoutException, httpx.TransportError) as e:
+                    error = e
+                finally:
+                    metrics.in_flight -= 1
+                    metrics.latencies.append(time.monotonic() - started)
+            
+            retryable = error is not None or response.status_code in RETRY_STATUS_CODES
+            if error is not None or response.status_code >= 500:
+                metrics.errors += 1
+            
+            if not retryable:
+                return response
+            
+            delay = self._backoff(attempt, response)
+            if attempt >= max_retries or time.monotonic() + delay >= expires_at:
+                if error is not None:
+                    raise error
+                return response
+            
+            attempt += 1
+            metrics.retries += 1
+            await asyncio.sleep(delay)
+    
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+    
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+    
+    async def aclose(self) -> None:
+        """Close pooled connections, called on application shutdown"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool settings and per-host request metrics"""
+        return {
+            "http2": _HTTP2_AVAILABLE,
+            "max_connections": self.max_connections,
+            "max_per_host": self.max_per_host,
+            "hosts": {host: metrics.snapshot() for host, metrics in self._metrics.items()}
+        }
+
+http_client = HttpClient(
+    max_connections=get_settings().http_max_connections,
+    max_per_host=get_settings().http_max_per_host,
+    default_deadline=get_settings().http_deadline_seconds,
+    max_retries=get_settings().http_max_retries
+)
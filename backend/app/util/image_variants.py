@@ -0,0 +1,80 @@
+import asyncio
+import importlib.util
+import threading
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+from util.settings import get_settings
+
+# Pillow is optional, without it uploads are stored as is and no variants are generated.
+# It is only imported inside the process pool workers.
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+# Longest edge in pixels of each generated variant, keyed by the name clients ask for
+VARIANT_SIZES: Dict[str, int] = {
+    "128": 128,
+    "512": 512,
+}
+ORIGINAL_VARIANT = "original"
+VARIANT_MIME_TYPE = "image/webp"
+VARIANT_EXTENSION = "webp"
+WEBP_QUALITY = 80
+
+def validate_variant(variant: Optional[str]) -> Optional[str]:
+    """None for the original image, otherwise a key of VARIANT_SIZES; raises ValueError for anything else"""
+    if variant is None or variant == ORIGINAL_VARIANT:
+        return None
+    if variant not in VARIANT_SIZES:
+        raise ValueError(f"Unknown image variant '{variant}', expected one of: {', '.join([*VARIANT_SIZES, ORIGINAL_VARIANT])}")
+    return variant
+
+def render_variants(content: bytes) -> Dict[str, dict]:
+    """
+    Downscaled WebP copies of an image, {name: {"content", "width", "height"}}. Sizes at or above the
+    original are skipped. CPU bound, meant to run in the image process pool.
+    """
+    from PIL import Image, ImageOps
+    
+    with Image.open(BytesIO(content)) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        variants = {}
+        
+        for name, size in VARIANT_SIZES.items():
+            if max(image.size) <= size:
+                continue
+            
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+            
+            buffer = BytesIO()
+            resized.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+            variants[name] = {"content": buffer.getvalue(), "width": resized.width, "height": resized.height}
+        
+        return variants
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+def get_image_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool for image work, created on first use (MM_IMAGE_WORKERS processes)"""
+    global _process_pool
+    
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(max_workers=get_settings().image_workers)
+    
+    return _process_pool
+
+def shutdown_image_process_pool() -> None:
+    global _process_pool
+    
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+async def generate_variants(content: bytes) -> Dict[str, dict]:
+    """render_variants in the process pool, so resizing never blocks the event loop or request workers"""
+    return await asyncio.get_running_loop().run_in_executor(get_image_process_pool(), render_variants, content)
@@ -0,0 +1,86 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from cachetools import TTLCache
+
+IndexChange = Callable[[Any], None]
+
+class _PendingLoad:
+    def __init__(self):
+        self.loaders = 0
+        self.changes: List[IndexChange] = []
+
+class IndexRegistry:
+    """
+    In-process indexes loaded on demand and keyed by scope (e.g. a user, or a user and book); the least
+    recently used ones are dropped past maxsize, and every index after ttl seconds, then rebuilt from
+    the database on their next use. Writes go through apply: a change made while an index is being
+    loaded is recorded and replayed onto it in put, so rows written during the scan are not lost.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self._indexes: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._pending: Dict[Hashable, _PendingLoad] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, scope: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._indexes.get(scope)
+    
+    def is_tracked(self, scope: Hashable) -> bool:
+        """Whether writes to this scope matter, i.e. its index is loaded or being loaded"""
+        with self._lock:
+            return scope in self._pending or self._indexes.get(scope) is not None
+    
+    def apply(self, scope: Hashable, change: IndexChange) -> None:
+        """Run change on the scope's loaded index and record it for any load in progress; a no-op otherwise"""
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is not None:
+                change(index)
+            
+            pending = self._pending.get(scope)
+            if pending is not None:
+                pending.changes.append(change)
+    
+    def begin_load(self, scope: Hashable) -> None:
+        """Start recording changes for scope; call before reading its rows, then put or cancel_load"""
+        with self._lock:
+            self._pending.setdefault(scope, _PendingLoad()).loaders += 1
+    
+    def cancel_load(self, scope: Hashable) -> None:
+        with self._lock:
+            self._end_load(scope)
+    
+    def put(self, scope: Hashable, index: Any) -> Any:
+        """Replay the changes recorded since begin_load onto a freshly loaded index and register it"""
+        with self._lock:
+            pending = self._pending.get(scope)
+            # Changes are inserts, replacements and removals by id, so replaying one the scan already saw is harmless
+            for change in pending.changes if pending else []:
+                change(index)
+            self._end_load(scope)
+            
+            # Keep an index another caller loaded meanwhile, it already has the same changes
+            return self._indexes.setdefault(scope, index)
+    
+    def _end_load(self, scope: Hashable) -> None:
+        pending = self._pending.get(scope)
+        if pending is None:
+            return
+        
+        pending.loaders -= 1
+        if pending.loaders <= 0:
+            del self._pending[scope]
+    
+    def discard(self, scope: Hashable) -> None:
+        with self._lock:
+            self._indexes.pop(scope, None)
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "loaded_indexes": len(self._indexes),
+                "loading_indexes": len(self._pending),
+                "maxsize": self._indexes.maxsize,
+                "entries": sum(len(index) for index in self._indexes.values())
+            }
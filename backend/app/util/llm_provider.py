@@ -0,0 +1,59 @@
+import asyncio
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List
+from util.settings import get_settings
+from util.gemini_config import get_gemini_model
+
+# Conversation turns use Gemini's shape: {"role": "user" | "model", "parts": [text]}
+ChatTurn = Dict[str, List[str]]
+
+class LlmProvider(ABC):
+    """A chat model that streams its reply as text fragments"""
+    
+    @abstractmethod
+    def stream(self, contents: List[ChatTurn]) -> AsyncIterator[str]:
+        """The reply to contents as it is generated, implemented as an async generator"""
+
+class GeminiLlmProvider(LlmProvider):
+    async def stream(self, contents: List[ChatTurn]) -> AsyncIterator[str]:
+        response = await get_gemini_model().generate_content_async(contents, stream=True)
+        
+        async for chunk in response:
+            # Chunks held back by safety filters carry no text
+            try:
+                text = chunk.text
+            except ValueError:
+                continue
+            if text:
+                yield text
+
+class FakeLlmProvider(LlmProvider):
+    """
+    Deterministic local model for development and tests (MM_LLM_PROVIDER=fake): replies by echoing
+    the last user message word by word, without network access or an API key
+    """
+    
+    def __init__(self, delay_seconds: float = 0.0):
+        self.delay_seconds = delay_seconds
+    
+    async def stream(self, contents: List[ChatTurn]) -> AsyncIterator[str]:
+        last_user_text = next((turn["parts"][-1] for turn in reversed(contents) if turn["role"] == "user"), "")
+        reply = f"You said ({len(contents)} turns): {last_user_text}"
+        
+        for index, word in enumerate(reply.split(" ")):
+            if self.delay_seconds:
+                await asyncio.sleep(self.delay_seconds)
+            yield word if index == 0 else f" {word}"
+
+@lru_cache(maxsize=1)
+def get_llm_provider() -> LlmProvider:
+    """Process wide chat model, MM_LLM_PROVIDER selects gemini (default) or fake"""
+    provider = get_settings().llm_provider
+    
+    if provider == "gemini":
+        return GeminiLlmProvider()
+    if provider == "fake":
+        return FakeLlmProvider()
+    
+    raise ValueError(f"Unknown MM_LLM_PROVIDER '{provider}'")
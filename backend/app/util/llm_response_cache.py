@@ -0,0 +1,117 @@
+import re
+import threading
+from typing import Any, Dict, FrozenSet, Optional, Set
+from cachetools import TTLCache
+from util.settings import get_settings
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+# Words a near duplicate may add or drop. Anything else (a negation, a name, a number, a question
+# word) can change what is being asked, so a prompt differing in it is a miss.
+FILLER_WORDS = frozenset("""
+a an the please kindly can could would you me tell just
+""".split())
+
+def normalize_prompt(prompt: str) -> str:
+    """Lower-cased prompt without punctuation and with whitespace collapsed, the exact match key"""
+    return _WHITESPACE.sub(" ", _NON_WORD.sub(" ", prompt.lower())).strip()
+
+class LlmResponseCache:
+    """
+    In-process cache of model replies keyed by (scope, context hash, normalized prompt). The scope is the
+    notebook the reply was grounded in and the context hash covers that notebook's text, so an edited
+    notebook never serves an old answer. TTLCache bounds the size (least recently used first) and age.
+    A miss falls back to the most similar cached prompt for the same scope and context when their word
+    sets overlap by at least similarity_threshold (Jaccard) and differ only in FILLER_WORDS.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float, similarity_threshold: float):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._scope_keys: Dict[str, Set[tuple]] = {}
+        self._lock = threading.Lock()
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def _words(normalized: str) -> FrozenSet[str]:
+        return frozenset(normalized.split())
+    
+    def get(self, scope: str, context_hash: str, prompt: str) -> Optional[str]:
+        """Cached reply for this prompt (or a near duplicate of it), None on a miss"""
+        normalized = normalize_prompt(prompt)
+        
+        with self._lock:
+            entry = self._cache.get((scope, context_hash, normalized))
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            
+            words = self._words(normalized)
+            best_reply, best_score = None, 0.0
+            
+            for key in list(self._scope_keys.get(scope, ())):
+                candidate = self._cache.get(key)
+                if candidate is None:
+                    # Expired or evicted
+                    self._scope_keys[scope].discard(key)
+                    continue
+                if key[1] != context_hash:
+                    continue
+                
+                reply, candidate_words = candidate
+                if not words or not (words ^ candidate_words) <= FILLER_WORDS:
+                    continue
+                
+                score = len(words & candidate_words) / len(words | candidate_words)
+                if score >= self.similarity_threshold and score > best_score:
+                    best_reply, best_score = reply, score
+            
+            if best_reply is not None:
+                self.near_hits += 1
+            else:
+                self.misses += 1
+            
+            return best_reply
+    
+    def set(self, scope: str, context_hash: str, prompt: str, reply: str) -> None:
+        normalized = normalize_prompt(prompt)
+        key = (scope, context_hash, normalized)
+        
+        with self._lock:
+            self._cache[key] = (reply, self._words(normalized))
+            self._scope_keys.setdefault(scope, set()).add(key)
+    
+    def invalidate_scope(self, scope: Any) -> None:
+        """Drop every reply grounded in this scope, called when its notebook content changes"""
+        scope = str(scope)
+        
+        with self._lock:
+            keys = self._scope_keys.pop(scope, set())
+            for key in keys:
+                self._cache.pop(key, None)
+            self.invalidations += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl": self._cache.ttl,
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0
+            }
+
+llm_response_cache = LlmResponseCache(
+    maxsize=get_settings().llm_cache_maxsize,
+    ttl=get_settings().llm_cache_ttl_seconds,
+    similarity_threshold=get_settings().llm_cache_similarity
+)
@@ -0,0 +1,97 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+from dotenv import load_dotenv
+
+def _env(name: str, default: Optional[str] = None) -> Optional[str]:
+    value = os.environ.get(name)
+    return value if value not in (None, "") else default
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Every environment setting the backend reads, loaded once from the process environment and .env.
+    Missing credentials are not an error here; the client that needs them raises on first use, so a
+    worker that never talks to a service starts without its keys.
+    """
+    # Supabase
+    supabase_project_url: Optional[str]
+    supabase_anon_key: Optional[str]
+    supabase_service_role_key: Optional[str]
+    supabase_storage_bucket: Optional[str]
+    supabase_storage_folder: Optional[str]
+    supabase_storage_folder_notebook_content: Optional[str]
+    repository_backend: str
+    
+    # Google
+    google_api_key: Optional[str]
+    gemini_model_name: str
+    llm_provider: str
+    llm_cache_maxsize: int
+    llm_cache_ttl_seconds: float
+    llm_cache_similarity: float
+    embedding_provider: str
+    embedding_model_name: str
+    vector_index_max_loaded: int
+    search_index_max_loaded: int
+    index_ttl_seconds: float
+    google_books_api_key: Optional[str]
+    google_books_cache_path: str
+    google_books_cache_ttl_seconds: float
+    google_books_negative_cache_ttl_seconds: float
+    
+    # Caching, outbound HTTP and background work
+    entity_cache_maxsize: int
+    entity_cache_ttl_seconds: float
+    http_max_connections: int
+    http_max_per_host: int
+    http_deadline_seconds: float
+    http_max_retries: int
+    job_workers: int
+    job_poll_interval_seconds: float
+    image_workers: int
+    upload_max_bytes: int
+    
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            supabase_project_url=_env("SUPABASE_PROJECT_URL"),
+            supabase_anon_key=_env("SUPABASE_ANON_KEY"),
+            supabase_service_role_key=_env("SUPABASE_SERVICE_ROLE_KEY"),
+            supabase_storage_bucket=_env("SUPABASE_STORAGE_BUCKET"),
+            supabase_storage_folder=_env("SUPABASE_STORAGE_FOLDER"),
+            supabase_storage_folder_notebook_content=_env("SUPABASE_STORAGE_FOLDER_NOTEBOOK_CONTENT"),
+            repository_backend=_env("MM_REPOSITORY_BACKEND", "supabase").lower(),
+            google_api_key=_env("GOOGLE_API_KEY"),
+            gemini_model_name=_env("MM_GEMINI_MODEL", "gemini-1.5-flash"),
+            llm_provider=_env("MM_LLM_PROVIDER", "gemini").lower(),
+            llm_cache_maxsize=int(_env("MM_LLM_CACHE_MAXSIZE", "2000")),
+            llm_cache_ttl_seconds=float(_env("MM_LLM_CACHE_TTL_SECONDS", str(24 * 3600))),
+            llm_cache_similarity=float(_env("MM_LLM_CACHE_SIMILARITY", "0.9")),
+            embedding_provider=_env("MM_EMBEDDING_PROVIDER", "gemini").lower(),
+            embedding_model_name=_env("MM_EMBEDDING_MODEL", "models/text-embedding-004"),
+            vector_index_max_loaded=int(_env("MM_VECTOR_INDEX_MAX_LOADED", "64")),
+            search_index_max_loaded=int(_env("MM_SEARCH_INDEX_MAX_LOADED", "256")),
+            index_ttl_seconds=float(_env("MM_INDEX_TTL_SECONDS", "1800")),
+            google_books_api_key=_env("GOOGLE_BOOKS_API_KEY"),
+            google_books_cache_path=_env("MM_GOOGLE_BOOKS_CACHE_PATH", os.path.join(".cache", "google_books.sqlite3")),
+            google_books_cache_ttl_seconds=float(_env("MM_GOOGLE_BOOKS_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+            google_books_negative_cache_ttl_seconds=float(_env("MM_GOOGLE_BOOKS_NEGATIVE_CACHE_TTL_SECONDS", "3600")),
+            entity_cache_maxsize=int(_env("MM_ENTITY_CACHE_MAXSIZE", "10000")),
+            entity_cache_ttl_seconds=float(_env("MM_ENTITY_CACHE_TTL_SECONDS", "300")),
+            http_max_connections=int(_env("MM_HTTP_MAX_CONNECTIONS", "50")),
+            http_max_per_host=int(_env("MM_HTTP_MAX_PER_HOST", "8")),
+            http_deadline_seconds=float(_env("MM_HTTP_DEADLINE_SECONDS", "10")),
+            http_max_retries=int(_env("MM_HTTP_MAX_RETRIES", "2")),
+            job_workers=int(_env("MM_JOB_WORKERS", "2")),
+            job_poll_interval_seconds=float(_env("MM_JOB_POLL_INTERVAL_SECONDS", "2")),
+            image_workers=int(_env("MM_IMAGE_WORKERS", "2")),
+            upload_max_bytes=int(_env("MM_UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+        )
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Process wide settings; .env is read here and nowhere else"""
+    load_dotenv()
+    return Settings.from_env()
@@ -0,0 +1,58 @@
+from typing import Any, Dict, Iterable, Mapping, Optional
+from urllib.parse import quote
+from util.settings import get_settings
+
+def _storage_public_base() -> str:
+    url = get_settings().supabase_project_url
+    
+    if not url:
+        raise ValueError("Supabase credentials missing in .env")
+    
+    return f"{url.rstrip('/')}/storage/v1/object/public"
+
+def _object_url(base: str, bucket_name: str, storage_path: str) -> str:
+    return f"{base}/{quote(bucket_name, safe='')}/{quote(storage_path.lstrip('/'), safe='/')}"
+
+def build_public_url(bucket_name: str, storage_path: str) -> str:
+    """
+    Public URL of an object in a public bucket, the same URL storage.from_(bucket).get_public_url(path)
+    returns, computed locally from the project URL without creating a storage client
+    """
+    return _object_url(_storage_public_base(), bucket_name, storage_path)
+
+def _field(record: Any, name: str) -> Any:
+    if isinstance(record, Mapping):
+        return record.get(name)
+    return getattr(record, name, None)
+
+def build_public_urls(file_records: Iterable[Any], variant: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """
+    Map file upload guid -> public URL for a list of app_mm_file_upload rows (dicts or response models).
+    A URL denormalized into the row at write time is used as is, otherwise it is built locally.
+    With a variant name the sized copy recorded in metadata["variants"] is preferred, falling back to
+    the original while it has not been generated.
+    """
+    base = None
+    urls: Dict[str, Optional[str]] = {}
+    
+    for record in file_records:
+        guid = str(_field(record, "guid"))
+        public_url = None
+        
+        if variant:
+            variants = (_field(record, "metadata") or {}).get("variants") or {}
+            public_url = (variants.get(variant) or {}).get("public_url")
+        
+        public_url = public_url or _field(record, "public_url")
+        
+        if not public_url:
+            bucket_name = _field(record, "bucket_name")
+            storage_path = _field(record, "storage_path")
+            
+            if bucket_name and storage_path:
+                base = base or _storage_public_base()
+                public_url = _object_url(base, bucket_name, storage_path)
+        
+        urls[guid] = public_url
+    
+    return urls
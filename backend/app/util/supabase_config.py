@@ -1,29 +1,66 @@
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import asyncio
+from typing import TYPE_CHECKING, Optional, Tuple
+from util.settings import get_settings
 
-load_dotenv()
+# supabase pulls in postgrest, storage, realtime and auth clients; it is imported on first use, not at startup
+if TYPE_CHECKING:
+    from supabase import Client, AsyncClient
 
-def get_supabase_client() -> Client:
-    """Get Supabase client with anon key (for client-side operations)"""
-    url = os.environ.get("SUPABASE_PROJECT_URL")
-    key = os.environ.get("SUPABASE_ANON_KEY")
+def _anon_credentials() -> Tuple[str, str]:
+    settings = get_settings()
     
-    if not url or not key:
+    if not settings.supabase_project_url or not settings.supabase_anon_key:
         raise ValueError("Supabase credentials missing in .env")
-        
-    return create_client(url, key)
+    
+    return settings.supabase_project_url, settings.supabase_anon_key
 
-def get_supabase_admin_client() -> Client:
-    """Get Supabase client with service role key (bypasses RLS for backend operations)"""
-    url = os.environ.get("SUPABASE_PROJECT_URL")
-    service_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+def _service_role_credentials() -> Tuple[str, str]:
+    settings = get_settings()
     
-    if not url or not service_key:
+    if not settings.supabase_project_url or not settings.supabase_service_role_key:
         raise ValueError("Supabase service role credentials missing in .env")
-        
-    return create_client(url, service_key)
+    
+    return settings.supabase_project_url, settings.supabase_service_role_key
+
+def get_supabase_client() -> "Client":
+    """Get Supabase client with anon key (for client-side operations)"""
+    from supabase import create_client
+    
+    return create_client(*_anon_credentials())
+
+def get_supabase_admin_client() -> "Client":
+    """Get Supabase client with service role key (bypasses RLS for backend operations)"""
+    from supabase import create_client
+    
+    return create_client(*_service_role_credentials())
+
+# Async clients are created on first use inside the event loop and reused afterwards
+_async_supabase: Optional["AsyncClient"] = None
+_async_supabase_admin: Optional["AsyncClient"] = None
+_async_client_lock = asyncio.Lock()
+
+async def get_async_supabase() -> "AsyncClient":
+    """Get shared async Supabase client with anon key (PostgREST and Storage calls)"""
+    global _async_supabase
+    
+    if _async_supabase is None:
+        async with _async_client_lock:
+            if _async_supabase is None:
+                from supabase import acreate_client
+                
+                _async_supabase = await acreate_client(*_anon_credentials())
+    
+    return _async_supabase
 
-# Initialize singleton instances
-supabase = get_supabase_client()
-supabase_admin = get_supabase_admin_client()
\ No newline at end of file
+async def get_async_supabase_admin() -> "AsyncClient":
+    """Get shared async Supabase client with service role key (bypasses RLS for backend operations)"""
+    global _async_supabase_admin
+    
+    if _async_supabase_admin is None:
+        async with _async_client_lock:
+            if _async_supabase_admin is None:
+                from supabase import acreate_client
+                
+                _async_supabase_admin = await acreate_client(*_service_role_credentials())
+    
+    return _async_supabase_admin
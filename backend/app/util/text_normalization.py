@@ -0,0 +1,13 @@
+import re
+from typing import Optional
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_book_name(book_name: Optional[str]) -> Optional[str]:
+    """
+    Lower-cased, trimmed title with runs of whitespace collapsed, the Python twin of the
+    app_mm_library_hdr.book_name_normalized generated column
+    """
+    if book_name is None:
+        return None
+    return _WHITESPACE.sub(" ", book_name).strip().lower()
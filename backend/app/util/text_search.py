@@ -0,0 +1,159 @@
+import re
+import math
+import html
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_WORD = re.compile(r"\w+")
+
+# Words too common to say anything about a note, dropped from documents and queries alike
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have he her his i in is it its me my of on or our she so
+that the their them they this to was we were what when which who will with you your
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    return [word for word in _WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+class TextSearchIndex:
+    """
+    Inverted index ranked with Okapi BM25. Each document keeps its term frequencies so it can be
+    replaced or removed without a rebuild, plus a dict of fields that searches can filter on.
+    A query only visits the postings of its own terms, so its cost follows how many documents
+    contain those words rather than the size of the index.
+    """
+    K1 = 1.2
+    B = 0.75
+    
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._terms: Dict[str, Counter] = {}
+        self._lengths: Dict[str, int] = {}
+        self._fields: Dict[str, Dict[str, Any]] = {}
+        self._total_length = 0
+    
+    def __len__(self) -> int:
+        return len(self._lengths)
+    
+    def add(self, doc_id: str, text: str, fields: Optional[Dict[str, Any]] = None) -> None:
+        """Insert or replace a document"""
+        self.remove(doc_id)
+        
+        terms = Counter(tokenize(text or ""))
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+        
+        length = sum(terms.values())
+        self._terms[doc_id] = terms
+        self._lengths[doc_id] = length
+        self._fields[doc_id] = fields or {}
+        self._total_length += length
+    
+    def remove(self, doc_id: str) -> bool:
+        terms = self._terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        
+        self._total_length -= self._lengths.pop(doc_id)
+        self._fields.pop(doc_id, None)
+        return True
+    
+    def remove_where(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """Remove every document whose fields match predicate, e.g. the children of a deleted parent"""
+        doc_ids = [doc_id for doc_id, fields in self._fields.items() if predicate(fields)]
+        for doc_id in doc_ids:
+            self.remove(doc_id)
+        return len(doc_ids)
+    
+    def fields(self, doc_id: str) -> Dict[str, Any]:
+        return self._fields.get(doc_id, {})
+    
+    def update_fields(self, predicate: Callable[[Dict[str, Any]], bool], changes: Dict[str, Any]) -> None:
+        """Apply changes to the fields of every document matching predicate, e.g. after its parent moved"""
+        for fields in self._fields.values():
+            if predicate(fields):
+                fields.update(changes)
+    
+    def search(self, query: str, filters: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """
+        Every document containing at least one query term and matching filters (field equals value, or
+        is in the value when it is a list/set), as (doc_id, score) best first, ties broken by doc_id
+        """
+        query_terms = set(tokenize(query or ""))
+        count = len(self._lengths)
+        if not query_terms or count == 0:
+            return []
+        
+        average_length = self._total_length / count or 1
+        scores: Dict[str, float] = {}
+        
+        for term in query_terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self.K1 * (1 - self.B + self.B * self._lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.K1 + 1) / (frequency + norm)
+        
+        if filters:
+            scores = {doc_id: score for doc_id, score in scores.items() if self._matches(doc_id, filters)}
+        
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    
+    def _matches(self, doc_id: str, filters: Dict[str, Any]) -> bool:
+        fields = self._fields[doc_id]
+        
+        for name, wanted in filters.items():
+            if wanted is None:
+                continue
+            if isinstance(wanted, (list, set, tuple, frozenset)):
+                if fields.get(name) not in wanted:
+                    return False
+            elif fields.get(name) != wanted:
+                return False
+        
+        return True
+
+def snippet(text: str, query: str, width: int = 160) -> str:
+    """
+    The window of text around the first query term, HTML escaped, with every query term wrapped in
+    <mark>; the start of the text when no term occurs
+    """
+    text = text or ""
+    query_terms = set(tokenize(query or ""))
+    matches = [match for match in _WORD.finditer(text) if match.group().lower() in query_terms]
+    
+    start = 0
+    if matches:
+        # Some lead-in before the first hit, moved forward to a word boundary
+        start = max(0, matches[0].start() - width // 4)
+        if start > 0:
+            boundary = text.find(" ", start)
+            start = boundary + 1 if 0 <= boundary < matches[0].start() else matches[0].start()
+    end = min(len(text), start + width)
+    if end < len(text):
+        boundary = text.rfind(" ", start, end)
+        end = boundary if boundary > start else end
+    
+    parts: List[str] = ["…" if start > 0 else ""]
+    position = start
+    for match in matches:
+        if match.start() < start:
+            continue
+        if match.end() > end:
+            break
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    parts.append("…" if end < len(text) else "")
+    
+    return "".join(parts)
@@ -0,0 +1,80 @@
+import re
+from typing import Dict, Hashable, List, Set, Tuple
+
+_WORD = re.compile(r"[^\W_]+")
+
+def trigrams(text: str) -> Set[str]:
+    """
+    The trigram set pg_trgm extracts: lower-cased alphanumeric words, each padded with two spaces in
+    front and one behind, so "Deep" gives "  d", " de", "dee", "eep", "ep "
+    """
+    grams: Set[str] = set()
+    
+    for word in _WORD.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    
+    return grams
+
+def similarity(query: str, text: str) -> float:
+    """pg_trgm similarity(): shared trigrams over all trigrams of both strings"""
+    query_grams, text_grams = trigrams(query), trigrams(text)
+    union = len(query_grams | text_grams)
+    return len(query_grams & text_grams) / union if union else 0.0
+
+def word_similarity(query: str, text: str) -> float:
+    """pg_trgm word_similarity(): how much of the query's trigrams occur in text, so a short query can match inside a long title"""
+    query_grams = trigrams(query)
+    return len(query_grams & trigrams(text)) / len(query_grams) if query_grams else 0.0
+
+class TrigramIndex:
+    """
+    Trigram to item postings, the in-process counterpart of a pg_trgm GIN index. A search only scores
+    items sharing at least one trigram with the query and ranks them like the SQL function does:
+    word_similarity, then similarity, both descending.
+    """
+    
+    def __init__(self):
+        self._postings: Dict[str, Set[Hashable]] = {}
+        self._texts: Dict[Hashable, str] = {}
+    
+    def __len__(self) -> int:
+        return len(self._texts)
+    
+    def add(self, item_id: Hashable, text: str) -> None:
+        self.remove(item_id)
+        self._texts[item_id] = text or ""
+        for gram in trigrams(text):
+            self._postings.setdefault(gram, set()).add(item_id)
+    
+    def remove(self, item_id: Hashable) -> None:
+        text = self._texts.pop(item_id, None)
+        if text is None:
+            return
+        
+        for gram in trigrams(text):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(item_id)
+                if not postings:
+                    del self._postings[gram]
+    
+    def search(self, query: str, min_similarity: float, limit: int) -> List[Tuple[Hashable, float, float]]:
+        """(item_id, word_similarity, similarity) of the items whose word_similarity reaches min_similarity, best first"""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        
+        shared: Dict[Hashable, int] = {}
+        for gram in query_grams:
+            for item_id in self._postings.get(gram, ()):
+                shared[item_id] = shared.get(item_id, 0) + 1
+        
+        results = []
+        for item_id, count in shared.items():
+            score = count / len(query_grams)
+            if score >= min_similarity:
+                results.append((item_id, score, similarity(query, self._texts[item_id])))
+        
+        results.sort(key=lambda result: (-result[1], -result[2], str(result[0])))
+        return results[:limit]
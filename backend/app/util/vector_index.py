@@ -0,0 +1,83 @@
+import threading
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+class VectorIndex:
+    """
+    Exact nearest-neighbour index over unit-normalized float32 vectors held in one NumPy matrix.
+    Cosine similarity is a single matrix-vector product and top-k an argpartition, which keeps a search
+    over 100k vectors in the low milliseconds. Rows are added in place (the matrix grows by doubling)
+    and removed by moving the last row into the hole, so updates never rebuild the matrix.
+    """
+    
+    def __init__(self, dimension: int, capacity: int = 64):
+        self.dimension = dimension
+        self._matrix = np.zeros((capacity, dimension), dtype=np.float32)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+    
+    def add(self, item_id: str, vector: Sequence[float]) -> None:
+        """Insert or replace the vector for item_id"""
+        self.add_many([item_id], [vector])
+    
+    def add_many(self, item_ids: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        if not item_ids:
+            return
+        
+        normalized = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(len(item_ids), self.dimension))
+        
+        with self._lock:
+            for item_id, vector in zip(item_ids, normalized):
+                row = self._rows.get(item_id)
+                
+                if row is None:
+                    row = len(self._ids)
+                    if row == self._matrix.shape[0]:
+                        grown = np.zeros((max(1, row) * 2, self.dimension), dtype=np.float32)
+                        grown[:row] = self._matrix[:row]
+                        self._matrix = grown
+                    self._ids.append(item_id)
+                    self._rows[item_id] = row
+                
+                self._matrix[row] = vector
+    
+    def remove(self, item_id: str) -> bool:
+        with self._lock:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                return False
+            
+            last = len(self._ids) - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = moved_id
+                self._rows[moved_id] = row
+            
+            self._ids.pop()
+            return True
+    
+    def search(self, vector: Sequence[float], k: int) -> List[Tuple[str, float]]:
+        """Top k (item_id, cosine similarity), best first"""
+        query = self._normalize(np.asarray(vector, dtype=np.float32).reshape(self.dimension))
+        
+        with self._lock:
+            count = len(self._ids)
+            if count == 0 or k <= 0:
+                return []
+            
+            scores = self._matrix[:count] @ query
+            k = min(k, count)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            
+            return [(self._ids[row], float(scores[row])) for row in top]
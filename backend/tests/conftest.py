@@ -0,0 +1,21 @@
+import os
+import sys
+from pathlib import Path
+
+# The app imports its modules from backend/app, and runs offline on the memory repository and fake models
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+os.environ["MM_REPOSITORY_BACKEND"] = "memory"
+os.environ["MM_LLM_PROVIDER"] = "fake"
+os.environ["MM_EMBEDDING_PROVIDER"] = "fake"
+
+import pytest
+from service.repository.memory_repository import MemoryRepository
+from service.repository.repository_provider import set_repository
+
+@pytest.fixture
+def repository():
+    """A fresh memory repository installed as the process wide repository for one test"""
+    repository = MemoryRepository()
+    set_repository(repository)
+    yield repository
+    set_repository(None)
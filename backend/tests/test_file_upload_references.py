@@ -0,0 +1,184 @@
+import asyncio
+from uuid import uuid4
+import pytest
+from service.library.app_mm_library_hdr_service import AppMmLibraryHdrService
+from service.library.book_search_service import BookSearchService
+from service.library.app_mm_book_catalog_service import AppMmBookCatalogService
+from model.library.app_mm_library_hdr import AppMmLibraryHdrUpdate
+from service.file import app_mm_file_upload_service
+from service.file.app_mm_file_upload_service import AppMmFileUploadService
+from service.file import file_store_service
+from service.file.file_store_service import FileStoreService
+
+BUCKET_NAME = "covers"
+CONTENT_HASH = "a" * 64
+
+def seed_cover(repository, user_guid, ref_count):
+    guid = str(uuid4())
+    repository.seed("app_mm_file_upload", [{
+        "guid": guid,
+        "user_guid": user_guid,
+        "file_name": f"{CONTENT_HASH}.jpg",
+        "mime_type": "image/jpeg",
+        "storage_path": f"books/{CONTENT_HASH}.jpg",
+        "bucket_name": BUCKET_NAME,
+        "is_public": True,
+        "content_hash": CONTENT_HASH,
+        "ref_count": ref_count
+    }])
+    return guid
+
+def file_rows(repository):
+    return {row["guid"]: row for row in repository.rows("app_mm_file_upload")}
+
+def removals_of_referenced_objects(repository):
+    """For each queued object removal, whether a row still points at the object (so the remover keeps it)"""
+    paths = {row["storage_path"] for row in repository.rows("app_mm_file_upload")}
+    return [job["payload"]["storage_path"] in paths for job in repository.rows("app_mm_job") if job["job_type"] == AppMmFileUploadService.REMOVE_OBJECT_JOB_TYPE]
+
+def test_reused_catalog_cover_survives_both_users_deleting_their_books(repository, monkeypatch):
+    user_a, user_b = str(uuid4()), str(uuid4())
+    # User A's library record and the catalog each hold a reference on A's cover row
+    cover_guid = seed_cover(repository, user_a, 2)
+    catalog_guid = str(uuid4())
+    repository.seed("app_mm_book_catalog", [{"guid": catalog_guid, "volume_id": "vol-1", "title": "Deep Work", "cover_file_guid": cover_guid}])
+    library_a = str(uuid4())
+    repository.seed("app_mm_library_hdr", [{"guid": library_a, "user_guid": user_a, "book_name": "Deep Work", "file_guid": cover_guid, "catalog_guid": catalog_guid}])
+    
+    async def google_books(book_name):
+        return {"title": "Deep Work", "volume_id": "vol-1", "cover_url": "https://books.example/cover.jpg"}
+    
+    monkeypatch.setattr(BookSearchService, "_search_google_books", google_books)
+    
+    result = asyncio.run(BookSearchService.search_book("deep work", user_b))
+    
+    # User B gets a row of their own on the same object, and no cover download is queued
+    rows = file_rows(repository)
+    assert result.file_guid is not None and str(result.file_guid) != cover_guid
+    assert rows[str(result.file_guid)]["user_guid"] == user_b
+    assert rows[str(result.file_guid)]["storage_path"] == rows[cover_guid]["storage_path"]
+    assert rows[cover_guid]["ref_count"] == 2
+    assert result.cover_job_guid is None
+    
+    assert asyncio.run(AppMmLibraryHdrService.delete_library_hdr(result.guid))
+    assert asyncio.run(AppMmLibraryHdrService.delete_library_hdr(library_a))
+    
+    # Only the catalog's reference is left, and the object it points at is never removed
+    rows = file_rows(repository)
+    assert list(rows) == [cover_guid]
+    assert rows[cover_guid]["ref_count"] == 1
+    assert all(removals_of_referenced_objects(repository))
+
+class FakeBucket:
+    def __init__(self, objects):
+        self.objects = objects
+    
+    async def upload(self, path, content, options):
+        self.objects[path] = content
+    
+    async def remove(self, paths):
+        for path in paths:
+            self.objects.pop(path, None)
+
+class FakeStorage:
+    def __init__(self):
+        self.objects = {}
+    
+    def from_(self, bucket_name):
+        return FakeBucket(self.objects)
+
+class FakeSupabase:
+    def __init__(self):
+        self.storage = FakeStorage()
+
+def test_bytes_stored_again_after_release_do_not_share_the_removed_object(repository, monkeypatch):
+    supabase = FakeSupabase()
+    
+    async def get_supabase_admin():
+        return supabase
+    
+    monkeypatch.setattr(file_store_service, "get_async_supabase_admin", get_supabase_admin)
+    monkeypatch.setattr(app_mm_file_upload_service, "build_public_url", lambda bucket_name, storage_path: f"https://storage.example/{bucket_name}/{storage_path}")
+    user_guid = uuid4()
+    content = b"cover bytes"
+    
+    first = asyncio.run(FileStoreService.store(content, user_guid, BUCKET_NAME, "books", "jpg", "image/jpeg"))
+    assert asyncio.run(AppMmFileUploadService.delete_file_upload(first.guid))
+    
+    # The removal of the first object is still queued when the same bytes come back
+    second = asyncio.run(FileStoreService.store(content, user_guid, BUCKET_NAME, "books", "jpg", "image/jpeg"))
+    assert second.storage_path != first.storage_path
+    
+    assert asyncio.run(FileStoreService.remove_object(BUCKET_NAME, first.storage_path, []))
+    assert not asyncio.run(FileStoreService.remove_object(BUCKET_NAME, second.storage_path, []))
+    assert list(supabase.storage.objects) == [second.storage_path]
+
+def seed_cover_job(repository, monkeypatch):
+    """A catalog entry without a cover, and a fetch_cover that stores a new cover row for each call"""
+    catalog_guid = str(uuid4())
+    repository.seed("app_mm_book_catalog", [{"guid": catalog_guid, "volume_id": "vol-2", "title": "Digital Minimalism"}])
+    catalog = asyncio.run(AppMmBookCatalogService.get_catalog_by_id(catalog_guid))
+    
+    async def catalog_as_first_read(catalog_id):
+        return catalog
+    
+    async def download_and_store_cover(cover_url, book_name, user_guid):
+        return seed_cover(repository, str(user_guid), 1)
+    
+    # Every job sees the catalog without a cover, as concurrent jobs would
+    monkeypatch.setattr(AppMmBookCatalogService, "get_catalog_by_id", catalog_as_first_read)
+    monkeypatch.setattr(BookSearchService, "_download_and_store_cover", download_and_store_cover)
+    return catalog_guid
+
+def cover_payload(repository, catalog_guid):
+    user_guid = str(uuid4())
+    library_guid = str(uuid4())
+    repository.seed("app_mm_library_hdr", [{"guid": library_guid, "user_guid": user_guid, "book_name": "Digital Minimalism", "book_desc": None, "file_guid": None, "catalog_guid": catalog_guid}])
+    return {"library_hdr_guid": library_guid, "catalog_guid": catalog_guid, "cover_url": "https://books.example/cover.jpg", "book_name": "Digital Minimalism", "user_guid": user_guid}
+
+def test_concurrent_cover_jobs_give_the_catalog_one_reference(repository, monkeypatch):
+    catalog_guid = seed_cover_job(repository, monkeypatch)
+    first = asyncio.run(BookSearchService.fetch_cover(cover_payload(repository, catalog_guid)))
+    second = asyncio.run(BookSearchService.fetch_cover(cover_payload(repository, catalog_guid)))
+    
+    rows = file_rows(repository)
+    catalog = repository.rows("app_mm_book_catalog")[0]
+    assert catalog["cover_file_guid"] == first["file_guid"]
+    assert rows[first["file_guid"]]["ref_count"] == 2
+    assert rows[second["file_guid"]]["ref_count"] == 1
+
+def test_failed_library_patch_releases_the_cover_reference(repository, monkeypatch):
+    catalog_guid = seed_cover_job(repository, monkeypatch)
+    payload = cover_payload(repository, catalog_guid)
+    
+    async def failing_update(library_hdr_id, library_hdr_data):
+        raise Exception("Failed to update library header")
+    
+    monkeypatch.setattr(AppMmLibraryHdrService, "update_library_hdr", failing_update)
+    
+    with pytest.raises(Exception, match="Failed to update library header"):
+        asyncio.run(BookSearchService.fetch_cover(payload))
+    
+    # Only the catalog's reference is left on the stored cover
+    rows = list(file_rows(repository).values())
+    assert len(rows) == 1 and rows[0]["ref_count"] == 1
+
+def test_changing_a_records_file_moves_its_reference(repository):
+    user_guid = str(uuid4())
+    old_cover, new_cover = seed_cover(repository, user_guid, 1), str(uuid4())
+    repository.seed("app_mm_file_upload", [{**file_rows(repository)[old_cover], "guid": new_cover, "content_hash": "b" * 64, "storage_path": "books/other.jpg"}])
+    library_guid = str(uuid4())
+    repository.seed("app_mm_library_hdr", [{"guid": library_guid, "user_guid": user_guid, "book_name": "Deep Work", "book_desc": None, "file_guid": old_cover}])
+    
+    updated = asyncio.run(AppMmLibraryHdrService.update_library_hdr(library_guid, AppMmLibraryHdrUpdate(file_guid=new_cover)))
+    
+    rows = file_rows(repository)
+    assert str(updated.file_guid) == new_cover
+    assert old_cover not in rows
+    assert rows[new_cover]["ref_count"] == 2
+    
+    # An unknown file leaves the record and its reference alone
+    with pytest.raises(ValueError, match="File upload not found"):
+        asyncio.run(AppMmLibraryHdrService.update_library_hdr(library_guid, AppMmLibraryHdrUpdate(file_guid=uuid4())))
+    assert file_rows(repository)[new_cover]["ref_count"] == 2
+    assert repository.rows("app_mm_library_hdr")[0]["file_guid"] == new_cover
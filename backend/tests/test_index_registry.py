@@ -0,0 +1,42 @@
+import time
+from util.index_registry import IndexRegistry
+from util.text_search import TextSearchIndex
+
+def test_changes_during_a_load_are_replayed_onto_the_loaded_index():
+    registry = IndexRegistry(maxsize=8, ttl=60)
+    registry.begin_load("user")
+    
+    # The scan saw only "a"; "b" was written and "a" deleted while it ran
+    loaded = TextSearchIndex()
+    loaded.add("a", "deep work")
+    assert registry.is_tracked("user")
+    registry.apply("user", lambda index: index.add("b", "shallow work"))
+    registry.apply("user", lambda index: index.remove("a"))
+    
+    index = registry.put("user", loaded)
+    
+    assert registry.get("user") is index
+    assert [doc_id for doc_id, _ in index.search("work")] == ["b"]
+    assert registry.stats()["loading_indexes"] == 0
+
+def test_changes_to_an_untracked_scope_are_dropped():
+    registry = IndexRegistry(maxsize=8, ttl=60)
+    registry.apply("user", lambda index: index.add("a", "deep work"))
+    
+    assert not registry.is_tracked("user")
+    assert registry.put("user", TextSearchIndex()).search("work") == []
+
+def test_cancelled_load_stops_recording():
+    registry = IndexRegistry(maxsize=8, ttl=60)
+    registry.begin_load("user")
+    registry.cancel_load("user")
+    
+    assert not registry.is_tracked("user")
+
+def test_loaded_index_expires_after_ttl():
+    registry = IndexRegistry(maxsize=8, ttl=0.01)
+    registry.put("user", TextSearchIndex())
+    
+    time.sleep(0.02)
+    
+    assert registry.get("user") is None
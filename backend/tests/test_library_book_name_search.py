@@ -0,0 +1,49 @@
+import asyncio
+from uuid import uuid4
+import pytest
+from service.library.app_mm_library_hdr_service import AppMmLibraryHdrService
+from service.repository.keyset_pagination import encode_cursor
+
+TABLE_NAME = "app_mm_library_hdr"
+
+def search(repository, user_guid, query):
+    response = asyncio.run(repository.rpc("search_library_hdrs_by_book_name", {
+        "p_user_guid": user_guid,
+        "p_query": query,
+        "p_min_similarity": AppMmLibraryHdrService.FUZZY_MIN_SIMILARITY,
+        "p_limit": 10
+    }))
+    return [row["guid"] for row in response.data]
+
+def add_book(repository, user_guid, book_name):
+    guid = str(uuid4())
+    asyncio.run(repository.table(TABLE_NAME).insert({"guid": guid, "user_guid": user_guid, "book_name": book_name}).execute())
+    return guid
+
+def test_typo_matches_only_the_users_books_best_first(repository):
+    user_guid, other_user_guid = str(uuid4()), str(uuid4())
+    deep_work = add_book(repository, user_guid, "Deep Work")
+    work_clean = add_book(repository, user_guid, "Deep Work Clean Edition")
+    add_book(repository, user_guid, "Digital Minimalism")
+    add_book(repository, other_user_guid, "Deep Work")
+    
+    assert search(repository, user_guid, "deap work") == [deep_work, work_clean]
+
+def test_index_follows_updates_and_deletes(repository):
+    user_guid = str(uuid4())
+    guid = add_book(repository, user_guid, "Deep Work")
+    
+    asyncio.run(repository.table(TABLE_NAME).update({"book_name": "Digital Minimalism"}).eq("guid", guid).execute())
+    assert search(repository, user_guid, "deep work") == []
+    assert search(repository, user_guid, "digtal minimalism") == [guid]
+    
+    asyncio.run(repository.table(TABLE_NAME).delete().eq("guid", guid).execute())
+    assert search(repository, user_guid, "digtal minimalism") == []
+
+def test_listing_cursor_is_rejected_by_the_fuzzy_search(repository):
+    user_guid = str(uuid4())
+    add_book(repository, user_guid, "Deep Work")
+    listing_cursor = encode_cursor({"last_read": "2026-01-01T00:00:00+00:00", "guid": str(uuid4())}, "last_read")
+    
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        asyncio.run(AppMmLibraryHdrService.get_library_hdrs_by_criteria(user_guid=user_guid, book_name="deep work", cursor=listing_cursor))
@@ -0,0 +1,50 @@
+import asyncio
+from uuid import uuid4
+import pytest
+from util.llm_response_cache import LlmResponseCache, llm_response_cache
+from service.notebook.app_mm_notebook_content_service import AppMmNotebookContentService
+from model.notebook.app_mm_notebook_content import AppMmNotebookContentUpdate
+
+SCOPE = "notebook"
+CONTEXT_HASH = "context"
+PROMPT = "According to the author, why is shallow work harmful for long term career growth in knowledge jobs?"
+
+@pytest.fixture
+def cache():
+    cache = LlmResponseCache(maxsize=100, ttl=3600, similarity_threshold=0.9)
+    cache.set(SCOPE, CONTEXT_HASH, PROMPT, "cached reply")
+    return cache
+
+def test_exact_prompt_hits_after_normalization(cache):
+    assert cache.get(SCOPE, CONTEXT_HASH, "according to the author why is shallow work harmful for long term career growth in knowledge jobs") == "cached reply"
+    assert cache.stats()["hits"] == 1
+
+def test_prompt_differing_only_in_filler_words_is_a_near_hit(cache):
+    assert cache.get(SCOPE, CONTEXT_HASH, "Please, according to the author, why is shallow work harmful for long term career growth in knowledge jobs?") == "cached reply"
+    assert cache.stats()["near_hits"] == 1
+
+def test_negated_prompt_misses(cache):
+    # One added word keeps the Jaccard similarity above the threshold (17/18), but it inverts the question
+    assert cache.get(SCOPE, CONTEXT_HASH, "According to the author, why is shallow work not harmful for long term career growth in knowledge jobs?") is None
+    assert cache.stats()["misses"] == 1
+
+def test_prompt_about_another_subject_misses(cache):
+    assert cache.get(SCOPE, CONTEXT_HASH, "According to the author, why is shallow work harmful for short term career growth in knowledge jobs?") is None
+
+def test_other_context_misses(cache):
+    assert cache.get(SCOPE, "edited context", PROMPT) is None
+
+def test_invalidated_scope_misses(cache):
+    cache.invalidate_scope(SCOPE)
+    assert cache.get(SCOPE, CONTEXT_HASH, PROMPT) is None
+
+def test_moving_content_invalidates_both_notebooks(repository):
+    old_notebook, new_notebook, content_guid = str(uuid4()), str(uuid4()), str(uuid4())
+    repository.seed("app_mm_notebook_content", [{"guid": content_guid, "user_guid": str(uuid4()), "notebook_hdr_guid": old_notebook, "content_text": "deep work"}])
+    llm_response_cache.set(old_notebook, CONTEXT_HASH, PROMPT, "old notebook reply")
+    llm_response_cache.set(new_notebook, CONTEXT_HASH, PROMPT, "new notebook reply")
+    
+    asyncio.run(AppMmNotebookContentService.update_notebook_content(content_guid, AppMmNotebookContentUpdate(notebook_hdr_guid=new_notebook)))
+    
+    assert llm_response_cache.get(old_notebook, CONTEXT_HASH, PROMPT) is None
+    assert llm_response_cache.get(new_notebook, CONTEXT_HASH, PROMPT) is None
@@ -0,0 +1,87 @@
+import asyncio
+from uuid import UUID, uuid4
+from util.vector_index import VectorIndex
+from util.embedding_provider import FakeEmbeddingProvider, get_embedding_provider
+from service.notebook.notebook_content_embedding_service import NotebookContentEmbeddingService, vector_indexes
+
+def test_vector_index_returns_top_k_best_first():
+    index = VectorIndex(2)
+    index.add_many(["east", "north-east", "north", "west"], [[1, 0], [1, 1], [0, 1], [-1, 0]])
+    
+    matches = index.search([1, 0.1], k=3)
+    assert [item_id for item_id, _ in matches] == ["east", "north-east", "north"]
+    assert matches[0][1] > matches[1][1] > matches[2][1]
+    
+    index.remove("east")
+    index.add("north", [1, 0])
+    assert [item_id for item_id, _ in index.search([1, 0], k=10)] == ["north", "north-east", "west"]
+
+def test_fake_provider_is_the_configured_provider_and_deterministic():
+    provider = get_embedding_provider()
+    assert isinstance(provider, FakeEmbeddingProvider)
+    
+    first, second = asyncio.run(provider.embed(["Deep work", "deep WORK"]))
+    assert first == second
+    assert len(first) == provider.dimension
+
+def add_content(repository, user_guid, library_hdr_guid, text):
+    guid = str(uuid4())
+    repository.seed("app_mm_notebook_content", [{
+        "guid": guid,
+        "user_guid": user_guid,
+        "notebook_hdr_guid": str(uuid4()),
+        "library_hdr_guid": library_hdr_guid,
+        "content_text": text
+    }])
+    asyncio.run(NotebookContentEmbeddingService.index_content(UUID(guid)))
+    return guid
+
+def search(user_guid, library_hdr_guid, query, k=None):
+    hits = asyncio.run(NotebookContentEmbeddingService.search(UUID(user_guid), UUID(library_hdr_guid), query, k))
+    return [str(hit.content_guid) for hit in hits]
+
+def test_search_ranks_the_books_contents_by_similarity(repository):
+    user_guid, book, other_book = str(uuid4()), str(uuid4()), str(uuid4())
+    exact = add_content(repository, user_guid, book, "deep work needs focus")
+    close = add_content(repository, user_guid, book, "deep work")
+    add_content(repository, user_guid, book, "growing tomatoes in pots")
+    add_content(repository, user_guid, other_book, "deep work needs focus")
+    add_content(repository, str(uuid4()), book, "deep work needs focus")
+    
+    assert search(user_guid, book, "deep work needs focus", k=2) == [exact, close]
+    assert len(search(user_guid, book, "deep work needs focus")) == 3
+
+def test_writes_during_a_load_are_in_the_loaded_index(repository, monkeypatch):
+    user_guid, book = str(uuid4()), str(uuid4())
+    kept = add_content(repository, user_guid, book, "deep work needs focus")
+    deleted = add_content(repository, user_guid, book, "deep work")
+    build_index = NotebookContentEmbeddingService._build_index
+    
+    async def scenario():
+        scanned = asyncio.Event()
+        release = asyncio.Event()
+        
+        async def slow_build_index(scope):
+            # The scan has read the store; the writes below land before the index is registered
+            index = await build_index(scope)
+            scanned.set()
+            await release.wait()
+            return index
+        
+        monkeypatch.setattr(NotebookContentEmbeddingService, "_build_index", slow_build_index)
+        loading = asyncio.create_task(NotebookContentEmbeddingService.search(UUID(user_guid), UUID(book), "deep work"))
+        await scanned.wait()
+        
+        added = str(uuid4())
+        repository.seed("app_mm_notebook_content", [{"guid": added, "user_guid": user_guid, "notebook_hdr_guid": str(uuid4()), "library_hdr_guid": book, "content_text": "deep work again"}])
+        await NotebookContentEmbeddingService.index_content(UUID(added))
+        await NotebookContentEmbeddingService.remove_content(UUID(deleted))
+        
+        release.set()
+        await loading
+        return added
+    
+    added = asyncio.run(scenario())
+    
+    assert vector_indexes.get((user_guid, book)) is not None
+    assert sorted(search(user_guid, book, "deep work", k=10)) == sorted([kept, added])
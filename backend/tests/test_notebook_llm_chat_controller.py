@@ -0,0 +1,132 @@
+import json
+from uuid import uuid4
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from controller.notebook import app_mm_notebook_llm_chat_controller
+from service.notebook import notebook_llm_chat_service
+from util.llm_provider import LlmProvider
+
+TRANSCRIPT_TABLE = "app_mm_notebook_llm_chat_transcript"
+
+class FailingLlmProvider(LlmProvider):
+    """Streams a couple of tokens, then fails the way a dropped model connection would"""
+    
+    async def stream(self, contents):
+        yield "Partial"
+        yield " reply"
+        raise RuntimeError("model connection lost")
+
+@pytest.fixture
+def client(repository):
+    app = FastAPI()
+    app.include_router(app_mm_notebook_llm_chat_controller.router)
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def owner_guid():
+    return str(uuid4())
+
+@pytest.fixture
+def chat_hdr_guid(repository, owner_guid):
+    chat_hdr_guid = str(uuid4())
+    repository.seed("app_mm_notebook_llm_chat_hdr", [{"guid": chat_hdr_guid, "user_guid": owner_guid}])
+    return chat_hdr_guid
+
+@pytest.fixture
+def failing_provider(monkeypatch):
+    monkeypatch.setattr(notebook_llm_chat_service, "get_llm_provider", lambda: FailingLlmProvider())
+
+def sse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        event = json.loads(lines["data"])
+        assert event["type"] == lines["event"]
+        events.append(event)
+    return events
+
+def post_message(client, chat_hdr_guid, user_guid, message):
+    response = client.post(f"/notebook-llm-chats/stream/{chat_hdr_guid}", json={"user_guid": user_guid, "message": message})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return sse_events(response.text)
+
+def test_sse_streams_tokens_then_done(client, repository, chat_hdr_guid, owner_guid):
+    events = post_message(client, chat_hdr_guid, owner_guid, "what is deep work")
+    
+    tokens = events[:-1]
+    assert len(tokens) > 1
+    assert all(event["type"] == "token" for event in tokens)
+    assert "".join(event["text"] for event in tokens) == "You said (1 turns): what is deep work"
+    
+    done = events[-1]
+    assert done["type"] == "done"
+    assert done["cached"] is False
+    assert [(transcript["sender"], transcript["msg_content"]) for transcript in done["transcripts"]] == [
+        ("user", "what is deep work"),
+        ("model", "You said (1 turns): what is deep work")
+    ]
+    assert len(repository.rows(TRANSCRIPT_TABLE)) == 2
+
+def test_sse_rejects_another_users_chat(client, repository, chat_hdr_guid):
+    events = post_message(client, chat_hdr_guid, str(uuid4()), "what is deep work")
+    
+    assert events == [{"type": "error", "message": "Notebook LLM chat header belongs to another user"}]
+    assert repository.rows(TRANSCRIPT_TABLE) == []
+
+def test_sse_persists_nothing_when_the_stream_fails(client, repository, chat_hdr_guid, owner_guid, failing_provider):
+    events = post_message(client, chat_hdr_guid, owner_guid, "what is deep work")
+    
+    assert [event["type"] for event in events] == ["token", "token", "error"]
+    assert events[-1]["message"] == "model connection lost"
+    assert repository.rows(TRANSCRIPT_TABLE) == []
+
+def receive_reply(websocket):
+    events = [websocket.receive_json()]
+    while events[-1]["type"] == "token":
+        events.append(websocket.receive_json())
+    return events
+
+def test_websocket_streams_tokens_then_done(client, repository, chat_hdr_guid, owner_guid):
+    with client.websocket_connect(f"/notebook-llm-chats/ws/{chat_hdr_guid}") as websocket:
+        websocket.send_json({"user_guid": owner_guid, "message": "first question"})
+        first = receive_reply(websocket)
+        websocket.send_json({"user_guid": owner_guid, "message": "second question"})
+        second = receive_reply(websocket)
+    
+    assert first[-1]["type"] == "done"
+    assert "".join(event["text"] for event in first[:-1]) == "You said (1 turns): first question"
+    # The first exchange is part of the history of the second
+    assert second[-1]["type"] == "done"
+    assert "".join(event["text"] for event in second[:-1]) == "You said (3 turns): second question"
+    assert len(repository.rows(TRANSCRIPT_TABLE)) == 4
+
+def test_websocket_rejects_another_users_chat_and_stays_open(client, repository, chat_hdr_guid, owner_guid):
+    with client.websocket_connect(f"/notebook-llm-chats/ws/{chat_hdr_guid}") as websocket:
+        websocket.send_json({"user_guid": str(uuid4()), "message": "what is deep work"})
+        rejected = receive_reply(websocket)
+        websocket.send_json({"user_guid": owner_guid, "message": "what is deep work"})
+        answered = receive_reply(websocket)
+    
+    assert rejected == [{"type": "error", "message": "Notebook LLM chat header belongs to another user"}]
+    assert answered[-1]["type"] == "done"
+    assert len(repository.rows(TRANSCRIPT_TABLE)) == 2
+
+def test_websocket_reports_invalid_messages(client, chat_hdr_guid):
+    with client.websocket_connect(f"/notebook-llm-chats/ws/{chat_hdr_guid}") as websocket:
+        websocket.send_json({"message": "no user"})
+        event = websocket.receive_json()
+    
+    assert event["type"] == "error"
+    assert event["message"].startswith("Invalid message")
+
+def test_websocket_persists_nothing_when_the_stream_fails(client, repository, chat_hdr_guid, owner_guid, failing_provider):
+    with client.websocket_connect(f"/notebook-llm-chats/ws/{chat_hdr_guid}") as websocket:
+        websocket.send_json({"user_guid": owner_guid, "message": "what is deep work"})
+        events = receive_reply(websocket)
+    
+    assert [event["type"] for event in events] == ["token", "token", "error"]
+    assert events[-1]["message"] == "model connection lost"
+    assert repository.rows(TRANSCRIPT_TABLE) == []
@@ -0,0 +1,82 @@
+import asyncio
+from uuid import UUID, uuid4
+from util.text_search import TextSearchIndex, snippet
+from service.search.notebook_search_service import NotebookSearchService, search_indexes
+from service.notebook.app_mm_notebook_llm_chat_hdr_service import NotebookLlmChatHdrService
+
+def test_bm25_prefers_denser_documents_and_rarer_terms():
+    index = TextSearchIndex()
+    index.add("dense", "focus focus writing")
+    index.add("long", "focus on the craft of writing long careful essays")
+    index.add("both", "email attention")
+    index.add("rare", "attention span")
+    index.add("common", "email inbox")
+    index.add("common-too", "email weekends")
+    
+    assert [doc_id for doc_id, _ in index.search("focus")] == ["dense", "long"]
+    # "attention" is in fewer documents than "email", so it outweighs it; ties fall back to doc_id
+    assert [doc_id for doc_id, _ in index.search("email attention")] == ["both", "rare", "common", "common-too"]
+    # Stop words alone match nothing
+    assert index.search("the of") == []
+
+def test_bm25_filters_and_removal():
+    index = TextSearchIndex()
+    index.add("a", "deep work", {"source": "content"})
+    index.add("b", "deep work", {"source": "chat"})
+    
+    assert [doc_id for doc_id, _ in index.search("deep", {"source": "chat"})] == ["b"]
+    assert [doc_id for doc_id, _ in index.search("deep", {"source": ["content", "chat"]})] == ["a", "b"]
+    
+    index.remove("a")
+    assert [doc_id for doc_id, _ in index.search("deep")] == ["b"]
+    assert index.remove_where(lambda fields: fields["source"] == "chat") == 1
+    assert len(index) == 0
+
+def test_snippet_marks_terms_and_escapes_html():
+    text = "Intro " * 20 + "the <b>deep</b> work hypothesis: deep work is valuable " + "and rare " * 30
+    result = snippet(text, "deep work", width=80)
+    
+    assert result.startswith("…") and result.endswith("…")
+    assert "&lt;b&gt;<mark>deep</mark>&lt;/b&gt; <mark>work</mark>" in result
+    assert "<b>" not in result
+
+def test_snippet_without_a_match_is_the_start_of_the_text():
+    assert snippet("short note", "absent") == "short note"
+
+def add_content(repository, user_guid, text, library_hdr_guid=None):
+    guid = str(uuid4())
+    repository.seed("app_mm_notebook_content", [{
+        "guid": guid,
+        "user_guid": user_guid,
+        "notebook_hdr_guid": str(uuid4()),
+        "library_hdr_guid": library_hdr_guid,
+        "content_text": text
+    }])
+    return guid
+
+def search(user_guid, query, **filters):
+    page = asyncio.run(NotebookSearchService.search(UUID(user_guid), query, **filters))
+    return [str(hit.guid) for hit in page.items]
+
+def test_search_is_scoped_to_the_user_and_book(repository):
+    user_guid, other_user_guid, book = str(uuid4()), str(uuid4()), str(uuid4())
+    in_book = add_content(repository, user_guid, "deep work needs long blocks", book)
+    elsewhere = add_content(repository, user_guid, "deep work in another book")
+    add_content(repository, other_user_guid, "deep work belongs to someone else")
+    
+    assert sorted(search(user_guid, "deep work")) == sorted([in_book, elsewhere])
+    assert search(user_guid, "deep work", library_hdr_guid=UUID(book)) == [in_book]
+    assert search(user_guid, "blocks", sources=["chat"]) == []
+
+def test_deleted_chat_header_messages_leave_the_index(repository):
+    user_guid, chat_hdr_guid, transcript_guid = str(uuid4()), str(uuid4()), str(uuid4())
+    repository.seed("app_mm_notebook_llm_chat_hdr", [{"guid": chat_hdr_guid, "user_guid": user_guid}])
+    repository.seed("app_mm_notebook_llm_chat_transcript", [{"guid": transcript_guid, "user_guid": user_guid, "llm_chat_hdr_guid": chat_hdr_guid, "msg_content": "what is deep work"}])
+    assert search(user_guid, "deep work") == [transcript_guid]
+    
+    asyncio.run(NotebookLlmChatHdrService.delete_chat_hdr(UUID(chat_hdr_guid)))
+    assert search(user_guid, "deep work") == []
+    
+    # A rebuilt index skips the header's leftover transcripts too
+    search_indexes.discard(user_guid)
+    assert search(user_guid, "deep work") == []
@@ -77,7 +77,7 @@ export const NotebookContentFileLinkService = {
             const result = await response.json();
 
             if (result.status === 'OK_RESPONSE') {
-                return result.data;
+                return result.data.items;
             } else {
                 throw new Error(result.data?.message || 'Failed to get all notebook content file links');
             }
@@ -103,7 +103,7 @@ export const NotebookContentFileLinkService = {
             const result = await response.json();
 
             if (result.status === 'OK_RESPONSE') {
-                return result.data;
+                return result.data.items;
             } else {
                 throw new Error(result.data?.message || 'Failed to get notebook content file links by user');
             }
@@ -129,7 +129,7 @@ export const NotebookContentFileLinkService = {
             const result = await response.json();
 
             if (result.status === 'OK_RESPONSE') {
-                return result.data;
+                return result.data.items;
             } else {
                 throw new Error(result.data?.message || 'Failed to get notebook content file links by notebook header');
             }
@@ -155,7 +155,7 @@ export const NotebookContentFileLinkService = {
             const result = await response.json();
 
             if (result.status === 'OK_RESPONSE') {
-                return result.data;
+                return result.data.items;
             } else {
                 throw new Error(result.data?.message || 'Failed to get notebook content file links by notebook content');
             }
@@ -181,7 +181,7 @@ export const NotebookContentFileLinkService = {
             const result = await response.json();
 
             if (result.status === 'OK_RESPONSE') {
-                return result.data;
+                return result.data.items;
             } else {
                 throw new Error(result.data?.message || 'Failed to get notebook content file links by file upload');
             }
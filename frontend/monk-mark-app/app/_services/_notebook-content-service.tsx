@@ -39,6 +39,43 @@ export const NotebookContentService = {
         }
     },
 
+    async bulkCreate(payload: {
+        notebook_hdr_guid: string;
+        user_guid: string;
+        library_hdr_guid?: string;
+        focus_session_guid?: string;
+        contents: {
+            content_text?: string;
+            image_url?: string;
+            highlight_metadata?: any;
+        }[];
+    }): Promise<any[]> {
+        try {
+            const response = await fetch(`${API_BASE_URL}/notebook-contents/bulk-create`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify(payload),
+            });
+
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+
+            const result = await response.json();
+
+            if (result.status === 'OK_RESPONSE') {
+                return result.data;
+            } else {
+                throw new Error(result.data?.message || 'Failed to create notebook contents');
+            }
+        } catch (error) {
+            console.error('Error creating notebook contents:', error);
+            throw error;
+        }
+    },
+
     async getByGuid(contentId: string): Promise<any> {
         try {
             const response = await fetch(`${API_BASE_URL}/notebook-contents/get-by-guid/${contentId}`, {
@@ -81,7 +118,7 @@ export const NotebookContentService = {
             const result = await response.json();
 
             if (result.status === 'OK_RESPONSE') {
-                return result.data;
+                return result.data.items;
             } else {
                 throw new Error(result.data?.message || 'Failed to get all notebook contents');
             }
@@ -93,7 +130,7 @@ export const NotebookContentService = {
 
     async getByNotebookHdr(notebookHdrGuid: string): Promise<any> {
         try {
-            const response = await fetch(`${API_BASE_URL}/notebook-contents/get-by-notebook-hdr/${notebookHdrGuid}`, {
+            const response = await fetch(`${API_BASE_URL}/notebook-contents/get-by-notebook-hdr/${notebookHdrGuid}?limit=200`, {
                 method: 'GET',
                 headers: {
                     'Content-Type': 'application/json',
@@ -107,7 +144,7 @@ export const NotebookContentService = {
             const result = await response.json();
 
             if (result.status === 'OK_RESPONSE') {
-                return result.data;
+                return result.data.items;
             } else {
                 throw new Error(result.data?.message || 'Failed to get notebook contents by header');
             }
@@ -133,7 +170,7 @@ export const NotebookContentService = {
             const result = await response.json();
 
             if (result.status === 'OK_RESPONSE') {
-                return result.data;
+                return result.data.items;
             } else {
                 throw new Error(result.data?.message || 'Failed to get notebook contents by user');
             }
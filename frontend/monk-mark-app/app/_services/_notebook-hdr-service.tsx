@@ -62,6 +62,32 @@ export const NotebookHdrService = {
         }
     },
 
+    async open(notebookHdrId: string): Promise<any> {
+        try {
+            const response = await fetch(`${API_BASE_URL}/notebooks/open/${notebookHdrId}?limit=200`, {
+                method: 'GET',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+            });
+
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+
+            const result = await response.json();
+
+            if (result.status === 'OK_RESPONSE') {
+                return result.data;
+            } else {
+                throw new Error(result.data?.message || 'Failed to open notebook');
+            }
+        } catch (error) {
+            console.error('Error opening notebook:', error);
+            throw error;
+        }
+    },
+
     async getAll(): Promise<any> {
         try {
             const response = await fetch(`${API_BASE_URL}/notebooks/get-all`, {
@@ -78,7 +104,7 @@ export const NotebookHdrService = {
             const result = await response.json();
 
             if (result.status === 'OK_RESPONSE') {
-                return result.data;
+                return result.data.items;
             } else {
                 throw new Error(result.data?.message || 'Failed to get all notebook headers');
             }
@@ -104,7 +130,7 @@ export const NotebookHdrService = {
             const result = await response.json();
 
             if (result.status === 'OK_RESPONSE') {
-                return result.data;
+                return result.data.items;
             } else {
                 throw new Error(result.data?.message || 'Failed to get notebook headers by user');
             }
@@ -20,8 +20,8 @@ export const FocusSessionService = {
 
             const result = await response.json();
 
-            if (result.status === 'OK_RESPONSE' && result.data && result.data.length > 0) {
-                const session = result.data[0];
+            if (result.status === 'OK_RESPONSE' && result.data?.items?.length > 0) {
+                const session = result.data.items[0];
                 return {
                     userGuid: session.user_guid,
                     focusSessionGuid: session.guid,
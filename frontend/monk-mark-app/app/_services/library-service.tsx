@@ -67,6 +67,7 @@ export const LibraryService = {
         guid?: string;
         user_guid?: string;
         book_name?: string;
+        variant?: '128' | '512' | 'original';
     }): Promise<any> {
         try {
             const response = await fetch(`${API_BASE_URL}/librarys/get-by-criteria`, {
@@ -84,7 +85,7 @@ export const LibraryService = {
             const result = await response.json();
 
             if (result.status === 'OK_RESPONSE') {
-                return result.data;
+                return result.data.items;
             } else {
                 throw new Error(result.data?.message || 'Failed to get library records');
             }
@@ -28,6 +28,7 @@ const RecentReading: React.FC = () => {
       setLoading(true);
       const result = await LibraryService.getLibraryBookRecordsByCriteria({
         user_guid: user.guid,
+        variant: '512',
       });
       console.log('Loaded books:', result);
       setBooks(result || []);
@@ -57,6 +57,7 @@ const LibraryListing: React.FC = () => {
 
       const payload: any = {
         user_guid: user.guid,
+        variant: '512',
       };
 
       if (bookName && bookName.trim()) {
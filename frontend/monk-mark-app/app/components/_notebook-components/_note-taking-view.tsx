@@ -6,7 +6,7 @@ import NotebookBackground from './_notebook-background';
 import NoteContentView from './_note-content-view';
 import { useAppState } from '../../_state-controller/state-controller';
 import { NotebookContentService } from '../../_services/_notebook-content-service';
-import { NotebookContentFileLinkService } from '../../_services/_notebook-content-file-link-service';
+import { NotebookHdrService } from '../../_services/_notebook-hdr-service';
 
 const NoteTakingView: React.FC = () => {
   const {
@@ -26,30 +26,22 @@ const NoteTakingView: React.FC = () => {
       }
 
       try {
-        const notebookContents = await NotebookContentService.getByNotebookHdr(currentNotebookGuid);
+        // Notebook, ordered contents and their attachments in one request
+        const openedNotebook = await NotebookHdrService.open(currentNotebookGuid);
+        const notebookContents = openedNotebook?.contents;
 
         if (notebookContents && notebookContents.length > 0) {
           // Transform API response to match noteContentViewMetadata structure
-          const loadedNotesPromises = notebookContents.map(async (content: any, index: number) => {
+          const loadedNotes = notebookContents.map((content: any, index: number) => {
             let images = undefined;
 
-            // Fetch attachments for this notebook content
-            if (content.guid) {
-              try {
-                const attachments = await NotebookContentFileLinkService.getNotebookContentAttachments(content.guid);
-
-                if (attachments && attachments.length > 0) {
-                  // Map attachments to the images format expected by noteContentViewMetadata
-                  images = attachments.map((attachment: any) => ({
-                    uri: attachment.file_path,
-                    highlights: attachment.highlight_metadata?.highlights || [],
-                    asyncStorageKey: `attachment_${attachment.content_guid}_${Date.now()}`,
-                  }));
-                }
-              } catch (error) {
-                console.error(`Error loading attachments for content ${content.guid}:`, error);
-                // Continue without attachments if fetch fails
-              }
+            if (content.attachments && content.attachments.length > 0) {
+              // Map attachments to the images format expected by noteContentViewMetadata
+              images = content.attachments.map((attachment: any) => ({
+                uri: attachment.file_path,
+                highlights: attachment.highlight_metadata?.highlights || [],
+                asyncStorageKey: `attachment_${content.guid}_${Date.now()}`,
+              }));
             }
 
             return {
@@ -61,8 +53,6 @@ const NoteTakingView: React.FC = () => {
             };
           });
 
-          const loadedNotes = await Promise.all(loadedNotesPromises);
-
           setNoteContentViewMetadata({
             notes: loadedNotes,
             activeNoteIndex: null,